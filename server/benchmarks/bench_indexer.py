@@ -0,0 +1,108 @@
+"""
+Benchmark for CodeIndexer graph writes on a synthetic 10k-symbol repository.
+
+Generates a temporary Python codebase (by default 50 files x 200 functions),
+then indexes it twice against a simulated Neo4j client: once saving symbols
+one `upsert_symbol` call at a time (the previous behaviour) and once through
+`upsert_symbols_bulk`. Reports statements, round-trips and wall-clock time.
+
+Usage:
+    python benchmarks/bench_indexer.py --files 50 --symbols-per-file 200 --batch-size 500
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+from simulated import SimulatedNeo4jClient
+
+from kg_mcp.codegraph.indexer import CodeIndexer
+from kg_mcp.codegraph.model import FileInfo
+from kg_mcp.config import get_settings
+from kg_mcp.kg.repo import KGRepository
+
+
+def generate_repo(root: Path, files: int, symbols_per_file: int) -> None:
+    """Write a synthetic Python package with `files * symbols_per_file` functions."""
+    package = root / "synthetic"
+    package.mkdir()
+    for i in range(files):
+        body = "\n\n".join(
+            f"def func_{i}_{j}(value: int) -> int:\n    return value + {j}"
+            for j in range(symbols_per_file)
+        )
+        (package / f"module_{i}.py").write_text(body + "\n")
+
+
+class PerSymbolIndexer(CodeIndexer):
+    """Indexer that saves symbols with one upsert per symbol (previous behaviour)."""
+
+    async def _save_file_to_graph(self, file_info: FileInfo) -> None:
+        artifact = await self.repo.upsert_code_artifact(
+            project_id=self.project_id,
+            path=file_info.path,
+            kind="file",
+            language=file_info.language,
+            content_hash=file_info.content_hash,
+        )
+        for symbol in file_info.symbols:
+            await self.repo.upsert_symbol(
+                artifact_id=artifact["id"],
+                fqn=symbol.fqn,
+                kind=symbol.kind.value,
+            )
+
+
+async def bench(indexer_cls, root: Path, rtt: float, batch_size: int) -> Dict[str, float]:
+    """Index the synthetic repo once and return write stats."""
+    client = SimulatedNeo4jClient(rtt)
+    repo = KGRepository()
+    repo.client = client
+
+    get_settings().kg_symbol_batch_size = batch_size
+
+    indexer = indexer_cls("bench-project", str(root))
+    indexer.repo = repo
+
+    start = time.perf_counter()
+    snapshot = await indexer.index_codebase(extensions=[".py"])
+    elapsed = time.perf_counter() - start
+
+    return {
+        "symbols": snapshot.total_symbols,
+        "statements": client.statements,
+        "round_trips": client.round_trips,
+        "seconds": elapsed,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark CodeIndexer symbol writes")
+    parser.add_argument("--files", type=int, default=50, help="Files to generate")
+    parser.add_argument("--symbols-per-file", type=int, default=200, help="Functions per file")
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="Simulated round-trip time")
+    parser.add_argument("--batch-size", type=int, default=500, help="Symbols per UNWIND")
+    args = parser.parse_args()
+
+    rtt = args.rtt_ms / 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        generate_repo(root, args.files, args.symbols_per_file)
+        print(
+            f"Synthetic repo: {args.files} files x {args.symbols_per_file} symbols, "
+            f"simulated RTT {args.rtt_ms} ms\n"
+        )
+        print(f"{'mode':<12}{'symbols':>10}{'statements':>12}{'round-trips':>14}{'seconds':>10}")
+        for label, indexer_cls in (("per-symbol", PerSymbolIndexer), ("bulk", CodeIndexer)):
+            stats = await bench(indexer_cls, root, rtt, args.batch_size)
+            print(
+                f"{label:<12}{stats['symbols']:>10}{stats['statements']:>12}"
+                f"{stats['round_trips']:>14}{stats['seconds']:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
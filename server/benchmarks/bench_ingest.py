@@ -0,0 +1,118 @@
+"""
+Benchmark for IngestPipeline._commit_to_graph.
+
+Compares the per-entity commit path with the bulk UNWIND path by running both
+against a simulated Neo4j client that counts round-trips and sleeps for a
+configurable network round-trip time per statement and per commit.
+
+Usage:
+    python benchmarks/bench_ingest.py --rtt-ms 2 --runs 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict
+
+from simulated import SimulatedNeo4jClient
+
+from kg_mcp.config import Settings
+from kg_mcp.kg.ingest import IngestPipeline
+from kg_mcp.kg.repo import KGRepository
+from kg_mcp.llm.schemas import (
+    CodeReference,
+    ConstraintExtract,
+    ExtractionResult,
+    GoalExtract,
+    LinkingResult,
+    PainPointExtract,
+    PreferenceExtract,
+    StrategyExtract,
+)
+
+
+def rich_extraction() -> ExtractionResult:
+    """A representative 'rich' extraction: several entities of every type."""
+    goals = [GoalExtract(title=f"Goal {i}", description=f"Goal {i} details") for i in range(5)]
+    return ExtractionResult(
+        goals=goals,
+        constraints=[
+            ConstraintExtract(type="performance", description=f"Constraint {i}")
+            for i in range(5)
+        ],
+        preferences=[
+            PreferenceExtract(category="coding_style", preference=f"Preference {i}")
+            for i in range(3)
+        ],
+        pain_points=[
+            PainPointExtract(description=f"Pain point {i}", related_goal=goals[i].title)
+            for i in range(3)
+        ],
+        strategies=[
+            StrategyExtract(
+                title=f"Strategy {i}", approach=f"Approach {i}", related_goal=goals[i].title
+            )
+            for i in range(3)
+        ],
+        code_references=[
+            CodeReference(path=f"src/module_{i}.py", symbol=f"src/module_{i}.py:func_{i}")
+            for i in range(5)
+        ],
+    )
+
+
+async def bench(bulk: bool, rtt: float, runs: int) -> Dict[str, float]:
+    """Run the commit path `runs` times and return round-trip and latency stats."""
+    client = SimulatedNeo4jClient(rtt)
+    repo = KGRepository()
+    repo.client = client
+
+    pipeline = IngestPipeline.__new__(IngestPipeline)
+    pipeline.settings = Settings(kg_bulk_commit=bulk)
+    pipeline.repo = repo
+
+    extraction = rich_extraction()
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await pipeline._commit_to_graph(
+            project_id="bench-project",
+            user_id="bench-user",
+            interaction_id="bench-interaction",
+            extraction=extraction,
+            linking=LinkingResult(),
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "statements": client.statements / runs,
+        "transactions": client.transactions / runs,
+        "round_trips": client.round_trips / runs,
+        "p50_ms": statistics.median(latencies),
+        "max_ms": max(latencies),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ingest commit paths")
+    parser.add_argument("--rtt-ms", type=float, default=2.0, help="Simulated round-trip time")
+    parser.add_argument("--runs", type=int, default=20, help="Ingests per mode")
+    args = parser.parse_args()
+
+    rtt = args.rtt_ms / 1000
+    print(f"Simulated RTT: {args.rtt_ms} ms, {args.runs} ingests per mode\n")
+    print(
+        f"{'mode':<12}{'statements':>12}{'txns':>8}{'round-trips':>14}"
+        f"{'p50 ms':>10}{'max ms':>10}"
+    )
+    for label, bulk in (("per-entity", False), ("bulk", True)):
+        stats = await bench(bulk, rtt, args.runs)
+        print(
+            f"{label:<12}{stats['statements']:>12.0f}{stats['transactions']:>8.0f}"
+            f"{stats['round_trips']:>14.0f}{stats['p50_ms']:>10.1f}{stats['max_ms']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
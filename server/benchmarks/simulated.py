@@ -0,0 +1,68 @@
+"""
+Simulated Neo4j client shared by the benchmarks.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+
+class SimulatedNeo4jClient:
+    """Stand-in for Neo4jClient that counts round-trips and simulates latency."""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.statements = 0
+        self.transactions = 0
+        self._in_transaction = False
+
+    @property
+    def round_trips(self) -> int:
+        # Every statement is one RUN/PULL exchange; every transaction adds a COMMIT
+        return self.statements + self.transactions
+
+    async def _round_trip(self) -> None:
+        await asyncio.sleep(self.rtt)
+
+    async def execute_query(
+        self,
+        query: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        database: str = "neo4j",
+    ) -> List[Dict[str, Any]]:
+        if self._in_transaction:
+            return await self.run_in_transaction(None, query, parameters)
+        # Auto-commit: one statement, one transaction
+        self.statements += 1
+        self.transactions += 1
+        await self._round_trip()
+        await self._round_trip()
+        return []
+
+    @asynccontextmanager
+    async def transaction(self, database: str = "neo4j"):
+        if self._in_transaction:
+            yield
+            return
+        self._in_transaction = True
+        try:
+            yield
+        finally:
+            self._in_transaction = False
+        self.transactions += 1
+        await self._round_trip()
+
+    async def execute_write_transaction(self, work, database: str = "neo4j"):
+        if self._in_transaction:
+            return await work(None)
+        result = await work(None)
+        self.transactions += 1
+        await self._round_trip()
+        return result
+
+    async def run_in_transaction(
+        self, tx: Any, query: str, parameters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        self.statements += 1
+        await self._round_trip()
+        return []
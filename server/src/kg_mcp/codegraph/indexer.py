@@ -8,12 +8,17 @@ For production use, consider integrating:
 - Scip/LSIF for pre-computed indices
 """
 
+import ast
+import asyncio
+import functools
 import hashlib
 import logging
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 
 from kg_mcp.codegraph.model import (
     FileInfo,
@@ -25,6 +30,7 @@ from kg_mcp.codegraph.model import (
     CodeGraphSnapshot,
     detect_language,
 )
+from kg_mcp.config import get_settings
 from kg_mcp.kg.repo import get_repository
 
 logger = logging.getLogger(__name__)
@@ -52,18 +58,174 @@ IGNORE_PATTERNS = {
 }
 
 
+def parse_file(
+    root_path: str, file_path: str, known_hash: Optional[str] = None
+) -> Optional[FileInfo]:
+    """
+    Read, hash and parse a single file.
+
+    Runs in worker processes, so it only takes and returns picklable values.
+
+    Args:
+        root_path: Codebase root (paths are stored relative to it)
+        file_path: Absolute path of the file
+        known_hash: Content hash already stored in the graph, if any
+
+    Returns:
+        FileInfo with symbols, or None if the file is unreadable or its hash
+        matches `known_hash`
+    """
+    path = Path(file_path)
+    try:
+        content = path.read_text(encoding="utf-8", errors="replace")
+    except Exception as e:
+        logger.debug(f"Could not read {path}: {e}")
+        return None
+
+    # Compute content hash; unchanged files are not parsed again
+    content_hash = hashlib.sha256(content.encode()).hexdigest()[:16]
+    if content_hash == known_hash:
+        return None
+
+    # Get file stats
+    stat = path.stat()
+    line_count = content.count("\n") + 1
+
+    # Detect language
+    language = detect_language(str(path))
+
+    # Create file info
+    file_info = FileInfo(
+        path=str(path.relative_to(root_path)),
+        language=language,
+        content_hash=content_hash,
+        size_bytes=stat.st_size,
+        line_count=line_count,
+        last_modified=datetime.fromtimestamp(stat.st_mtime),
+    )
+
+    # Extract symbols based on language
+    if language == "python":
+        symbols = _extract_python_symbols(content, file_info.path)
+        for symbol in symbols:
+            file_info.add_symbol(symbol)
+
+    return file_info
+
+
+def _parse_chunk(
+    root_path: str, chunk: List[Tuple[str, Optional[str]]]
+) -> List[Tuple[str, Optional[FileInfo]]]:
+    """Parse a chunk of (file_path, known_hash) pairs in a worker process."""
+    results = []
+    for file_path, known_hash in chunk:
+        try:
+            results.append((file_path, parse_file(root_path, file_path, known_hash)))
+        except Exception as e:
+            logger.warning(f"Failed to index {file_path}: {e}")
+            results.append((file_path, None))
+    return results
+
+
+def _extract_python_symbols(content: str, file_path: str) -> List[Symbol]:
+    """Extract symbols from Python code using AST."""
+    symbols = []
+
+    try:
+        tree = ast.parse(content)
+    except SyntaxError as e:
+        logger.debug(f"Syntax error in {file_path}: {e}")
+        return symbols
+
+    # Visit all nodes
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            symbols.append(
+                Symbol(
+                    fqn=f"{file_path}:{node.name}",
+                    name=node.name,
+                    kind=SymbolKind.FUNCTION,
+                    location=SourceLocation(
+                        file_path=file_path,
+                        start_line=node.lineno,
+                        end_line=node.end_lineno,
+                    ),
+                    signature=_get_python_function_signature(node),
+                    docstring=ast.get_docstring(node),
+                )
+            )
+        elif isinstance(node, ast.AsyncFunctionDef):
+            symbols.append(
+                Symbol(
+                    fqn=f"{file_path}:{node.name}",
+                    name=node.name,
+                    kind=SymbolKind.FUNCTION,
+                    location=SourceLocation(
+                        file_path=file_path,
+                        start_line=node.lineno,
+                        end_line=node.end_lineno,
+                    ),
+                    signature=_get_python_function_signature(node),
+                    docstring=ast.get_docstring(node),
+                    modifiers=["async"],
+                )
+            )
+        elif isinstance(node, ast.ClassDef):
+            symbols.append(
+                Symbol(
+                    fqn=f"{file_path}:{node.name}",
+                    name=node.name,
+                    kind=SymbolKind.CLASS,
+                    location=SourceLocation(
+                        file_path=file_path,
+                        start_line=node.lineno,
+                        end_line=node.end_lineno,
+                    ),
+                    docstring=ast.get_docstring(node),
+                )
+            )
+
+    return symbols
+
+
+def _get_python_function_signature(node) -> str:
+    """Extract function signature from AST node."""
+    args = []
+    for arg in node.args.args:
+        arg_str = arg.arg
+        if arg.annotation:
+            try:
+                arg_str += f": {ast.unparse(arg.annotation)}"
+            except Exception:
+                pass
+        args.append(arg_str)
+
+    returns = ""
+    if node.returns:
+        try:
+            returns = f" -> {ast.unparse(node.returns)}"
+        except Exception:
+            pass
+
+    return f"def {node.name}({', '.join(args)}){returns}"
+
+
 class CodeIndexer:
     """
     Indexes source code to build a code graph.
 
     This V1 implementation uses basic file parsing.
     For production, integrate tree-sitter or LSP.
+
+    Reading, hashing and parsing run in a process pool; graph writes are
+    streamed one chunk (one transaction) at a time as parsing completes.
     """
 
     def __init__(self, project_id: str, root_path: str):
         self.project_id = project_id
         self.root_path = Path(root_path).resolve()
         self.repo = get_repository()
+        self.settings = get_settings()
 
     async def index_codebase(
         self,
@@ -75,10 +237,12 @@ class CodeIndexer:
 
         Args:
             extensions: Optional list of file extensions to index (e.g., [".py", ".js"])
-            incremental: If True, only index changed files
+            incremental: If True, skip files whose content hash matches the graph
 
         Returns:
-            CodeGraphSnapshot with indexed files and symbols
+            CodeGraphSnapshot whose `files` are the files (re)indexed in this
+            run; with incremental=True, files skipped because their stored
+            hash still matches are listed by path in `unchanged_files`
         """
         logger.info(f"Indexing codebase at {self.root_path}")
 
@@ -86,165 +250,93 @@ class CodeIndexer:
         if extensions is None:
             extensions = [".py", ".js", ".ts", ".jsx", ".tsx", ".java", ".go", ".rs"]
 
-        files: List[FileInfo] = []
-        references: List[SymbolReference] = []
+        # Stored hashes for the whole project in one query
+        known_hashes: Dict[str, str] = {}
+        if incremental:
+            known_hashes = await self.repo.get_artifact_hashes(self.project_id)
 
-        # Walk directory tree
-        file_count = 0
-        for root, dirs, filenames in os.walk(self.root_path):
-            # Filter out ignored directories
-            dirs[:] = [d for d in dirs if not self._should_ignore(d)]
-
-            for filename in filenames:
-                file_path = Path(root) / filename
+        paths = await asyncio.to_thread(self._collect_files, extensions)
+        work = [
+            (str(path), known_hashes.get(str(path.relative_to(self.root_path))))
+            for path in paths
+        ]
 
-                # Check extension
-                if extensions and file_path.suffix.lower() not in extensions:
-                    continue
-
-                if self._should_ignore(filename):
+        files: List[FileInfo] = []
+        unchanged_files: List[str] = []
+        references: List[SymbolReference] = []
+        chunk_size = max(1, self.settings.kg_indexer_chunk_size)
+        chunks = [work[i : i + chunk_size] for i in range(0, len(work), chunk_size)]
+
+        # Forking a process that runs an event loop and driver threads is unsafe
+        loop = asyncio.get_running_loop()
+        pool = ProcessPoolExecutor(
+            max_workers=self.settings.kg_indexer_workers or None,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        try:
+            pending = [
+                loop.run_in_executor(pool, _parse_chunk, str(self.root_path), chunk)
+                for chunk in chunks
+            ]
+            for next_chunk in asyncio.as_completed(pending):
+                parsed = []
+                for file_path, info in await next_chunk:
+                    if info is not None:
+                        parsed.append(info)
+                        continue
+                    relative = str(Path(file_path).relative_to(self.root_path))
+                    if relative in known_hashes:
+                        unchanged_files.append(relative)
+                if not parsed:
                     continue
-
                 try:
-                    file_info = await self._index_file(file_path)
-                    if file_info:
-                        files.append(file_info)
-                        file_count += 1
-
-                        # Save to graph
-                        await self._save_file_to_graph(file_info)
+                    await self.repo.run_transaction(functools.partial(self._save_files, parsed))
+                    files.extend(parsed)
                 except Exception as e:
-                    logger.warning(f"Failed to index {file_path}: {e}")
-
-        logger.info(f"Indexed {file_count} files with {sum(len(f.symbols) for f in files)} symbols")
+                    logger.warning(f"Failed to save chunk starting at {parsed[0].path}: {e}")
+        finally:
+            # Shutting down with wait=True would block the event loop, and on
+            # error or cancellation the chunks still queued would all be parsed
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        logger.info(
+            f"Indexed {len(files)} files with {sum(len(f.symbols) for f in files)} symbols "
+            f"({len(unchanged_files)} unchanged, "
+            f"{len(work) - len(files) - len(unchanged_files)} skipped)"
+        )
 
         return CodeGraphSnapshot(
             project_id=self.project_id,
             timestamp=datetime.utcnow(),
             files=files,
             references=references,
+            unchanged_files=unchanged_files,
         )
 
-    async def _index_file(self, file_path: Path) -> Optional[FileInfo]:
-        """Index a single file."""
-        try:
-            content = file_path.read_text(encoding="utf-8", errors="replace")
-        except Exception as e:
-            logger.debug(f"Could not read {file_path}: {e}")
-            return None
-
-        # Compute content hash
-        content_hash = hashlib.sha256(content.encode()).hexdigest()[:16]
-
-        # Get file stats
-        stat = file_path.stat()
-        line_count = content.count("\n") + 1
-
-        # Detect language
-        language = detect_language(str(file_path))
-
-        # Create file info
-        file_info = FileInfo(
-            path=str(file_path.relative_to(self.root_path)),
-            language=language,
-            content_hash=content_hash,
-            size_bytes=stat.st_size,
-            line_count=line_count,
-            last_modified=datetime.fromtimestamp(stat.st_mtime),
-        )
-
-        # Extract symbols based on language
-        if language == "python":
-            symbols = self._extract_python_symbols(content, file_info.path)
-            for symbol in symbols:
-                file_info.add_symbol(symbol)
-
-        return file_info
-
-    def _extract_python_symbols(self, content: str, file_path: str) -> List[Symbol]:
-        """Extract symbols from Python code using AST."""
-        symbols = []
+    async def _save_files(self, parsed: List[FileInfo]) -> None:
+        """Save one chunk of parsed files (a unit of work)."""
+        for file_info in parsed:
+            await self._save_file_to_graph(file_info)
 
-        try:
-            import ast
-
-            tree = ast.parse(content)
-        except SyntaxError as e:
-            logger.debug(f"Syntax error in {file_path}: {e}")
-            return symbols
-
-        # Visit all nodes
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                symbols.append(
-                    Symbol(
-                        fqn=f"{file_path}:{node.name}",
-                        name=node.name,
-                        kind=SymbolKind.FUNCTION,
-                        location=SourceLocation(
-                            file_path=file_path,
-                            start_line=node.lineno,
-                            end_line=node.end_lineno,
-                        ),
-                        signature=self._get_python_function_signature(node),
-                        docstring=ast.get_docstring(node),
-                    )
-                )
-            elif isinstance(node, ast.AsyncFunctionDef):
-                symbols.append(
-                    Symbol(
-                        fqn=f"{file_path}:{node.name}",
-                        name=node.name,
-                        kind=SymbolKind.FUNCTION,
-                        location=SourceLocation(
-                            file_path=file_path,
-                            start_line=node.lineno,
-                            end_line=node.end_lineno,
-                        ),
-                        signature=self._get_python_function_signature(node),
-                        docstring=ast.get_docstring(node),
-                        modifiers=["async"],
-                    )
-                )
-            elif isinstance(node, ast.ClassDef):
-                symbols.append(
-                    Symbol(
-                        fqn=f"{file_path}:{node.name}",
-                        name=node.name,
-                        kind=SymbolKind.CLASS,
-                        location=SourceLocation(
-                            file_path=file_path,
-                            start_line=node.lineno,
-                            end_line=node.end_lineno,
-                        ),
-                        docstring=ast.get_docstring(node),
-                    )
-                )
-
-        return symbols
+    def _collect_files(self, extensions: List[str]) -> List[Path]:
+        """Walk the directory tree and return the files to index."""
+        paths = []
+        for root, dirs, filenames in os.walk(self.root_path):
+            # Filter out ignored directories
+            dirs[:] = [d for d in dirs if not self._should_ignore(d)]
 
-    def _get_python_function_signature(self, node) -> str:
-        """Extract function signature from AST node."""
-        import ast
+            for filename in filenames:
+                file_path = Path(root) / filename
 
-        args = []
-        for arg in node.args.args:
-            arg_str = arg.arg
-            if arg.annotation:
-                try:
-                    arg_str += f": {ast.unparse(arg.annotation)}"
-                except:
-                    pass
-            args.append(arg_str)
+                # Check extension
+                if extensions and file_path.suffix.lower() not in extensions:
+                    continue
 
-        returns = ""
-        if node.returns:
-            try:
-                returns = f" -> {ast.unparse(node.returns)}"
-            except:
-                pass
+                if self._should_ignore(filename):
+                    continue
 
-        return f"def {node.name}({', '.join(args)}){returns}"
+                paths.append(file_path)
+        return paths
 
     async def _save_file_to_graph(self, file_info: FileInfo) -> None:
         """Save file and its symbols to Neo4j."""
@@ -257,12 +349,21 @@ class CodeIndexer:
             content_hash=file_info.content_hash,
         )
 
-        # Save symbols
-        for symbol in file_info.symbols:
-            await self.repo.upsert_symbol(
+        # Save symbols in UNWIND batches
+        if file_info.symbols:
+            await self.repo.upsert_symbols_bulk(
                 artifact_id=artifact["id"],
-                fqn=symbol.fqn,
-                kind=symbol.kind.value,
+                symbols=[
+                    {
+                        "fqn": symbol.fqn,
+                        "name": symbol.name,
+                        "kind": symbol.kind.value,
+                        "line_start": symbol.location.start_line,
+                        "line_end": symbol.location.end_line,
+                        "signature": symbol.signature,
+                    }
+                    for symbol in file_info.symbols
+                ],
             )
 
     def _should_ignore(self, name: str) -> bool:
@@ -106,6 +106,8 @@ class CodeGraphSnapshot:
     timestamp: datetime
     files: List[FileInfo]
     references: List[SymbolReference]
+    # Paths of files left as they are in the graph by an incremental index
+    unchanged_files: List[str] = field(default_factory=list)
 
     @property
     def total_symbols(self) -> int:
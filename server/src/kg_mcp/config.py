@@ -4,7 +4,7 @@ Uses pydantic-settings for environment variable handling.
 """
 
 from functools import lru_cache
-from typing import List
+from typing import Dict, List, Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -53,8 +53,207 @@ class Settings(BaseSettings):
     kg_model_fast: str = Field(default="", description="Fast model for high-throughput")
     kg_model_reason: str = Field(default="", description="Reasoning model for complex tasks")
 
+    # Model Routing (extractions at or above any of these go to kg_model_reason)
+    kg_route_reason_chars: int = Field(default=2000, description="Message length in characters")
+    kg_route_reason_diff_chars: int = Field(default=4000, description="Diff length in characters")
+    kg_route_reason_files: int = Field(default=15, description="Number of files involved")
+    kg_route_reason_items: int = Field(
+        default=5, description="Bulleted or numbered lines in the message"
+    )
+
     llm_temperature: float = Field(default=0.2, description="LLM temperature for extraction")
     llm_max_tokens: int = Field(default=4096, description="Maximum tokens for LLM response")
+    llm_stream: bool = Field(
+        default=False,
+        description=(
+            "Stream extractions to callers of extract_entities that pass on_entity"
+        ),
+    )
+    llm_diff_max_tokens: int = Field(
+        default=1000, description="Approximate tokens of a summarized diff in the extractor prompt"
+    )
+    llm_prompt_max_tokens: int = Field(
+        default=6000,
+        description="Approximate tokens of an extractor or linker prompt's content (0 = unbounded)",
+    )
+
+    # Extraction Cache
+    llm_cache_enabled: bool = Field(
+        default=True, description="Reuse results of identical extractions"
+    )
+    llm_cache_max_entries: int = Field(default=512, description="Extractions kept in memory")
+    llm_cache_ttl: float = Field(
+        default=86400.0, description="Seconds a cached extraction stays valid (0 = no expiry)"
+    )
+    llm_cache_path: str = Field(
+        default="", description="SQLite file for the on-disk extraction cache (empty = memory only)"
+    )
+    llm_cache_disk_max_entries: int = Field(default=10000, description="Extractions kept on disk")
+
+    # Provider Failover (LLM_MODE=both)
+    llm_failure_threshold: int = Field(
+        default=5, description="Consecutive provider failures that open its circuit"
+    )
+    llm_circuit_reset_timeout: float = Field(
+        default=30.0, description="Seconds an open circuit waits before a trial request"
+    )
+    llm_failover_latency_ratio: float = Field(
+        default=2.0,
+        description="Prefer the secondary once the primary is this many times slower",
+    )
+    llm_failover_latency_ttl: float = Field(
+        default=60.0,
+        description="Seconds after which a provider's latency is forgotten and it is retried",
+    )
+    llm_health_check_interval: float = Field(
+        default=15.0, description="Seconds between health probes of failing providers (0 = off)"
+    )
+
+    # Hedged Extraction
+    llm_hedge_enabled: bool = Field(
+        default=False, description="Send a backup request when an extraction is slow"
+    )
+    llm_hedge_percentile: float = Field(
+        default=95.0, description="Recent latency percentile after which the backup is sent"
+    )
+    llm_hedge_min_delay: float = Field(
+        default=2.0, description="Minimum seconds before a backup request is sent"
+    )
+    llm_hedge_min_samples: int = Field(
+        default=20, description="Extractions observed before the percentile is used"
+    )
+
+    # Extraction Micro-batching
+    llm_batch_window_ms: float = Field(
+        default=0.0,
+        description="Milliseconds concurrent extractions wait to share one request (0 = disabled)",
+    )
+    llm_batch_max_size: int = Field(default=4, description="Extractions packed into one request")
+    llm_batch_max_tokens: int = Field(
+        default=8192, description="Output token cap of a batched extraction request"
+    )
+
+    # Rate Limiting
+    llm_rate_limit_rpm: float = Field(
+        default=0.0, description="Requests per minute per model (0 = unlimited)"
+    )
+    llm_max_concurrency: int = Field(default=8, description="Requests in flight per model")
+    llm_rate_limits: Dict[str, Dict[str, float]] = Field(
+        default_factory=dict,
+        description=(
+            'Per-model overrides, e.g. {"gemini/gemini-2.5-flash": {"rpm": 60, "concurrency": 4}}'
+        ),
+    )
+    llm_max_retries: int = Field(default=3, description="Retries of a request rejected with 429")
+    llm_backoff_base: float = Field(
+        default=0.5, description="First retry delay in seconds when no Retry-After is given"
+    )
+    llm_backoff_max: float = Field(default=30.0, description="Longest retry delay in seconds")
+
+    # HTTP Connections
+    llm_http2: bool = Field(
+        default=True, description="Use HTTP/2 for LLM calls when h2 is installed"
+    )
+    llm_http_max_connections: int = Field(
+        default=20, description="Pooled connections to LLM endpoints"
+    )
+    llm_http_keepalive: float = Field(
+        default=120.0, description="Seconds an idle LLM connection is kept open"
+    )
+    llm_http_timeout: float = Field(
+        default=120.0, description="Seconds to wait for an LLM response"
+    )
+    llm_http_warm_up: bool = Field(
+        default=True, description="Connect to the LLM endpoints at server startup"
+    )
+
+    # Ingest Configuration
+    kg_bulk_commit: bool = Field(
+        default=False,
+        description="Commit extractions with batched UNWIND statements in one transaction",
+    )
+
+    kg_ingest_mode: Literal["sync", "deferred"] = Field(
+        default="sync",
+        description="'sync' ingests before kg_autopilot returns; 'deferred' queues it",
+    )
+    kg_ingest_workers: int = Field(default=2, description="Deferred ingests run concurrently")
+    kg_ingest_queue_size: int = Field(default=100, description="Deferred ingests that may wait")
+    kg_ingest_enqueue_timeout: float = Field(
+        default=2.0,
+        description="Seconds to wait for queue space before ingesting inline",
+    )
+    kg_ingest_drain_timeout: float = Field(
+        default=30.0,
+        description="Seconds to finish queued ingests on shutdown",
+    )
+
+    kg_ingest_journal_path: str = Field(
+        default="",
+        description="SQLite journal of pending ingests, replayed at startup (empty = disabled)",
+    )
+    kg_ingest_max_attempts: int = Field(
+        default=3,
+        description="Times an interrupted ingest is replayed before it is marked failed",
+    )
+
+    kg_link_fast_path: bool = Field(
+        default=True,
+        description=(
+            "Resolve exact goal title matches locally and skip linking when nothing can merge"
+        ),
+    )
+
+    kg_dedup_enabled: bool = Field(
+        default=True,
+        description="Merge near-duplicate goals, constraints, strategies and pain points locally",
+    )
+    kg_dedup_threshold: float = Field(
+        default=0.8,
+        description="Trigram similarity at which an extracted entity is merged without the LLM",
+    )
+    kg_dedup_ambiguous_threshold: float = Field(
+        default=0.3,
+        description="Trigram similarity below which an extracted goal is treated as new",
+    )
+
+    kg_link_top_k: int = Field(
+        default=5,
+        description=(
+            "Most similar existing goals/preferences per extracted entity sent to the linker "
+            "(0 = all)"
+        ),
+    )
+
+    kg_symbol_batch_size: int = Field(
+        default=500,
+        description="Symbols sent per UNWIND statement by bulk symbol upserts",
+    )
+
+    # Code Indexer Configuration
+    kg_indexer_workers: int = Field(
+        default=0,
+        description="Processes used to read and parse files (0 = one per CPU)",
+    )
+    kg_indexer_chunk_size: int = Field(
+        default=64,
+        description="Files parsed per worker task and saved per transaction",
+    )
+
+    # Retrieval Configuration
+    kg_read_cache_ttl: float = Field(
+        default=30.0,
+        description="Seconds active goals, preferences and pain points stay cached (0 disables)",
+    )
+    kg_read_cache_max_entries: int = Field(
+        default=1024,
+        description="Maximum cached repository reads",
+    )
+
+    kg_context_branch_timeout: float = Field(
+        default=5.0,
+        description="Seconds each context-pack read may take before it is skipped",
+    )
 
     # MCP Server Configuration
     mcp_host: str = Field(default="127.0.0.1", description="MCP server host")
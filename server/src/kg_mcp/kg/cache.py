@@ -0,0 +1,80 @@
+"""
+In-process read-through cache for hot repository reads.
+
+Entries are tagged with a scope (e.g. ``("project_id", "p1")``) so writes can
+drop only the entries they may have made stale.
+"""
+
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+Scope = Tuple[str, Any]
+
+
+class ReadCache:
+    """
+    TTL + LRU cache with scoped invalidation and hit/miss counters.
+
+    Every invalidation bumps a generation counter. Readers capture the
+    generation before querying and pass it to `set`; results of reads that
+    overlapped a write are discarded instead of being cached stale.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.generation = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Scope, Any]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (found, value). Values are copies, so callers may mutate them."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self._misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return True, copy.deepcopy(entry[2])
+
+    def set(self, key: Hashable, scope: Scope, value: Any, generation: int) -> None:
+        """Store a value read at `generation`, unless a write happened since."""
+        if not self.enabled or generation != self.generation:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, scope, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, scopes: Optional[Iterable[Scope]] = None) -> None:
+        """Drop entries for the given scopes, or everything if none are given."""
+        self.generation += 1
+        self._invalidations += 1
+        if scopes is None:
+            self._entries.clear()
+            return
+
+        stale = set(scopes)
+        for key in [k for k, (_, scope, _) in self._entries.items() if scope in stale]:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size."""
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "invalidations": self._invalidations,
+            "entries": len(self._entries),
+        }
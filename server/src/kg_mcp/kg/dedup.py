@@ -0,0 +1,125 @@
+"""
+Local deduplication of extracted entities against the existing graph.
+
+Each extracted goal, constraint, strategy and pain point is scored against
+the project's existing nodes of the same type by trigram similarity:
+
+- duplicate (>= duplicate_threshold): resolved locally, no LLM call
+- ambiguous (>= ambiguous_threshold): goals are handed to the linker LLM
+- new: written as a new node
+
+Numbers and version tokens veto a local merge: "Migrate to Python 3.11" and
+"Migrate to Python 3.12" score high but are at most ambiguous. Extracted
+text is never rewritten; duplicates of the other types are written onto the
+existing node by ID, which keeps its own text.
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from kg_mcp.kg.similarity import trigram_similarity
+from kg_mcp.llm.schemas import ExtractionResult, GoalExtract, MergeSuggestion
+
+logger = logging.getLogger(__name__)
+
+# Numbers and version-like tokens ("3.11", "v2", "1-0-4"), compared verbatim
+_VERSION_TOKEN = re.compile(r"\d+(?:[._-]\d+)*")
+
+
+def version_tokens(text: str) -> Tuple[str, ...]:
+    """Numbers and version tokens of `text`, which must match for a local merge."""
+    return tuple(_VERSION_TOKEN.findall(text))
+
+
+@dataclass
+class DedupResult:
+    """Outcome of deduplicating one extraction."""
+
+    goal_merges: List[MergeSuggestion] = field(default_factory=list)
+    # Goals that may duplicate an existing one; the linker decides
+    ambiguous_goals: List[GoalExtract] = field(default_factory=list)
+    # Node type -> extracted text -> ID of the existing node it duplicates,
+    # for constraints, strategies and pain points
+    duplicates: Dict[str, Dict[str, str]] = field(default_factory=dict)
+
+    @property
+    def resolved(self) -> int:
+        return len(self.goal_merges) + sum(len(d) for d in self.duplicates.values())
+
+
+class DedupEngine:
+    """Resolves obvious duplicates locally and flags ambiguous goals."""
+
+    def __init__(self, duplicate_threshold: float = 0.8, ambiguous_threshold: float = 0.3):
+        self.duplicate_threshold = duplicate_threshold
+        self.ambiguous_threshold = ambiguous_threshold
+
+    def best_match(
+        self, text: str, candidates: List[Dict[str, Any]]
+    ) -> Tuple[Optional[Dict[str, Any]], float, bool]:
+        """
+        Return the most similar candidate ({"id", "text"}), its score, and
+        whether it is close enough to merge without the linker.
+        """
+        best: Optional[Dict[str, Any]] = None
+        best_score, best_mergeable = 0.0, False
+        tokens = version_tokens(text)
+        for candidate in candidates:
+            score = trigram_similarity(text, candidate["text"])
+            mergeable = (
+                score >= self.duplicate_threshold
+                and version_tokens(candidate["text"]) == tokens
+            )
+            if (mergeable, score) > (best_mergeable, best_score):
+                best, best_score, best_mergeable = candidate, score, mergeable
+        return best, best_score, best_mergeable
+
+    def resolve(
+        self,
+        extraction: ExtractionResult,
+        existing: Dict[str, List[Dict[str, Any]]],
+    ) -> DedupResult:
+        """
+        Deduplicate an extraction against existing node texts.
+
+        Args:
+            extraction: Entities extracted from the current message
+            existing: Node type -> [{"id", "text"}] (see KGRepository.get_entity_texts)
+
+        Returns:
+            DedupResult with goal merges, ambiguous goals and other duplicates
+        """
+        result = DedupResult()
+
+        for goal in extraction.goals:
+            match, score, mergeable = self.best_match(goal.title, existing.get("Goal", []))
+            if match is not None and mergeable:
+                result.goal_merges.append(
+                    MergeSuggestion(
+                        new_entity_type="Goal",
+                        new_entity_title=goal.title,
+                        existing_entity_id=match["id"],
+                        existing_entity_title=match["text"],
+                        confidence=score,
+                        reason="Near-identical title",
+                    )
+                )
+            elif score >= self.ambiguous_threshold:
+                result.ambiguous_goals.append(goal)
+
+        for node_type, texts in (
+            ("Constraint", [c.description for c in extraction.constraints]),
+            ("Strategy", [s.title for s in extraction.strategies]),
+            ("PainPoint", [pp.description for pp in extraction.pain_points]),
+        ):
+            for text in texts:
+                match, score, mergeable = self.best_match(text, existing.get(node_type, []))
+                if match is not None and mergeable:
+                    logger.debug(f"{node_type} '{text}' duplicates '{match['text']}' ({score:.2f})")
+                    result.duplicates.setdefault(node_type, {})[text] = match["id"]
+
+        if result.resolved:
+            logger.info(f"Resolved {result.resolved} duplicates locally")
+        return result
@@ -3,12 +3,18 @@ Ingest pipeline for processing user requests.
 Orchestrates LLM extraction, linking, and Neo4j commit.
 """
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
 
+from kg_mcp.config import get_settings
 from kg_mcp.llm.client import get_llm_client
-from kg_mcp.llm.schemas import ExtractionResult, LinkingResult
+from kg_mcp.llm.schemas import ExtractionResult, GoalExtract, LinkingResult, MergeSuggestion
+from kg_mcp.kg.dedup import DedupEngine
+from kg_mcp.kg.journal import get_ingest_journal
 from kg_mcp.kg.repo import get_repository
+from kg_mcp.kg.similarity import normalize_text
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +23,14 @@ class IngestPipeline:
     """Pipeline for ingesting user interactions into the knowledge graph."""
 
     def __init__(self):
+        self.settings = get_settings()
         self.llm = get_llm_client()
         self.repo = get_repository()
+        self.journal = get_ingest_journal()
+        self.dedup = DedupEngine(
+            duplicate_threshold=self.settings.kg_dedup_threshold,
+            ambiguous_threshold=self.settings.kg_dedup_ambiguous_threshold,
+        )
 
     async def process_message(
         self,
@@ -29,6 +41,8 @@ class IngestPipeline:
         diff: Optional[str] = None,
         symbols: Optional[List[str]] = None,
         tags: Optional[List[str]] = None,
+        interaction_id: Optional[str] = None,
+        journaled: bool = False,
     ) -> Dict[str, Any]:
         """
         Process a user message through the full pipeline.
@@ -41,31 +55,84 @@ class IngestPipeline:
             diff: Optional code diff
             symbols: Optional list of code symbols
             tags: Optional tags for this interaction
+            interaction_id: Optional pre-assigned ID for the interaction node
+            journaled: The caller already recorded the message as pending in
+                the journal (IngestQueue does so when it accepts it)
 
         Returns:
             Dict containing interaction_id, extracted entities, and created entity IDs
         """
         logger.info(f"Processing message for project {project_id}")
+        if self.journal is None:
+            return await self._process_message(
+                project_id, user_text, user_id, files, diff, symbols, tags, interaction_id
+            )
 
-        # Step 0: Ensure project exists
-        await self.repo.get_or_create_project(project_id)
+        # Journal the message before any LLM work, so it can be replayed if the
+        # process dies before the commit
+        interaction_id = interaction_id or str(uuid4())
+        if not journaled:
+            await self.journal.record_pending(
+                interaction_id,
+                {
+                    "project_id": project_id,
+                    "user_text": user_text,
+                    "user_id": user_id,
+                    "files": files,
+                    "diff": diff,
+                    "symbols": symbols,
+                    "tags": tags,
+                },
+            )
+        try:
+            result = await self._process_message(
+                project_id, user_text, user_id, files, diff, symbols, tags, interaction_id
+            )
+        except Exception as e:
+            await self.journal.record_failed(interaction_id, str(e))
+            raise
+        await self.journal.record_done(interaction_id)
+        return result
 
-        # Step 1: Create interaction record
-        interaction = await self.repo.create_interaction(
-            project_id=project_id,
-            user_text=user_text,
-            tags=tags,
-        )
-        interaction_id = interaction["id"]
-        logger.info(f"Created interaction {interaction_id}")
-
-        # Step 2: Extract entities using LLM
-        extraction = await self.llm.extract_entities(
-            user_text=user_text,
-            files=files,
-            diff=diff,
-            symbols=symbols,
-        )
+    async def _process_message(
+        self,
+        project_id: str,
+        user_text: str,
+        user_id: str,
+        files: Optional[List[str]],
+        diff: Optional[str],
+        symbols: Optional[List[str]],
+        tags: Optional[List[str]],
+        interaction_id: Optional[str],
+    ) -> Dict[str, Any]:
+        """Extract, link and commit one message (see process_message)."""
+
+        # Step 1: Extract entities using LLM while the reads needed for linking
+        # run alongside it; none of them depend on the extraction result.
+        # Nothing is written until the whole extraction has been validated,
+        # so every write happens in the single unit of work below
+        try:
+            async with asyncio.TaskGroup() as tg:
+                extraction_task = tg.create_task(
+                    self.llm.extract_entities(
+                        user_text=user_text, files=files, diff=diff, symbols=symbols
+                    )
+                )
+                goals_task = tg.create_task(self.repo.get_all_goals(project_id))
+                texts_task = (
+                    tg.create_task(self.repo.get_entity_texts(project_id))
+                    if self.settings.kg_dedup_enabled
+                    else None
+                )
+                preferences_task = tg.create_task(self.repo.get_preferences(user_id))
+                recent_task = tg.create_task(
+                    self.repo.get_recent_interactions(project_id, limit=5)
+                )
+        except ExceptionGroup as eg:
+            # Surface the original error, as the sequential pipeline did
+            raise eg.exceptions[0] from eg
+
+        extraction = extraction_task.result()
         logger.info(
             f"Extracted: {len(extraction.goals)} goals, "
             f"{len(extraction.constraints)} constraints, "
@@ -74,31 +141,76 @@ class IngestPipeline:
             f"{len(extraction.strategies)} strategies"
         )
 
-        # Step 3: Get existing entities for linking
-        existing_goals = await self.repo.get_all_goals(project_id)
-        existing_preferences = await self.repo.get_preferences(user_id)
-        recent_interactions = await self.repo.get_recent_interactions(project_id, limit=5)
-
-        # Step 4: Link entities using LLM
-        linking = await self.llm.link_entities(
-            extraction=extraction,
-            existing_goals=existing_goals,
-            existing_preferences=existing_preferences,
-            recent_interactions=recent_interactions,
-        )
+        # Step 2: Existing entities for linking
+        existing_goals = goals_task.result()
+        existing_preferences = preferences_task.result()
+        recent_interactions = recent_task.result()
+
+        # Step 3: Link entities. Only goal merges change what gets written, so
+        # goals are resolved locally where possible: near-duplicates by the
+        # DedupEngine (which also maps duplicate constraints, strategies and
+        # pain points onto existing nodes), exact titles by the fast path. The
+        # LLM is asked only when the remaining goals could still duplicate an
+        # existing one
+        local_merges: List[MergeSuggestion] = []
+        duplicates: Dict[str, Dict[str, str]] = {}
+        link_extraction: Optional[ExtractionResult] = extraction
+        if texts_task is not None or self.settings.kg_link_fast_path:
+            goals_to_link = extraction.goals
+            if texts_task is not None:
+                dedup = self.dedup.resolve(extraction, texts_task.result())
+                local_merges += dedup.goal_merges
+                duplicates = dedup.duplicates
+                goals_to_link = dedup.ambiguous_goals
+            if self.settings.kg_link_fast_path:
+                exact_merges, goals_to_link = self._match_existing_goals(
+                    goals_to_link, existing_goals
+                )
+                local_merges += exact_merges
+            link_extraction = None
+            if goals_to_link and existing_goals:
+                link_extraction = extraction.model_copy(update={"goals": goals_to_link})
+
+        if link_extraction is not None:
+            linking = await self.llm.link_entities(
+                extraction=link_extraction,
+                existing_goals=existing_goals,
+                existing_preferences=existing_preferences,
+                recent_interactions=recent_interactions,
+            )
+        else:
+            logger.info("Skipping LLM linking: nothing left to merge")
+            linking = LinkingResult()
+        linking.merge_suggestions.extend(local_merges)
         logger.info(
             f"Linking: {len(linking.merge_suggestions)} merges, "
             f"{len(linking.relationships)} relationships"
         )
 
-        # Step 5: Commit to Neo4j
-        created_entities = await self._commit_to_graph(
-            project_id=project_id,
-            user_id=user_id,
-            interaction_id=interaction_id,
-            extraction=extraction,
-            linking=linking,
-        )
+        # Step 4: Write project, interaction and entities as one unit of work,
+        # so a failure never leaves a half-written interaction behind
+        async def write() -> Tuple[str, Dict[str, List[str]]]:
+            await self.repo.get_or_create_project(project_id)
+
+            interaction = await self.repo.create_interaction(
+                project_id=project_id,
+                user_text=user_text,
+                tags=tags,
+                interaction_id=interaction_id,
+            )
+            logger.info(f"Created interaction {interaction['id']}")
+
+            created = await self._commit_to_graph(
+                project_id=project_id,
+                user_id=user_id,
+                interaction_id=interaction["id"],
+                extraction=extraction,
+                linking=linking,
+                duplicates=duplicates,
+            )
+            return interaction["id"], created
+
+        interaction_id, created_entities = await self.repo.run_transaction(write)
 
         return {
             "interaction_id": interaction_id,
@@ -115,12 +227,28 @@ class IngestPipeline:
         interaction_id: str,
         extraction: ExtractionResult,
         linking: LinkingResult,
+        duplicates: Optional[Dict[str, Dict[str, str]]] = None,
     ) -> Dict[str, List[str]]:
         """
         Commit extracted entities to Neo4j.
 
+        `duplicates` maps node type -> extracted text -> ID of the existing
+        constraint, strategy or pain point it duplicates (see DedupEngine);
+        those are written onto the existing node.
+
         Returns dict of entity type -> list of created IDs.
         """
+        duplicates = duplicates or {}
+        if self.settings.kg_bulk_commit:
+            return await self._commit_to_graph_bulk(
+                project_id=project_id,
+                user_id=user_id,
+                interaction_id=interaction_id,
+                extraction=extraction,
+                linking=linking,
+                duplicates=duplicates,
+            )
+
         created = {
             "goals": [],
             "constraints": [],
@@ -131,14 +259,7 @@ class IngestPipeline:
         }
 
         # Process merge suggestions first to build ID mapping
-        merge_map: Dict[str, str] = {}  # new_title -> existing_id
-        for merge in linking.merge_suggestions:
-            if merge.confidence >= 0.7:
-                merge_map[merge.new_entity_title] = merge.existing_entity_id
-                logger.info(
-                    f"Merging '{merge.new_entity_title}' into existing "
-                    f"'{merge.existing_entity_title}'"
-                )
+        merge_map = self._build_merge_map(linking)
 
         # Create/update goals
         goal_id_map: Dict[str, str] = {}  # title -> id
@@ -176,6 +297,7 @@ class IngestPipeline:
                 description=constraint_extract.description,
                 severity=constraint_extract.severity,
                 goal_id=related_goal_id,
+                existing_id=duplicates.get("Constraint", {}).get(constraint_extract.description),
             )
             created["constraints"].append(constraint["id"])
 
@@ -201,6 +323,7 @@ class IngestPipeline:
                 severity=pp_extract.severity,
                 related_goal_id=related_goal_id,
                 interaction_id=interaction_id,
+                existing_id=duplicates.get("PainPoint", {}).get(pp_extract.description),
             )
             created["pain_points"].append(pp["id"])
 
@@ -218,6 +341,7 @@ class IngestPipeline:
                 outcome=strategy_extract.outcome,
                 outcome_reason=strategy_extract.outcome_reason,
                 related_goal_id=related_goal_id,
+                existing_id=duplicates.get("Strategy", {}).get(strategy_extract.title),
             )
             created["strategies"].append(strategy["id"])
 
@@ -240,6 +364,141 @@ class IngestPipeline:
         logger.info(f"Committed to graph: {created}")
         return created
 
+    async def _commit_to_graph_bulk(
+        self,
+        project_id: str,
+        user_id: str,
+        interaction_id: str,
+        extraction: ExtractionResult,
+        linking: LinkingResult,
+        duplicates: Dict[str, Dict[str, str]],
+    ) -> Dict[str, List[str]]:
+        """
+        Commit extracted entities with batched UNWIND statements.
+
+        Same graph outcome as the per-entity path, but one statement per entity
+        type inside a single write transaction instead of one or more
+        round-trips per entity.
+        """
+        merge_map = self._build_merge_map(linking)
+        goal_titles = list(dict.fromkeys(g.title for g in extraction.goals))
+        # Constraints attach to the first extracted goal, code references to the
+        # first three (same as the per-entity path)
+        first_goal_title = goal_titles[0] if goal_titles else None
+
+        created: Dict[str, List[str]] = await self.repo.commit_extraction_bulk(
+            project_id=project_id,
+            user_id=user_id,
+            interaction_id=interaction_id,
+            goals=[
+                {
+                    "title": g.title,
+                    "description": g.description,
+                    "status": g.status,
+                    "priority": g.priority,
+                }
+                for g in extraction.goals
+                if g.title not in merge_map
+            ],
+            merged_goals={
+                g.title: merge_map[g.title] for g in extraction.goals if g.title in merge_map
+            },
+            constraints=[
+                {
+                    "type": c.type,
+                    "description": c.description,
+                    "severity": c.severity,
+                    "goal_title": first_goal_title,
+                    "existing_id": duplicates.get("Constraint", {}).get(c.description),
+                }
+                for c in extraction.constraints
+            ],
+            preferences=[
+                {"category": p.category, "preference": p.preference, "strength": p.strength}
+                for p in extraction.preferences
+            ],
+            pain_points=[
+                {
+                    "description": pp.description,
+                    "severity": pp.severity,
+                    "goal_title": pp.related_goal,
+                    "existing_id": duplicates.get("PainPoint", {}).get(pp.description),
+                }
+                for pp in extraction.pain_points
+            ],
+            strategies=[
+                {
+                    "title": s.title,
+                    "approach": s.approach,
+                    "rationale": s.rationale,
+                    "outcome": s.outcome,
+                    "outcome_reason": s.outcome_reason,
+                    "goal_title": s.related_goal,
+                    "existing_id": duplicates.get("Strategy", {}).get(s.title),
+                }
+                for s in extraction.strategies
+            ],
+            code_artifacts=[
+                {
+                    "path": cr.path,
+                    "kind": "file",
+                    "symbol_fqn": cr.symbol,
+                    "start_line": cr.start_line,
+                    "end_line": cr.end_line,
+                    "goal_titles": goal_titles[:3],
+                }
+                for cr in extraction.code_references
+            ],
+        )
+
+        logger.info(f"Committed to graph (bulk): {created}")
+        return created
+
+    def _match_existing_goals(
+        self,
+        goals: List[GoalExtract],
+        existing_goals: List[Dict[str, Any]],
+    ) -> Tuple[List[MergeSuggestion], List[GoalExtract]]:
+        """
+        Resolve extracted goals whose normalized title matches an existing goal.
+
+        Returns (merge suggestions for matched goals, goals left unmatched).
+        """
+        existing_by_title = {
+            normalize_text(g["title"]): g for g in existing_goals if g.get("title")
+        }
+
+        merges: List[MergeSuggestion] = []
+        unmatched: List[GoalExtract] = []
+        for goal in goals:
+            existing = existing_by_title.get(normalize_text(goal.title))
+            if existing is None:
+                unmatched.append(goal)
+                continue
+            merges.append(
+                MergeSuggestion(
+                    new_entity_type="Goal",
+                    new_entity_title=goal.title,
+                    existing_entity_id=existing["id"],
+                    existing_entity_title=existing["title"],
+                    confidence=1.0,
+                    reason="Same normalized title",
+                )
+            )
+        return merges, unmatched
+
+    def _build_merge_map(self, linking: LinkingResult) -> Dict[str, str]:
+        """Map new entity titles to existing IDs for confident merge suggestions."""
+        merge_map: Dict[str, str] = {}  # new_title -> existing_id
+        for merge in linking.merge_suggestions:
+            if merge.confidence >= 0.7:
+                merge_map[merge.new_entity_title] = merge.existing_entity_id
+                logger.info(
+                    f"Merging '{merge.new_entity_title}' into existing "
+                    f"'{merge.existing_entity_title}'"
+                )
+        return merge_map
+
 
 # Factory function
 _pipeline: Optional[IngestPipeline] = None
@@ -0,0 +1,232 @@
+"""
+Deferred ingest: a bounded queue of messages processed by background workers.
+
+With KG_INGEST_MODE=deferred, kg_autopilot enqueues the message and returns
+the context pack right away; the interaction id it returns can be polled via
+the interaction status resource.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from kg_mcp.config import get_settings
+from kg_mcp.kg.ingest import IngestPipeline, get_ingest_pipeline
+from kg_mcp.kg.journal import get_ingest_journal
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs whose status is kept for polling
+STATUS_HISTORY = 1000
+
+# Backoff between replay resubmits while the queue stays full (seconds)
+REPLAY_RETRY_BASE_DELAY = 0.5
+REPLAY_RETRY_MAX_DELAY = 10.0
+
+
+class IngestQueue:
+    """
+    Bounded asyncio queue served by a fixed number of ingest workers.
+
+    Args:
+        pipeline: Pipeline used to process messages
+        maxsize: Messages that may wait in the queue
+        workers: Messages processed concurrently
+        enqueue_timeout: Seconds `submit` waits for a free slot before
+            raising asyncio.QueueFull
+    """
+
+    def __init__(
+        self,
+        pipeline: Optional[IngestPipeline] = None,
+        maxsize: int = 100,
+        workers: int = 2,
+        enqueue_timeout: float = 2.0,
+    ):
+        self.pipeline = pipeline or get_ingest_pipeline()
+        self.workers = max(1, workers)
+        self.enqueue_timeout = enqueue_timeout
+        self.journal = get_ingest_journal()
+        self._queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=maxsize)
+        self._tasks: List[asyncio.Task[None]] = []
+        self._status: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._closed = False
+
+    async def submit(
+        self,
+        project_id: str,
+        user_text: str,
+        user_id: str = "default_user",
+        files: Optional[List[str]] = None,
+        diff: Optional[str] = None,
+        symbols: Optional[List[str]] = None,
+        tags: Optional[List[str]] = None,
+        interaction_id: Optional[str] = None,
+    ) -> str:
+        """
+        Enqueue a message for ingest and return its interaction id.
+
+        Waits up to `enqueue_timeout` while the queue is full, then raises
+        asyncio.QueueFull so the caller can ingest inline instead. With a
+        journal, the message is recorded before it is queued, so an accepted
+        message survives a crash or a timed out drain.
+        """
+        if self._closed:
+            raise RuntimeError("Ingest queue is shut down")
+        self._ensure_started()
+
+        interaction_id = interaction_id or str(uuid4())
+        job = {
+            "interaction_id": interaction_id,
+            "project_id": project_id,
+            "user_text": user_text,
+            "user_id": user_id,
+            "files": files,
+            "diff": diff,
+            "symbols": symbols,
+            "tags": tags,
+        }
+        if self.journal is not None:
+            await self.journal.record_pending(
+                interaction_id, {k: v for k, v in job.items() if k != "interaction_id"}
+            )
+        self._set_status(interaction_id, status="queued", project_id=project_id)
+        try:
+            await asyncio.wait_for(self._queue.put(job), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self._status.pop(interaction_id, None)
+            if self.journal is not None:
+                await self.journal.record_dropped(interaction_id, "ingest queue full")
+            raise asyncio.QueueFull() from None
+        return interaction_id
+
+    def status(self, interaction_id: str) -> Optional[Dict[str, Any]]:
+        """Status of a submitted message: queued, processing, done or failed."""
+        status = self._status.get(interaction_id)
+        return dict(status) if status is not None else None
+
+    def stats(self) -> Dict[str, int]:
+        """Queue depth and worker count."""
+        return {
+            "queued": self._queue.qsize(),
+            "maxsize": self._queue.maxsize,
+            "workers": len(self._tasks),
+        }
+
+    async def drain(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting messages, finish queued ones, then stop the workers."""
+        self._closed = True
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Ingest queue drain timed out with {self._queue.qsize()} messages left"
+                )
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _ensure_started(self) -> None:
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        for i in range(self.workers):
+            # A fresh context, so workers never inherit the submitting
+            # request's memo or transaction state
+            self._tasks.append(
+                loop.create_task(
+                    self._worker(), name=f"ingest-worker-{i}", context=contextvars.Context()
+                )
+            )
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            interaction_id = job["interaction_id"]
+            self._set_status(interaction_id, status="processing")
+            started = time.monotonic()
+            try:
+                result = await self.pipeline.process_message(
+                    **job, journaled=self.journal is not None
+                )
+                self._set_status(
+                    interaction_id,
+                    status="done",
+                    created_entities=result.get("created_entities", {}),
+                    duration_ms=round((time.monotonic() - started) * 1000),
+                )
+            except Exception as e:
+                logger.error(f"Deferred ingest of {interaction_id} failed: {e}")
+                self._set_status(interaction_id, status="failed", error=str(e))
+            finally:
+                self._queue.task_done()
+
+    def _set_status(self, interaction_id: str, **fields: Any) -> None:
+        status = self._status.setdefault(interaction_id, {"interaction_id": interaction_id})
+        status.update(fields)
+        self._status.move_to_end(interaction_id)
+        while len(self._status) > STATUS_HISTORY:
+            self._status.popitem(last=False)
+
+
+# Factory function
+_queue: Optional[IngestQueue] = None
+
+
+def get_ingest_queue() -> IngestQueue:
+    """Get or create the ingest queue singleton."""
+    global _queue
+    if _queue is None:
+        settings = get_settings()
+        _queue = IngestQueue(
+            maxsize=settings.kg_ingest_queue_size,
+            workers=settings.kg_ingest_workers,
+            enqueue_timeout=settings.kg_ingest_enqueue_timeout,
+        )
+    return _queue
+
+
+async def replay_journal() -> int:
+    """
+    Queue ingests the journal shows as interrupted.
+
+    Runs as a background task at startup: it waits for queue space for as
+    long as needed, and entries not yet resubmitted stay pending in the
+    journal if it is cancelled. Returns the number of ingests queued.
+    """
+    journal = get_ingest_journal()
+    if journal is None:
+        return 0
+
+    entries = await asyncio.to_thread(journal.pending)
+    await asyncio.to_thread(journal.compact)
+    if entries:
+        logger.info(f"Replaying {len(entries)} interrupted ingests")
+    queue = get_ingest_queue()
+    for entry in entries:
+        logger.info(f"Replaying interrupted ingest {entry['interaction_id']}")
+        # Wait for space rather than dropping a journaled message
+        delay = REPLAY_RETRY_BASE_DELAY
+        while True:
+            try:
+                await queue.submit(**entry)
+                break
+            except asyncio.QueueFull:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, REPLAY_RETRY_MAX_DELAY)
+    return len(entries)
+
+
+async def shutdown_ingest_queue() -> None:
+    """Drain the ingest queue, if one was started (call at shutdown)."""
+    global _queue
+    if _queue is not None:
+        await _queue.drain(timeout=get_settings().kg_ingest_drain_timeout)
+        _queue = None
@@ -0,0 +1,148 @@
+"""
+Durable, append-only journal of ingests (SQLite in WAL mode).
+
+Every ingest appends a `pending` event with its full payload when it is
+accepted (queued, or started inline), and a `done`, `failed` or `dropped`
+event when it finishes or is handed back to the caller. An interaction
+whose last event is `pending` was interrupted (e.g. the process died) and is
+replayed at startup.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from kg_mcp.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+DROPPED = "dropped"
+
+
+class IngestJournal:
+    """
+    Append-only ingest log.
+
+    Args:
+        path: SQLite file
+        max_attempts: Interrupted ingests replayed at most this many times
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3):
+        self.path = Path(path).expanduser()
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS ingest_journal ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "interaction_id TEXT NOT NULL, "
+            "event TEXT NOT NULL, "
+            "payload TEXT, "
+            "created_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS ingest_journal_interaction "
+            "ON ingest_journal (interaction_id, seq)"
+        )
+        self._db.commit()
+
+    async def record_pending(self, interaction_id: str, payload: Dict[str, Any]) -> None:
+        """Record an ingest that is about to start."""
+        await asyncio.to_thread(self._append, interaction_id, PENDING, json.dumps(payload))
+
+    async def record_done(self, interaction_id: str) -> None:
+        """Record an ingest that committed."""
+        await asyncio.to_thread(self._append, interaction_id, DONE, None)
+
+    async def record_failed(self, interaction_id: str, error: str) -> None:
+        """Record an ingest that raised; it is not replayed."""
+        await asyncio.to_thread(self._append, interaction_id, FAILED, json.dumps({"error": error}))
+
+    async def record_dropped(self, interaction_id: str, reason: str) -> None:
+        """Record an ingest that was not queued after all; it is not replayed."""
+        await asyncio.to_thread(
+            self._append, interaction_id, DROPPED, json.dumps({"reason": reason})
+        )
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """
+        Payloads of interrupted ingests, oldest first.
+
+        Entries interrupted `max_attempts` times are marked failed instead.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                """
+                SELECT j.interaction_id, j.payload,
+                       (SELECT COUNT(*) FROM ingest_journal a
+                        WHERE a.interaction_id = j.interaction_id AND a.event = ?) as attempts
+                FROM ingest_journal j
+                WHERE j.seq = (SELECT MAX(seq) FROM ingest_journal l
+                               WHERE l.interaction_id = j.interaction_id)
+                  AND j.event = ?
+                ORDER BY j.seq
+                """,
+                (PENDING, PENDING),
+            ).fetchall()
+
+        entries = []
+        for interaction_id, payload, attempts in rows:
+            if attempts >= self.max_attempts:
+                logger.error(f"Giving up on ingest {interaction_id} after {attempts} attempts")
+                self._append(interaction_id, FAILED, json.dumps({"error": "too many attempts"}))
+                continue
+            entries.append({**json.loads(payload), "interaction_id": interaction_id})
+        return entries
+
+    def compact(self) -> None:
+        """Drop the history of finished ingests."""
+        with self._lock, self._db:
+            self._db.execute(
+                """
+                DELETE FROM ingest_journal WHERE interaction_id IN (
+                    SELECT interaction_id FROM ingest_journal j
+                    WHERE j.seq = (SELECT MAX(seq) FROM ingest_journal l
+                                   WHERE l.interaction_id = j.interaction_id)
+                      AND j.event != ?
+                )
+                """,
+                (PENDING,),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _append(self, interaction_id: str, event: str, payload: Optional[str]) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO ingest_journal (interaction_id, event, payload, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (interaction_id, event, payload, time.time()),
+            )
+
+
+# Singleton instance
+_journal: Optional[IngestJournal] = None
+
+
+def get_ingest_journal() -> Optional[IngestJournal]:
+    """Get the ingest journal singleton, or None if KG_INGEST_JOURNAL_PATH is unset."""
+    global _journal
+    if _journal is None:
+        path = get_settings().kg_ingest_journal_path
+        if path:
+            _journal = IngestJournal(path, max_attempts=get_settings().kg_ingest_max_attempts)
+    return _journal
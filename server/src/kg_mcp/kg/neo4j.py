@@ -3,17 +3,47 @@ Neo4j driver and session management.
 Provides async-compatible driver wrapper with connection pooling.
 """
 
+import asyncio
 import logging
+import random
 from contextlib import asynccontextmanager
-from typing import Any, AsyncGenerator, Dict, List, Optional
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional, TypeVar, Union
 
-from neo4j import AsyncGraphDatabase, AsyncDriver, AsyncSession
-from neo4j.exceptions import ServiceUnavailable, Neo4jError
+from neo4j import (
+    AsyncGraphDatabase,
+    AsyncDriver,
+    AsyncManagedTransaction,
+    AsyncSession,
+    AsyncTransaction,
+)
+from neo4j.exceptions import DriverError, ServiceUnavailable, Neo4jError
 
 from kg_mcp.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Retries of a unit of work that failed on a transient error (e.g. DeadlockDetected)
+TX_MAX_RETRIES = 5
+TX_RETRY_BASE_DELAY = 0.1
+TX_RETRY_MAX_DELAY = 2.0
+
+
+@dataclass
+class _UnitOfWork:
+    """An open explicit transaction shared by every query in the current context."""
+
+    tx: AsyncTransaction
+    # A transaction cannot run statements concurrently; tasks spawned inside the
+    # unit of work inherit it and take turns.
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+_current_uow: ContextVar[Optional[_UnitOfWork]] = ContextVar("neo4j_unit_of_work", default=None)
+
 
 class Neo4jClient:
     """Async Neo4j client with connection management."""
@@ -67,6 +97,85 @@ class Neo4jClient:
         finally:
             await session.close()
 
+    @asynccontextmanager
+    async def transaction(self, database: str = "neo4j") -> AsyncGenerator[AsyncTransaction, None]:
+        """
+        Open an explicit write transaction (unit of work).
+
+        Every `execute_query`, `execute_write` and `execute_write_transaction`
+        call made inside the block joins this transaction instead of opening
+        its own. The transaction commits when the block exits and rolls back
+        if it raises. Nested blocks join the outermost transaction. The driver
+        does not retry explicit transactions; wrap the block in `run_with_retry`.
+
+        Args:
+            database: Target database name
+
+        Yields:
+            The underlying transaction
+        """
+        current = _current_uow.get()
+        if current is not None:
+            yield current.tx
+            return
+
+        if self._driver is None:
+            await self.connect()
+
+        async with self.session(database) as session:
+            tx = await session.begin_transaction()
+            token = _current_uow.set(_UnitOfWork(tx))
+            try:
+                yield tx
+            except BaseException:
+                await tx.rollback()
+                raise
+            else:
+                await tx.commit()
+            finally:
+                _current_uow.reset(token)
+
+    async def run_with_retry(
+        self,
+        work: Callable[[], Awaitable[T]],
+        max_retries: int = TX_MAX_RETRIES,
+    ) -> T:
+        """
+        Run `work`, which opens its own `transaction()`, again from the start
+        when it fails on a transient error (deadlock, leader switch, lost
+        connection), with jittered exponential backoff.
+
+        Auto-commit queries get this from the driver; explicit transactions do
+        not, so every unit of work should go through here. `work` must be safe
+        to repeat. Inside an open unit of work it runs once and the error goes
+        to the outermost caller, which retries the whole transaction.
+
+        Args:
+            work: Async callable running one unit of work
+            max_retries: Retries after the first attempt
+
+        Returns:
+            Whatever `work` returns
+        """
+        if _current_uow.get() is not None:
+            return await work()
+
+        attempt = 0
+        while True:
+            try:
+                return await work()
+            except (Neo4jError, DriverError) as e:
+                if attempt >= max_retries or not e.is_retryable():
+                    raise
+                attempt += 1
+                delay = min(TX_RETRY_MAX_DELAY, TX_RETRY_BASE_DELAY * 2**attempt)
+                delay *= random.uniform(0.5, 1.0)
+                logger.warning(
+                    f"Transaction failed on a transient error ({e}), "
+                    f"retry {attempt}/{max_retries} in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
     async def execute_query(
         self,
         query: str,
@@ -84,6 +193,15 @@ class Neo4jClient:
         Returns:
             List of records as dictionaries
         """
+        uow = _current_uow.get()
+        if uow is not None:
+            try:
+                async with uow.lock:
+                    return await self.run_in_transaction(uow.tx, query, parameters)
+            except Neo4jError as e:
+                logger.error(f"Query execution failed: {e}")
+                raise
+
         if self._driver is None:
             await self.connect()
 
@@ -115,20 +233,66 @@ class Neo4jClient:
         Returns:
             Summary with nodes/relationships created/modified counts
         """
+        uow = _current_uow.get()
+        if uow is not None:
+            async with uow.lock:
+                result = await uow.tx.run(query, parameters or {})
+                summary = await result.consume()
+        else:
+            if self._driver is None:
+                await self.connect()
+
+            async with self.session(database) as session:
+                result = await session.run(query, parameters or {})
+                summary = await result.consume()
+
+        return {
+            "nodes_created": summary.counters.nodes_created,
+            "nodes_deleted": summary.counters.nodes_deleted,
+            "relationships_created": summary.counters.relationships_created,
+            "relationships_deleted": summary.counters.relationships_deleted,
+            "properties_set": summary.counters.properties_set,
+        }
+
+    async def execute_write_transaction(
+        self,
+        work: Callable[[Union[AsyncManagedTransaction, AsyncTransaction]], Awaitable[T]],
+        database: str = "neo4j",
+    ) -> T:
+        """
+        Run a unit of work inside a single managed write transaction.
+
+        The driver retries `work` on transient errors, so it must be idempotent
+        (MERGE-based statements are). Inside `transaction()` the work joins the
+        open unit of work instead and is committed with it.
+
+        Args:
+            work: Async callable receiving the transaction
+            database: Target database name
+
+        Returns:
+            Whatever `work` returns
+        """
+        uow = _current_uow.get()
+        if uow is not None:
+            async with uow.lock:
+                return await work(uow.tx)
+
         if self._driver is None:
             await self.connect()
 
         async with self.session(database) as session:
-            result = await session.run(query, parameters or {})
-            summary = await result.consume()
-
-            return {
-                "nodes_created": summary.counters.nodes_created,
-                "nodes_deleted": summary.counters.nodes_deleted,
-                "relationships_created": summary.counters.relationships_created,
-                "relationships_deleted": summary.counters.relationships_deleted,
-                "properties_set": summary.counters.properties_set,
-            }
+            return await session.execute_write(work)
+
+    @staticmethod
+    async def run_in_transaction(
+        tx: Union[AsyncManagedTransaction, AsyncTransaction],
+        query: str,
+        parameters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Run a query on an open transaction and return results as a list of dicts."""
+        result = await tx.run(query, parameters or {})
+        return [dict(record) async for record in result]
 
 
 # Singleton instance
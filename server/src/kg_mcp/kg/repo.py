@@ -3,26 +3,258 @@ Repository layer for Neo4j queries.
 Provides typed query functions for CRUD operations on the knowledge graph.
 """
 
+import asyncio
+import functools
+import inspect
 import logging
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
 from uuid import uuid4
 
+from kg_mcp.config import get_settings
+from kg_mcp.kg.cache import ReadCache, Scope
 from kg_mcp.kg.neo4j import get_neo4j_client
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Node type -> fulltext index (see schema.cypher)
+FULLTEXT_INDEXES: Dict[str, str] = {
+    "Goal": "goal_fulltext",
+    "PainPoint": "painpoint_fulltext",
+    "Strategy": "strategy_fulltext",
+    "Decision": "decision_fulltext",
+    "CodeArtifact": "artifact_fulltext",
+    "Interaction": "interaction_fulltext",
+    "Symbol": "symbol_fulltext",
+}
+
+# Types searched when none are given; Interaction is left out because every
+# autopilot search would match the message that was just ingested
+DEFAULT_SEARCH_TYPES: List[str] = [t for t in FULLTEXT_INDEXES if t != "Interaction"]
+
+
+# Per-request memo of repository reads (see KGRepository.request_scope)
+_request_memo: ContextVar[Optional[Dict[Tuple[str, str], "asyncio.Future[Any]"]]] = ContextVar(
+    "kg_request_memo", default=None
+)
+
+
+def memoized_read(method: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Execute identical reads only once inside a request scope.
+
+    Calls are keyed by method name and bound arguments (defaults applied), so
+    positional and keyword spellings share an entry. Concurrent identical
+    calls await the same in-flight query. Outside a request scope this is a
+    no-op.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        memo = _request_memo.get()
+        if memo is None:
+            return await method(self, *args, **kwargs)
+
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (method.__name__, repr(list(bound.arguments.items())[1:]))
+
+        future = memo.get(key)
+        if future is None:
+            future = asyncio.ensure_future(method(self, *args, **kwargs))
+            memo[key] = future
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            memo.pop(key, None)
+            raise
+
+    return wrapper
+
+
+# While an explicit transaction is open (see KGRepository.transaction), the
+# cache scopes its writes touched; None in the set stands for "everything"
+_transaction_scopes: ContextVar[Optional[Set[Optional[Scope]]]] = ContextVar(
+    "kg_transaction_scopes", default=None
+)
+
+# Arguments that identify the cache scope touched by a read or write
+CACHE_SCOPE_ARGS = ("project_id", "user_id")
+
+
+def cached_read(scope_arg: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Serve a read from the repository's TTL cache across requests.
+
+    Entries are scoped by the value of `scope_arg`, so writes touching that
+    project or user invalidate them. Reads inside an open transaction bypass
+    the cache, since they may see uncommitted data.
+    """
+
+    def decorator(method: Callable[..., Any]) -> Callable[..., Any]:
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            cache = self.read_cache
+            if not cache.enabled or _transaction_scopes.get() is not None:
+                return await method(self, *args, **kwargs)
+
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = (method.__name__, repr(list(bound.arguments.items())[1:]))
+
+            found, value = cache.get(key)
+            if found:
+                return value
+
+            generation = cache.generation
+            value = await method(self, *args, **kwargs)
+            cache.set(key, (scope_arg, bound.arguments[scope_arg]), value, generation)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def write(method: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Mark a repository method as a write.
+
+    Clears the request memo and invalidates cached reads for the project/user
+    the write touches (everything, if it names neither).
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        memo = _request_memo.get()
+        if memo is not None:
+            memo.clear()
+
+        bound = signature.bind(self, *args, **kwargs)
+        scopes = [
+            (name, bound.arguments[name]) for name in CACHE_SCOPE_ARGS if name in bound.arguments
+        ]
+        self.read_cache.invalidate(scopes or None)
+        touched = _transaction_scopes.get()
+        if touched is not None and scopes:
+            touched.update(scopes)
+        elif touched is not None:
+            touched.add(None)
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            # Reads that started after the first invalidation may have cached
+            # pre-write data
+            self.read_cache.invalidate(scopes or None)
+
+    return wrapper
+
+
+def _symbol_name(fqn: str) -> str:
+    """Extract the short symbol name from a fully qualified name."""
+    return fqn.split(":")[-1] if ":" in fqn else fqn.split(".")[-1] if "." in fqn else fqn
+
 
 class KGRepository:
     """Repository for knowledge graph operations."""
 
-    def __init__(self):
+    def __init__(self) -> None:
         self.client = get_neo4j_client()
+        settings = get_settings()
+        self.read_cache = ReadCache(
+            ttl=settings.kg_read_cache_ttl,
+            max_entries=settings.kg_read_cache_max_entries,
+        )
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        """
+        Run repository calls inside one explicit write transaction.
+
+        Usage:
+            async with repo.transaction():
+                await repo.create_interaction(...)
+                await repo.upsert_goal(...)
+
+        Everything inside the block commits once on exit, or rolls back if
+        the block raises. Nested blocks join the outer transaction.
+        """
+        if _transaction_scopes.get() is not None:
+            async with self.client.transaction():
+                yield
+            return
+
+        touched: Set[Optional[Scope]] = set()
+        token = _transaction_scopes.set(touched)
+        try:
+            async with self.client.transaction():
+                yield
+        finally:
+            _transaction_scopes.reset(token)
+            # Other requests may have cached reads of the touched scopes
+            # taken before the commit
+            if None in touched:
+                self.read_cache.invalidate()
+            elif touched:
+                self.read_cache.invalidate(scope for scope in touched if scope is not None)
+
+    async def run_transaction(self, work: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `work` inside `transaction()`, retrying the whole unit of work on
+        transient errors such as deadlocks between concurrent writers (see
+        Neo4jClient.run_with_retry). `work` must be safe to run again.
+        """
+
+        async def attempt() -> T:
+            async with self.transaction():
+                return await work()
+
+        return await self.client.run_with_retry(attempt)
+
+    @contextmanager
+    def request_scope(self) -> Iterator[None]:
+        """
+        Memoize identical reads for the duration of one tool invocation.
+
+        Inside the block, repeated calls to read methods with the same
+        arguments hit Neo4j once. Any write clears the memo so later reads see
+        fresh data. Nested scopes share the outer memo.
+        """
+        if _request_memo.get() is not None:
+            yield
+            return
+
+        token = _request_memo.set({})
+        try:
+            yield
+        finally:
+            _request_memo.reset(token)
 
     # =========================================================================
     # Project Operations
     # =========================================================================
 
+    @write
     async def get_or_create_project(self, project_id: str, name: Optional[str] = None) -> Dict[str, Any]:
         """Get or create a project node."""
         query = """
@@ -45,27 +277,28 @@ class KGRepository:
     # Interaction Operations
     # =========================================================================
 
+    @write
     async def create_interaction(
         self,
         project_id: str,
         user_text: str,
         assistant_text: Optional[str] = None,
         tags: Optional[List[str]] = None,
+        interaction_id: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Create a new interaction node."""
-        interaction_id = str(uuid4())
+        """Create a new interaction node (idempotent for a given interaction_id)."""
+        interaction_id = interaction_id or str(uuid4())
         query = """
         MATCH (p:Project {id: $project_id})
-        CREATE (i:Interaction {
-            id: $interaction_id,
-            user_text: $user_text,
-            assistant_text: $assistant_text,
-            tags: $tags,
-            project_id: $project_id,
-            timestamp: datetime(),
-            created_at: datetime()
-        })
-        CREATE (i)-[:IN_PROJECT]->(p)
+        MERGE (i:Interaction {id: $interaction_id})
+        ON CREATE SET
+            i.user_text = $user_text,
+            i.assistant_text = $assistant_text,
+            i.tags = $tags,
+            i.project_id = $project_id,
+            i.timestamp = datetime(),
+            i.created_at = datetime()
+        MERGE (i)-[:IN_PROJECT]->(p)
         RETURN i {.*} as interaction
         """
         result = await self.client.execute_query(
@@ -80,6 +313,7 @@ class KGRepository:
         )
         return result[0]["interaction"] if result else {"id": interaction_id}
 
+    @memoized_read
     async def get_recent_interactions(
         self, project_id: str, limit: int = 10
     ) -> List[Dict[str, Any]]:
@@ -99,6 +333,7 @@ class KGRepository:
     # Goal Operations
     # =========================================================================
 
+    @write
     async def upsert_goal(
         self,
         project_id: str,
@@ -141,6 +376,8 @@ class KGRepository:
         )
         return result[0]["goal"] if result else {"id": goal_id, "title": title}
 
+    @memoized_read
+    @cached_read("project_id")
     async def get_active_goals(self, project_id: str) -> List[Dict[str, Any]]:
         """Get all active goals for a project."""
         query = """
@@ -163,6 +400,7 @@ class KGRepository:
         result = await self.client.execute_query(query, {"project_id": project_id})
         return [r["goal"] for r in result]
 
+    @memoized_read
     async def get_all_goals(self, project_id: str) -> List[Dict[str, Any]]:
         """Get all goals for a project."""
         query = """
@@ -173,6 +411,45 @@ class KGRepository:
         result = await self.client.execute_query(query, {"project_id": project_id})
         return [r["goal"] for r in result]
 
+    @memoized_read
+    @cached_read("project_id")
+    async def get_entity_texts(self, project_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get the merge-key text of every goal, constraint, strategy and pain point.
+
+        Returns node type -> [{"id", "text"}], where text is the property the
+        upsert for that type merges on (title or description).
+        """
+        query = """
+        CALL {
+            MATCH (n:Goal {project_id: $project_id})
+            RETURN 'Goal' as type, n.id as id, n.title as text
+            UNION ALL
+            MATCH (n:Constraint {project_id: $project_id})
+            RETURN 'Constraint' as type, n.id as id, n.description as text
+            UNION ALL
+            MATCH (n:Strategy {project_id: $project_id})
+            RETURN 'Strategy' as type, n.id as id, n.title as text
+            UNION ALL
+            MATCH (n:PainPoint {project_id: $project_id})
+            RETURN 'PainPoint' as type, n.id as id, n.description as text
+        }
+        RETURN type, id, text
+        """
+        result = await self.client.execute_query(query, {"project_id": project_id})
+
+        texts: Dict[str, List[Dict[str, Any]]] = {
+            "Goal": [],
+            "Constraint": [],
+            "Strategy": [],
+            "PainPoint": [],
+        }
+        for r in result:
+            if r["text"]:
+                texts[r["type"]].append({"id": r["id"], "text": r["text"]})
+        return texts
+
+    @write
     async def link_interaction_to_goal(
         self, interaction_id: str, goal_id: str
     ) -> None:
@@ -190,6 +467,7 @@ class KGRepository:
     # Constraint Operations
     # =========================================================================
 
+    @write
     async def upsert_constraint(
         self,
         project_id: str,
@@ -197,11 +475,21 @@ class KGRepository:
         description: str,
         severity: str = "must",
         goal_id: Optional[str] = None,
+        existing_id: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Upsert a constraint node."""
+        """
+        Upsert a constraint node.
+
+        With `existing_id` (a local duplicate, see DedupEngine), the existing
+        node is updated and keeps its own description.
+        """
         constraint_id = str(uuid4())
         query = """
-        MERGE (c:Constraint {project_id: $project_id, description: $description})
+        OPTIONAL MATCH (existing:Constraint {id: $existing_id})
+        MERGE (c:Constraint {
+            project_id: $project_id,
+            description: COALESCE(existing.description, $description)
+        })
         ON CREATE SET
             c.id = $constraint_id,
             c.type = $type,
@@ -221,6 +509,7 @@ class KGRepository:
                 "type": constraint_type,
                 "description": description,
                 "severity": severity,
+                "existing_id": existing_id,
             },
         )
         constraint = result[0]["constraint"] if result else {"id": constraint_id}
@@ -242,6 +531,7 @@ class KGRepository:
     # Preference Operations
     # =========================================================================
 
+    @write
     async def upsert_preference(
         self,
         user_id: str,
@@ -275,6 +565,8 @@ class KGRepository:
         )
         return result[0]["preference"] if result else {"id": preference_id}
 
+    @memoized_read
+    @cached_read("user_id")
     async def get_preferences(self, user_id: str) -> List[Dict[str, Any]]:
         """Get all preferences for a user."""
         query = """
@@ -289,6 +581,7 @@ class KGRepository:
     # PainPoint Operations
     # =========================================================================
 
+    @write
     async def upsert_painpoint(
         self,
         project_id: str,
@@ -296,11 +589,21 @@ class KGRepository:
         severity: str = "medium",
         related_goal_id: Optional[str] = None,
         interaction_id: Optional[str] = None,
+        existing_id: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Upsert a pain point node."""
+        """
+        Upsert a pain point node.
+
+        With `existing_id` (a local duplicate, see DedupEngine), the existing
+        node is updated and keeps its own description.
+        """
         painpoint_id = str(uuid4())
         query = """
-        MERGE (pp:PainPoint {project_id: $project_id, description: $description})
+        OPTIONAL MATCH (existing:PainPoint {id: $existing_id})
+        MERGE (pp:PainPoint {
+            project_id: $project_id,
+            description: COALESCE(existing.description, $description)
+        })
         ON CREATE SET
             pp.id = $painpoint_id,
             pp.severity = $severity,
@@ -319,6 +622,7 @@ class KGRepository:
                 "painpoint_id": painpoint_id,
                 "description": description,
                 "severity": severity,
+                "existing_id": existing_id,
             },
         )
         painpoint = result[0]["painpoint"] if result else {"id": painpoint_id}
@@ -347,6 +651,8 @@ class KGRepository:
 
         return painpoint
 
+    @memoized_read
+    @cached_read("project_id")
     async def get_open_painpoints(self, project_id: str) -> List[Dict[str, Any]]:
         """Get unresolved pain points for a project."""
         query = """
@@ -372,6 +678,7 @@ class KGRepository:
     # Strategy Operations
     # =========================================================================
 
+    @write
     async def upsert_strategy(
         self,
         project_id: str,
@@ -381,11 +688,18 @@ class KGRepository:
         outcome: Optional[str] = None,
         outcome_reason: Optional[str] = None,
         related_goal_id: Optional[str] = None,
+        existing_id: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Upsert a strategy node."""
+        """
+        Upsert a strategy node.
+
+        With `existing_id` (a local duplicate, see DedupEngine), the existing
+        node is updated and keeps its own title.
+        """
         strategy_id = str(uuid4())
         query = """
-        MERGE (s:Strategy {project_id: $project_id, title: $title})
+        OPTIONAL MATCH (existing:Strategy {id: $existing_id})
+        MERGE (s:Strategy {project_id: $project_id, title: COALESCE(existing.title, $title)})
         ON CREATE SET
             s.id = $strategy_id,
             s.approach = $approach,
@@ -412,6 +726,7 @@ class KGRepository:
                 "rationale": rationale,
                 "outcome": outcome,
                 "outcome_reason": outcome_reason,
+                "existing_id": existing_id,
             },
         )
         strategy = result[0]["strategy"] if result else {"id": strategy_id}
@@ -433,6 +748,7 @@ class KGRepository:
     # CodeArtifact Operations
     # =========================================================================
 
+    @write
     async def upsert_code_artifact(
         self,
         project_id: str,
@@ -492,18 +808,34 @@ class KGRepository:
 
         # Link to goals if provided
         if related_goal_ids:
-            for goal_id in related_goal_ids:
-                await self.client.execute_query(
-                    """
-                    MATCH (g:Goal {id: $goal_id})
-                    MATCH (ca:CodeArtifact {id: $artifact_id})
-                    MERGE (g)-[:IMPLEMENTED_BY]->(ca)
-                    """,
-                    {"goal_id": goal_id, "artifact_id": artifact["id"]},
-                )
+            await self.link_artifacts_to_goals([artifact["id"]], related_goal_ids)
 
         return artifact
 
+    @write
+    async def link_artifacts_to_goals(
+        self, artifact_ids: List[str], goal_ids: List[str]
+    ) -> None:
+        """
+        Create IMPLEMENTED_BY relationships from every goal to every artifact.
+
+        Links N artifacts x M goals with a single statement.
+        """
+        if not artifact_ids or not goal_ids:
+            return
+
+        query = """
+        UNWIND $artifact_ids AS artifact_id
+        MATCH (ca:CodeArtifact {id: artifact_id})
+        UNWIND $goal_ids AS goal_id
+        MATCH (g:Goal {id: goal_id})
+        MERGE (g)-[:IMPLEMENTED_BY]->(ca)
+        """
+        await self.client.execute_query(
+            query, {"artifact_ids": artifact_ids, "goal_ids": goal_ids}
+        )
+
+    @write
     async def upsert_symbol(
         self,
         artifact_id: str,
@@ -534,7 +866,7 @@ class KGRepository:
         symbol_id = str(uuid4())
         # Extract name from fqn if not provided
         if name is None:
-            name = fqn.split(":")[-1] if ":" in fqn else fqn.split(".")[-1] if "." in fqn else fqn
+            name = _symbol_name(fqn)
         
         query = """
         MATCH (ca:CodeArtifact {id: $artifact_id})
@@ -578,6 +910,67 @@ class KGRepository:
         )
         return result[0]["symbol"] if result else {"id": symbol_id, "fqn": fqn}
 
+    @write
+    async def upsert_symbols_bulk(
+        self,
+        artifact_id: str,
+        symbols: List[Dict[str, Any]],
+        batch_size: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Upsert many symbols of one artifact with UNWIND statements.
+
+        Same semantics as calling `upsert_symbol` per symbol, but one
+        round-trip per batch instead of one per symbol.
+
+        Args:
+            artifact_id: ID of the parent CodeArtifact
+            symbols: Dicts with `fqn` and optionally name, kind, line_start,
+                line_end, signature, change_type
+            batch_size: Symbols per statement (defaults to KG_SYMBOL_BATCH_SIZE)
+
+        Returns:
+            The created/updated symbol nodes
+        """
+        batch_size = batch_size or get_settings().kg_symbol_batch_size
+        rows = [
+            {
+                "symbol_id": str(uuid4()),
+                "fqn": sym["fqn"],
+                "name": sym.get("name") or _symbol_name(sym["fqn"]),
+                "kind": sym.get("kind", "function"),
+                "line_start": sym.get("line_start"),
+                "line_end": sym.get("line_end"),
+                "signature": sym.get("signature"),
+                "change_type": sym.get("change_type"),
+            }
+            for sym in symbols
+        ]
+
+        saved: List[Dict[str, Any]] = []
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i : i + batch_size]
+            result = await self.client.execute_query(
+                BULK_SYMBOLS_QUERY, {"artifact_id": artifact_id, "rows": batch}
+            )
+            if result:
+                saved.extend(r["symbol"] for r in result)
+            else:
+                saved.extend({"id": row["symbol_id"], "fqn": row["fqn"]} for row in batch)
+        return saved
+
+    @memoized_read
+    async def get_artifact_hashes(self, project_id: str) -> Dict[str, str]:
+        """Get path -> content_hash for every hashed code artifact of a project."""
+        query = """
+        MATCH (ca:CodeArtifact {project_id: $project_id})
+        WHERE ca.content_hash IS NOT NULL
+        RETURN ca.path as path, ca.content_hash as content_hash
+        """
+        result = await self.client.execute_query(query, {"project_id": project_id})
+        return {r["path"]: r["content_hash"] for r in result}
+
+    @memoized_read
     async def get_artifacts_for_goal(self, goal_id: str) -> List[Dict[str, Any]]:
         """Get code artifacts implementing a goal."""
         query = """
@@ -592,10 +985,145 @@ class KGRepository:
         result = await self.client.execute_query(query, {"goal_id": goal_id})
         return [r["artifact"] for r in result]
 
+    # =========================================================================
+    # Bulk Operations
+    # =========================================================================
+
+    @write
+    async def commit_extraction_bulk(
+        self,
+        project_id: str,
+        user_id: str,
+        interaction_id: str,
+        goals: List[Dict[str, Any]],
+        merged_goals: Dict[str, str],
+        constraints: List[Dict[str, Any]],
+        preferences: List[Dict[str, Any]],
+        pain_points: List[Dict[str, Any]],
+        strategies: List[Dict[str, Any]],
+        code_artifacts: List[Dict[str, Any]],
+    ) -> Dict[str, List[str]]:
+        """
+        Commit a whole extraction with a handful of UNWIND statements.
+
+        Everything runs in one write transaction, one statement per entity type
+        (empty lists are skipped). Rows that relate to a goal reference it by
+        title via `goal_title` (constraints, pain points, strategies) or
+        `goal_titles` (code artifacts); titles are resolved against the goals
+        upserted here and `merged_goals`.
+
+        Args:
+            project_id: Project the entities belong to
+            user_id: Owner of the preferences
+            interaction_id: Interaction that produced the entities
+            goals: Goal rows (title, description, status, priority)
+            merged_goals: Title -> existing goal ID for goals merged by the linker
+            constraints: Constraint rows (type, description, severity, goal_title,
+                existing_id)
+            preferences: Preference rows (category, preference, strength)
+            pain_points: Pain point rows (description, severity, goal_title,
+                existing_id)
+            strategies: Strategy rows (title, approach, rationale, outcome,
+                outcome_reason, goal_title, existing_id)
+            code_artifacts: Artifact rows (path, kind, symbol_fqn, start_line,
+                end_line, goal_titles)
+
+        Returns:
+            Dict of entity type -> list of committed IDs
+        """
+        goal_rows = [{**row, "goal_id": str(uuid4())} for row in goals]
+        preference_rows = [{**row, "preference_id": str(uuid4())} for row in preferences]
+
+        async def work(tx: Any) -> Dict[str, List[str]]:
+            run = self.client.run_in_transaction
+            created: Dict[str, List[str]] = {
+                "goals": [],
+                "constraints": [],
+                "preferences": [],
+                "pain_points": [],
+                "strategies": [],
+                "code_artifacts": [],
+            }
+
+            goal_id_map = dict(merged_goals)
+            if goal_rows:
+                records = await run(
+                    tx,
+                    BULK_GOALS_QUERY,
+                    {"project_id": project_id, "rows": goal_rows},
+                )
+                for row, goal_id in _pair(goal_rows, records, "goal_id"):
+                    goal_id_map.setdefault(row["title"], goal_id)
+                    created["goals"].append(goal_id)
+
+            produced_ids = list(dict.fromkeys(goal_id_map.values()))
+            if produced_ids:
+                await run(
+                    tx,
+                    BULK_PRODUCED_QUERY,
+                    {"interaction_id": interaction_id, "goal_ids": produced_ids},
+                )
+
+            def resolve(row: Dict[str, Any]) -> Dict[str, Any]:
+                resolved = {k: v for k, v in row.items() if k not in ("goal_title", "goal_titles")}
+                if "goal_titles" in row:
+                    resolved["goal_ids"] = [
+                        goal_id_map[t] for t in row["goal_titles"] if t in goal_id_map
+                    ]
+                else:
+                    resolved["goal_id"] = goal_id_map.get(row.get("goal_title") or "")
+                return resolved
+
+            constraint_rows = [
+                {**resolve(row), "constraint_id": str(uuid4())} for row in constraints
+            ]
+            painpoint_rows = [
+                {**resolve(row), "painpoint_id": str(uuid4())} for row in pain_points
+            ]
+            strategy_rows = [
+                {**resolve(row), "strategy_id": str(uuid4())} for row in strategies
+            ]
+            artifact_rows = []
+            for row in code_artifacts:
+                fqn = row.get("symbol_fqn")
+                artifact_rows.append({
+                    **resolve(row),
+                    "artifact_id": str(uuid4()),
+                    "symbol_id": str(uuid4()),
+                    "symbol_name": _symbol_name(fqn) if fqn else None,
+                })
+
+            batches = [
+                ("constraints", BULK_CONSTRAINTS_QUERY, constraint_rows, "constraint_id"),
+                ("preferences", BULK_PREFERENCES_QUERY, preference_rows, "preference_id"),
+                ("pain_points", BULK_PAINPOINTS_QUERY, painpoint_rows, "painpoint_id"),
+                ("strategies", BULK_STRATEGIES_QUERY, strategy_rows, "strategy_id"),
+                ("code_artifacts", BULK_ARTIFACTS_QUERY, artifact_rows, "artifact_id"),
+            ]
+            for key, query, rows, id_key in batches:
+                if not rows:
+                    continue
+                records = await run(
+                    tx,
+                    query,
+                    {
+                        "project_id": project_id,
+                        "user_id": user_id,
+                        "interaction_id": interaction_id,
+                        "rows": rows,
+                    },
+                )
+                created[key].extend(entity_id for _, entity_id in _pair(rows, records, id_key))
+
+            return created
+
+        return await self.client.execute_write_transaction(work)
+
     # =========================================================================
     # Search Operations
     # =========================================================================
 
+    @memoized_read
     async def fulltext_search(
         self,
         project_id: str,
@@ -606,73 +1134,60 @@ class KGRepository:
         """
         Perform fulltext search across multiple node types.
 
+        All requested indexes are queried in a single `CALL {} UNION`
+        statement with the project filter and LIMIT applied in the database.
+        Scores are normalised per index (best hit = 1.0) so results from
+        different indexes can be ranked together; the raw Lucene score is kept
+        as `raw_score`. If the combined statement fails (e.g. an index is
+        missing), each index is queried concurrently and failures are skipped.
+
         Args:
             project_id: Project to search within
             query: Search query
-            node_types: Types to search (Goal, PainPoint, Strategy, etc.)
+            node_types: Types to search (see FULLTEXT_INDEXES); DEFAULT_SEARCH_TYPES
+                by default
             limit: Maximum results
 
         Returns:
             List of matching nodes with scores
         """
-        results = []
+        types = [t for t in (node_types or DEFAULT_SEARCH_TYPES) if t in FULLTEXT_INDEXES]
+        if not types:
+            logger.warning(f"No fulltext index for node types {node_types}")
+            return []
 
-        # Search goals
-        if not node_types or "Goal" in node_types:
-            goal_query = """
-            CALL db.index.fulltext.queryNodes('goal_fulltext', $query) YIELD node, score
-            WHERE node.project_id = $project_id
-            RETURN 'Goal' as type, node {.*} as data, score
-            LIMIT $limit
-            """
-            try:
-                goal_results = await self.client.execute_query(
-                    goal_query, {"project_id": project_id, "query": query, "limit": limit}
-                )
-                results.extend(goal_results)
-            except Exception as e:
-                logger.warning(f"Goal fulltext search failed: {e}")
-
-        # Search pain points
-        if not node_types or "PainPoint" in node_types:
-            pp_query = """
-            CALL db.index.fulltext.queryNodes('painpoint_fulltext', $query) YIELD node, score
-            WHERE node.project_id = $project_id
-            RETURN 'PainPoint' as type, node {.*} as data, score
-            LIMIT $limit
-            """
-            try:
-                pp_results = await self.client.execute_query(
-                    pp_query, {"project_id": project_id, "query": query, "limit": limit}
-                )
-                results.extend(pp_results)
-            except Exception as e:
-                logger.warning(f"PainPoint fulltext search failed: {e}")
-
-        # Search strategies
-        if not node_types or "Strategy" in node_types:
-            strategy_query = """
-            CALL db.index.fulltext.queryNodes('strategy_fulltext', $query) YIELD node, score
-            WHERE node.project_id = $project_id
-            RETURN 'Strategy' as type, node {.*} as data, score
-            LIMIT $limit
-            """
+        params = {"project_id": project_id, "query": query, "limit": limit}
+        branches = "\n    UNION ALL\n".join(_fulltext_branch(t) for t in types)
+        combined_query = f"""
+        CALL {{
+        {branches}
+        }}
+        RETURN type, data, score, raw_score
+        ORDER BY score DESC, raw_score DESC
+        LIMIT $limit
+        """
+        try:
+            return await self.client.execute_query(combined_query, params)
+        except Exception as e:
+            logger.warning(f"Combined fulltext search failed, querying indexes one by one: {e}")
+
+        async def search_one(node_type: str) -> List[Dict[str, Any]]:
             try:
-                strategy_results = await self.client.execute_query(
-                    strategy_query, {"project_id": project_id, "query": query, "limit": limit}
-                )
-                results.extend(strategy_results)
+                return await self.client.execute_query(_fulltext_branch(node_type), params)
             except Exception as e:
-                logger.warning(f"Strategy fulltext search failed: {e}")
+                logger.warning(f"{node_type} fulltext search failed: {e}")
+                return []
 
-        # Sort by score and limit
-        results.sort(key=lambda x: x.get("score", 0), reverse=True)
+        per_type = await asyncio.gather(*(search_one(t) for t in types))
+        results = [r for rows in per_type for r in rows]
+        results.sort(key=lambda x: (x.get("score", 0), x.get("raw_score", 0)), reverse=True)
         return results[:limit]
 
     # =========================================================================
     # Impact Analysis Operations
     # =========================================================================
 
+    @memoized_read
     async def get_impact_for_artifacts(
         self, project_id: str, paths: List[str]
     ) -> Dict[str, Any]:
@@ -719,6 +1234,7 @@ class KGRepository:
             "artifacts_related": [],
         }
 
+    @memoized_read
     async def get_goal_subgraph(
         self, goal_id: str, k_hops: int = 2
     ) -> Dict[str, Any]:
@@ -744,6 +1260,242 @@ class KGRepository:
         return {"goal": None, "connected": []}
 
 
+def _fulltext_branch(node_type: str) -> str:
+    """Build the search sub-query for one fulltext index."""
+    if node_type == "Symbol":
+        # Symbols carry no project_id; scope them through their artifact
+        project_filter = (
+            "EXISTS { MATCH (:CodeArtifact {project_id: $project_id})-[:CONTAINS]->(node) }"
+        )
+    else:
+        project_filter = "node.project_id = $project_id"
+
+    return f"""
+    CALL db.index.fulltext.queryNodes('{FULLTEXT_INDEXES[node_type]}', $query) YIELD node, score
+    WHERE {project_filter}
+    WITH node, score
+    ORDER BY score DESC
+    LIMIT $limit
+    WITH collect({{node: node, score: score}}) as hits, max(score) as top
+    UNWIND hits as hit
+    WITH hit.node as n, hit.score as s, top
+    RETURN '{node_type}' as type, n {{.*}} as data, s / top as score, s as raw_score
+    """
+
+
+def _pair(
+    rows: List[Dict[str, Any]], records: List[Dict[str, Any]], id_key: str
+) -> List[Tuple[Dict[str, Any], str]]:
+    """Pair input rows with the IDs returned by an UNWIND statement."""
+    if not records:
+        # Nothing came back (e.g. missing project); mirror the single-entity
+        # upserts, which fall back to the generated ID.
+        return [(row, row[id_key]) for row in rows]
+    return [(row, record["id"]) for row, record in zip(rows, records, strict=True)]
+
+
+# =============================================================================
+# Bulk UNWIND statements (see KGRepository.commit_extraction_bulk)
+# =============================================================================
+
+BULK_GOALS_QUERY = """
+MATCH (p:Project {id: $project_id})
+UNWIND $rows AS row
+MERGE (g:Goal {project_id: $project_id, title: row.title})
+ON CREATE SET
+    g.id = row.goal_id,
+    g.description = row.description,
+    g.status = row.status,
+    g.priority = row.priority,
+    g.created_at = datetime(),
+    g.updated_at = datetime()
+ON MATCH SET
+    g.description = COALESCE(row.description, g.description),
+    g.status = row.status,
+    g.priority = row.priority,
+    g.updated_at = datetime()
+MERGE (p)-[:HAS_GOAL]->(g)
+RETURN g.id as id
+"""
+
+BULK_PRODUCED_QUERY = """
+MATCH (i:Interaction {id: $interaction_id})
+UNWIND $goal_ids AS goal_id
+MATCH (g:Goal {id: goal_id})
+MERGE (i)-[:PRODUCED]->(g)
+"""
+
+BULK_CONSTRAINTS_QUERY = """
+UNWIND $rows AS row
+OPTIONAL MATCH (existing:Constraint {id: row.existing_id})
+MERGE (c:Constraint {
+    project_id: $project_id,
+    description: COALESCE(existing.description, row.description)
+})
+ON CREATE SET
+    c.id = row.constraint_id,
+    c.type = row.type,
+    c.severity = row.severity,
+    c.created_at = datetime(),
+    c.updated_at = datetime()
+ON MATCH SET
+    c.severity = row.severity,
+    c.updated_at = datetime()
+WITH c, row
+CALL {
+    WITH c, row
+    MATCH (g:Goal {id: row.goal_id})
+    MERGE (g)-[:HAS_CONSTRAINT]->(c)
+    RETURN count(*) as linked
+}
+RETURN c.id as id
+"""
+
+BULK_PREFERENCES_QUERY = """
+UNWIND $rows AS row
+MERGE (p:Preference {user_id: $user_id, category: row.category, preference: row.preference})
+ON CREATE SET
+    p.id = row.preference_id,
+    p.strength = row.strength,
+    p.created_at = datetime(),
+    p.updated_at = datetime()
+ON MATCH SET
+    p.strength = row.strength,
+    p.updated_at = datetime()
+RETURN p.id as id
+"""
+
+BULK_PAINPOINTS_QUERY = """
+UNWIND $rows AS row
+OPTIONAL MATCH (existing:PainPoint {id: row.existing_id})
+MERGE (pp:PainPoint {
+    project_id: $project_id,
+    description: COALESCE(existing.description, row.description)
+})
+ON CREATE SET
+    pp.id = row.painpoint_id,
+    pp.severity = row.severity,
+    pp.resolved = false,
+    pp.created_at = datetime(),
+    pp.updated_at = datetime()
+ON MATCH SET
+    pp.severity = row.severity,
+    pp.updated_at = datetime()
+WITH pp, row
+CALL {
+    WITH pp, row
+    MATCH (g:Goal {id: row.goal_id})
+    MERGE (g)-[:BLOCKED_BY]->(pp)
+    RETURN count(*) as linked
+}
+CALL {
+    WITH pp
+    MATCH (i:Interaction {id: $interaction_id})
+    MERGE (pp)-[:OBSERVED_IN]->(i)
+    RETURN count(*) as observed
+}
+RETURN pp.id as id
+"""
+
+BULK_STRATEGIES_QUERY = """
+UNWIND $rows AS row
+OPTIONAL MATCH (existing:Strategy {id: row.existing_id})
+MERGE (s:Strategy {project_id: $project_id, title: COALESCE(existing.title, row.title)})
+ON CREATE SET
+    s.id = row.strategy_id,
+    s.approach = row.approach,
+    s.rationale = row.rationale,
+    s.outcome = row.outcome,
+    s.outcome_reason = row.outcome_reason,
+    s.created_at = datetime(),
+    s.updated_at = datetime()
+ON MATCH SET
+    s.approach = row.approach,
+    s.rationale = COALESCE(row.rationale, s.rationale),
+    s.outcome = COALESCE(row.outcome, s.outcome),
+    s.outcome_reason = COALESCE(row.outcome_reason, s.outcome_reason),
+    s.updated_at = datetime()
+WITH s, row
+CALL {
+    WITH s, row
+    MATCH (g:Goal {id: row.goal_id})
+    MERGE (g)-[:HAS_STRATEGY]->(s)
+    RETURN count(*) as linked
+}
+RETURN s.id as id
+"""
+
+BULK_SYMBOLS_QUERY = """
+MATCH (ca:CodeArtifact {id: $artifact_id})
+UNWIND $rows AS row
+MERGE (s:Symbol {fqn: row.fqn})
+ON CREATE SET
+    s.id = row.symbol_id,
+    s.name = row.name,
+    s.kind = row.kind,
+    s.artifact_id = $artifact_id,
+    s.line_start = row.line_start,
+    s.line_end = row.line_end,
+    s.signature = row.signature,
+    s.change_type = row.change_type,
+    s.created_at = datetime(),
+    s.updated_at = datetime()
+ON MATCH SET
+    s.name = row.name,
+    s.kind = row.kind,
+    s.artifact_id = $artifact_id,
+    s.line_start = COALESCE(row.line_start, s.line_start),
+    s.line_end = COALESCE(row.line_end, s.line_end),
+    s.signature = COALESCE(row.signature, s.signature),
+    s.change_type = row.change_type,
+    s.updated_at = datetime()
+MERGE (ca)-[:CONTAINS]->(s)
+RETURN s {.*} as symbol
+"""
+
+BULK_ARTIFACTS_QUERY = """
+UNWIND $rows AS row
+MERGE (ca:CodeArtifact {project_id: $project_id, path: row.path})
+ON CREATE SET
+    ca.id = row.artifact_id,
+    ca.kind = row.kind,
+    ca.start_line = row.start_line,
+    ca.end_line = row.end_line,
+    ca.created_at = datetime(),
+    ca.updated_at = datetime()
+ON MATCH SET
+    ca.kind = row.kind,
+    ca.start_line = COALESCE(row.start_line, ca.start_line),
+    ca.end_line = COALESCE(row.end_line, ca.end_line),
+    ca.updated_at = datetime()
+WITH ca, row
+CALL {
+    WITH ca, row
+    UNWIND row.goal_ids AS goal_id
+    MATCH (g:Goal {id: goal_id})
+    MERGE (g)-[:IMPLEMENTED_BY]->(ca)
+    RETURN count(*) as linked
+}
+FOREACH (fqn IN CASE WHEN row.symbol_fqn IS NULL THEN [] ELSE [row.symbol_fqn] END |
+    MERGE (s:Symbol {fqn: fqn})
+    ON CREATE SET
+        s.id = row.symbol_id,
+        s.name = row.symbol_name,
+        s.kind = row.kind,
+        s.artifact_id = ca.id,
+        s.created_at = datetime(),
+        s.updated_at = datetime()
+    ON MATCH SET
+        s.name = row.symbol_name,
+        s.kind = row.kind,
+        s.artifact_id = ca.id,
+        s.updated_at = datetime()
+    MERGE (ca)-[:CONTAINS]->(s)
+)
+RETURN ca.id as id
+"""
+
+
 # Singleton instance
 _repository: Optional[KGRepository] = None
 
@@ -3,19 +3,24 @@ Retrieval module for building context packs from the knowledge graph.
 Navigates the graph to construct relevant context for IDE agents.
 """
 
+import asyncio
 import logging
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Dict, List, Optional, Tuple, TypeVar
 
+from kg_mcp.config import get_settings
 from kg_mcp.kg.repo import get_repository
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class ContextBuilder:
     """Builds context packs from the knowledge graph."""
 
     def __init__(self):
+        self.settings = get_settings()
         self.repo = get_repository()
 
     async def build_context_pack(
@@ -37,7 +42,8 @@ class ContextBuilder:
             user_id: User ID for preferences
 
         Returns:
-            Dict with 'markdown' (formatted context) and 'entities' (raw data)
+            Dict with 'markdown' (formatted context), 'entities' (raw data) and
+            'degraded' (names of branches that timed out or failed)
         """
         logger.info(f"Building context pack for project {project_id}")
 
@@ -53,42 +59,66 @@ class ContextBuilder:
             "search_results": [],
         }
 
-        # Get active goals
-        entities["active_goals"] = await self.repo.get_active_goals(project_id)
-        logger.debug(f"Found {len(entities['active_goals'])} active goals")
-
-        # Get user preferences
-        entities["preferences"] = await self.repo.get_preferences(user_id)
-        logger.debug(f"Found {len(entities['preferences'])} preferences")
-
-        # Get open pain points
-        entities["pain_points"] = await self.repo.get_open_painpoints(project_id)
-        logger.debug(f"Found {len(entities['pain_points'])} open pain points")
-
-        # If focus goal specified, get its subgraph
+        # Fan out the independent reads; each branch has its own timeout and
+        # falls back to an empty value so one slow or failing read does not
+        # sink the whole pack
+        branches: Dict[str, Tuple[Awaitable[Any], Any]] = {
+            "active_goals": (self.repo.get_active_goals(project_id), []),
+            "preferences": (self.repo.get_preferences(user_id), []),
+            "pain_points": (self.repo.get_open_painpoints(project_id), []),
+        }
         if focus_goal_id:
-            entities["focus_goal_subgraph"] = await self.repo.get_goal_subgraph(
-                focus_goal_id, k_hops
+            branches["focus_goal_subgraph"] = (
+                self.repo.get_goal_subgraph(focus_goal_id, k_hops),
+                None,
             )
-            # Get artifacts for the focused goal
-            entities["code_artifacts"] = await self.repo.get_artifacts_for_goal(focus_goal_id)
-
-        # If query specified, do fulltext search
+            branches["code_artifacts"] = (self.repo.get_artifacts_for_goal(focus_goal_id), [])
         if query:
-            entities["search_results"] = await self.repo.fulltext_search(
-                project_id=project_id,
-                query=query,
-                limit=10,
+            branches["search_results"] = (
+                self.repo.fulltext_search(project_id=project_id, query=query, limit=10),
+                [],
             )
 
+        outcomes = await asyncio.gather(
+            *(self._run_branch(name, coro) for name, (coro, _) in branches.items())
+        )
+
+        degraded = []
+        for (name, (_, default)), (ok, value) in zip(branches.items(), outcomes, strict=True):
+            if ok:
+                entities[name] = value
+            else:
+                entities[name] = default
+                degraded.append(name)
+
+        logger.debug(
+            f"Found {len(entities['active_goals'])} active goals, "
+            f"{len(entities['preferences'])} preferences, "
+            f"{len(entities['pain_points'])} open pain points"
+        )
+
         # Build markdown context
         markdown = self._format_markdown(entities, project_id)
+        if degraded:
+            markdown += f"\n\n*⚠️ Partial context: could not load {', '.join(degraded)}.*"
 
         return {
             "markdown": markdown,
             "entities": entities,
+            "degraded": degraded,
         }
 
+    async def _run_branch(self, name: str, coro: Awaitable[T]) -> Tuple[bool, Optional[T]]:
+        """Await one context branch with a timeout, reporting (ok, value)."""
+        timeout = self.settings.kg_context_branch_timeout
+        try:
+            return True, await asyncio.wait_for(coro, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Context branch '{name}' timed out after {timeout}s")
+        except Exception as e:
+            logger.warning(f"Context branch '{name}' failed: {e}")
+        return False, None
+
     def _format_markdown(self, entities: Dict[str, Any], project_id: str) -> str:
         """Format entities into a structured markdown document."""
         sections = []
@@ -195,7 +225,12 @@ class ContextBuilder:
                 rtype = result.get("type", "Unknown")
                 data = result.get("data", {})
                 score = result.get("score", 0)
-                title = data.get("title") or data.get("description", str(data))[:50]
+                title = (
+                    data.get("title")
+                    or data.get("fqn")
+                    or data.get("path")
+                    or (data.get("description") or data.get("user_text") or str(data))[:50]
+                )
                 sections.append(f"- **[{rtype}]** {title} (score: {score:.2f})")
             sections.append("")
 
@@ -0,0 +1,137 @@
+"""
+Local, CPU-only text similarity for candidate retrieval.
+
+Texts are embedded as L2-normalized bags of hashed character trigrams and
+words, so similarity is plain cosine over fixed-size vectors. NumPy is used
+for the matrix product when installed; otherwise a sparse pure-Python dot
+product gives identical scores.
+"""
+
+import math
+import re
+import zlib
+from typing import Dict, FrozenSet, Generic, List, Sequence, Tuple, TypeVar
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+T = TypeVar("T")
+
+# Hashed feature space; small enough for a dense matrix of a few thousand rows
+DEFAULT_DIM = 1024
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def text_features(text: str, dim: int = DEFAULT_DIM) -> Dict[int, float]:
+    """Embed text as an L2-normalized sparse vector of hashed trigrams and words."""
+    normalized = normalize_text(text)
+    counts: Dict[int, float] = {}
+
+    padded = f" {normalized} "
+    grams = [padded[i : i + 3] for i in range(len(padded) - 2)]
+    for gram in grams + normalized.split():
+        bucket = zlib.crc32(gram.encode()) % dim
+        counts[bucket] = counts.get(bucket, 0.0) + 1.0
+
+    norm = math.sqrt(sum(v * v for v in counts.values()))
+    if not norm:
+        return {}
+    return {k: v / norm for k, v in counts.items()}
+
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    """Cosine similarity of two normalized sparse vectors."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """Character trigrams of the normalized text (padded with spaces)."""
+    padded = f" {normalize_text(text)} "
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+def trigram_similarity(a: str, b: str) -> float:
+    """Jaccard similarity of character trigrams; 1.0 for equal normalized text."""
+    if normalize_text(a) == normalize_text(b):
+        return 1.0
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+class CandidateIndex(Generic[T]):
+    """
+    Compact in-memory vector index over a list of items.
+
+    Usage:
+        index = CandidateIndex(goals, [g["title"] for g in goals])
+        for goal, score in index.top_k("Add login", k=5):
+            ...
+    """
+
+    def __init__(self, items: Sequence[T], texts: Sequence[str], dim: int = DEFAULT_DIM):
+        self.items = list(items)
+        self.dim = dim
+        self._vectors = [text_features(text, dim) for text in texts]
+        self._matrix = None
+        if np is not None and self._vectors:
+            self._matrix = np.zeros((len(self._vectors), dim), dtype=np.float32)
+            for row, vector in enumerate(self._vectors):
+                for col, value in vector.items():
+                    self._matrix[row, col] = value
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def scores(self, text: str) -> List[float]:
+        """Cosine similarity of `text` against every item, in item order."""
+        query = text_features(text, self.dim)
+        if not query or not self.items:
+            return [0.0] * len(self.items)
+
+        if self._matrix is not None:
+            dense = np.zeros(self.dim, dtype=np.float32)
+            for col, value in query.items():
+                dense[col] = value
+            scores: List[float] = (self._matrix @ dense).tolist()
+            return scores
+        return [cosine(query, vector) for vector in self._vectors]
+
+    def top_k(self, text: str, k: int, min_score: float = 0.0) -> List[Tuple[T, float]]:
+        """The `k` items most similar to `text`, best first."""
+        ranked = sorted(enumerate(self.scores(text)), key=lambda pair: pair[1], reverse=True)
+        return [(self.items[i], score) for i, score in ranked[:k] if score > min_score]
+
+
+def select_candidates(
+    queries: Sequence[str],
+    items: Sequence[T],
+    texts: Sequence[str],
+    k: int,
+) -> List[T]:
+    """
+    Union of the top-k items for each query, in original item order.
+
+    No queries select nothing. With k <= 0, or when there are no more than k
+    items, all items are kept.
+    """
+    if not queries:
+        return []
+    if k <= 0 or len(items) <= k:
+        return list(items)
+
+    index = CandidateIndex(items, texts)
+    chosen = set()
+    for query in queries:
+        for item, _ in index.top_k(query, k):
+            chosen.add(id(item))
+    return [item for item in items if id(item) in chosen]
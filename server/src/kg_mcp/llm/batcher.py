@@ -0,0 +1,97 @@
+"""
+Micro-batching of concurrent LLM requests.
+
+Requests submitted within a short window are handed to a single batch
+function together; each caller gets back the result at its own position.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, Set, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Collects items for `window_ms` (or until `max_size` are waiting) and runs
+    them through `run_batch` in one call.
+
+    Args:
+        run_batch: Receives the items in submission order and returns one
+            result per item; a result that is an exception is raised to that
+            item's caller only
+        window_ms: How long the first item of a batch waits for company
+        max_size: Items that trigger an immediate flush
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[T]], Awaitable[List[Any]]],
+        window_ms: float = 5.0,
+        max_size: int = 4,
+    ):
+        self.run_batch = run_batch
+        self.window = window_ms / 1000
+        self.max_size = max(1, max_size)
+        self._pending: List[Tuple[T, asyncio.Future[R]]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task[None]] = set()
+        self._batches = 0
+        self._items = 0
+
+    async def submit(self, item: T) -> R:
+        """Queue an item for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[R] = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def stats(self) -> Dict[str, float]:
+        """Batches run, items processed and the mean batch size."""
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "mean_batch_size": self._items / self._batches if self._batches else 0.0,
+        }
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[T, asyncio.Future[R]]]) -> None:
+        self._batches += 1
+        self._items += len(batch)
+        try:
+            results = await self.run_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Batch of {len(batch)} returned {len(results)} results")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results, strict=True):
+            # A caller that gave up has a cancelled future
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
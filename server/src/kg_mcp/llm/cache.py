@@ -0,0 +1,161 @@
+"""
+Content-addressed cache for LLM extraction results.
+
+Keys hash the fully built prompt together with the sampling parameters, so
+an identical request (retries, resumed sessions) never reaches the model
+twice. Entries live in an in-memory LRU and, optionally, in a SQLite file
+that survives restarts.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from kg_mcp.llm.schemas import ExtractionResult
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(**request: Any) -> str:
+    """Stable hash of an LLM request (model, messages, sampling parameters)."""
+    payload = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ExtractionCache:
+    """
+    Two-tier (memory LRU + optional SQLite) cache of ExtractionResult objects.
+
+    Args:
+        max_entries: Entries kept in memory; the least recently used are evicted
+        ttl: Seconds an entry stays valid (0 = no expiry)
+        path: SQLite file for the disk tier, or None for memory only
+        disk_max_entries: Entries kept on disk; the oldest are evicted
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl: float = 0,
+        path: Optional[str] = None,
+        disk_max_entries: int = 10000,
+    ):
+        self.max_entries = max_entries
+        self.disk_max_entries = disk_max_entries
+        self.ttl = ttl
+        self.path = path
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    async def get(self, key: str) -> Optional[ExtractionResult]:
+        """Return the cached result for `key`, or None."""
+        entry = self._memory.get(key)
+        if entry is not None and not self._expired(entry[0]):
+            self._memory.move_to_end(key)
+            self._hits += 1
+            return ExtractionResult.model_validate_json(entry[1])
+        if entry is not None:
+            del self._memory[key]
+
+        if self.path:
+            try:
+                row = await asyncio.to_thread(self._disk_get, key)
+            except sqlite3.Error as e:
+                logger.warning(f"Extraction cache read failed: {e}")
+                row = None
+            if row is not None and not self._expired(row[0]):
+                self._remember(key, row[0], row[1])
+                self._disk_hits += 1
+                return ExtractionResult.model_validate_json(row[1])
+
+        self._misses += 1
+        return None
+
+    async def set(self, key: str, result: ExtractionResult) -> None:
+        """Store `result` under `key` in every tier."""
+        created_at = time.time()
+        value = result.model_dump_json()
+        self._remember(key, created_at, value)
+
+        if self.path:
+            try:
+                await asyncio.to_thread(self._disk_set, key, created_at, value)
+            except sqlite3.Error as e:
+                logger.warning(f"Extraction cache write failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and memory tier size."""
+        return {
+            "hits": self._hits,
+            "disk_hits": self._disk_hits,
+            "misses": self._misses,
+            "entries": len(self._memory),
+        }
+
+    def close(self) -> None:
+        """Close the SQLite connection, if open."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl > 0 and created_at + self.ttl < time.time()
+
+    def _remember(self, key: str, created_at: float, value: str) -> None:
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            if not self.path:
+                raise RuntimeError("Extraction cache has no disk tier")
+            path = Path(self.path).expanduser()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS extraction_cache "
+                "(key TEXT PRIMARY KEY, created_at REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS extraction_cache_created_at "
+                "ON extraction_cache (created_at)"
+            )
+        return self._db
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, str]]:
+        with self._db_lock:
+            row: Optional[Tuple[float, str]] = self._connect().execute(
+                "SELECT created_at, value FROM extraction_cache WHERE key = ?", (key,)
+            ).fetchone()
+        return row
+
+    def _disk_set(self, key: str, created_at: float, value: str) -> None:
+        with self._db_lock, self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO extraction_cache (key, created_at, value) VALUES (?, ?, ?)",
+                (key, created_at, value),
+            )
+            if self.ttl > 0:
+                db.execute(
+                    "DELETE FROM extraction_cache WHERE created_at < ?",
+                    (created_at - self.ttl,),
+                )
+            # Keep the newest disk_max_entries rows
+            db.execute(
+                "DELETE FROM extraction_cache WHERE key NOT IN "
+                "(SELECT key FROM extraction_cache ORDER BY created_at DESC LIMIT ?)",
+                (self.disk_max_entries,),
+            )
@@ -3,14 +3,37 @@ LLM Client wrapper for Gemini via LiteLLM.
 Provides structured extraction and linking capabilities.
 """
 
+import asyncio
+import functools
 import json
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from dataclasses import replace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
 
 import litellm
 from pydantic import ValidationError
 
 from kg_mcp.config import get_settings
+from kg_mcp.kg.similarity import select_candidates
+from kg_mcp.llm.batcher import MicroBatcher
+from kg_mcp.llm.cache import ExtractionCache, cache_key
+from kg_mcp.llm.hedging import Hedger
+from kg_mcp.llm.http import get_http_handler
+from kg_mcp.llm.providers import (
+    GEMINI_DIRECT,
+    LITELLM,
+    PROVIDER_ERRORS,
+    Provider,
+    ProviderPool,
+    ProviderUnavailableError,
+    gemini_direct_provider,
+    litellm_provider,
+    secondary_provider,
+)
+from kg_mcp.llm.ratelimit import RateLimiter
+from kg_mcp.llm.routing import FAST, ModelRouter, Route
+from kg_mcp.llm.streaming import StreamingJSONParser
 from kg_mcp.llm.schemas import (
     ExtractionResult,
     LinkingResult,
@@ -24,11 +47,32 @@ from kg_mcp.llm.schemas import (
     MergeSuggestion,
     RelationshipSuggestion,
 )
-from kg_mcp.llm.prompts.extractor import get_extractor_prompt
+from kg_mcp.llm.prompts.budget import estimate_message_tokens, estimate_tokens
+from kg_mcp.llm.prompts.extractor import (
+    EXTRACTOR_SYSTEM_PROMPT,
+    get_batch_extractor_prompt,
+    get_extractor_prompt,
+)
 from kg_mcp.llm.prompts.linker import get_linker_prompt
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Callback receiving each streamed entity: (field, validated model)
+EntityCallback = Callable[[str, Any], Awaitable[None]]
+
+# Extraction fields whose elements are reported while streaming
+STREAMED_ENTITIES = {
+    "goals": GoalExtract,
+    "constraints": ConstraintExtract,
+    "preferences": PreferenceExtract,
+    "pain_points": PainPointExtract,
+    "strategies": StrategyExtract,
+    "acceptance_criteria": AcceptanceCriteriaExtract,
+    "code_references": CodeReference,
+}
+
 
 class LLMClient:
     """Client for LLM operations using LiteLLM."""
@@ -56,6 +100,60 @@ class LLMClient:
                 self.model = self.settings.llm_model  # fallback
                 logger.warning("No LLM API credentials configured!")
 
+        self.extraction_cache: Optional[ExtractionCache] = None
+        if self.settings.llm_cache_enabled:
+            self.extraction_cache = ExtractionCache(
+                max_entries=self.settings.llm_cache_max_entries,
+                ttl=self.settings.llm_cache_ttl,
+                path=self.settings.llm_cache_path or None,
+                disk_max_entries=self.settings.llm_cache_disk_max_entries,
+            )
+
+        self._rate_limiters: Dict[str, RateLimiter] = {}
+
+        self.router = ModelRouter(
+            default_model=self.settings.kg_model_default or self.model,
+            fast_model=self.settings.kg_model_fast,
+            reason_model=self.settings.kg_model_reason,
+            reason_chars=self.settings.kg_route_reason_chars,
+            reason_diff_chars=self.settings.kg_route_reason_diff_chars,
+            reason_files=self.settings.kg_route_reason_files,
+            reason_items=self.settings.kg_route_reason_items,
+        )
+
+        # With LLM_MODE=both, requests fail over to the secondary provider
+        # while the primary's circuit is open
+        providers = [self._primary_provider()]
+        secondary = secondary_provider(self.settings)
+        if secondary is not None and secondary.name != providers[0].name:
+            providers.append(secondary)
+        self.pool = ProviderPool(
+            providers,
+            failure_threshold=self.settings.llm_failure_threshold,
+            reset_timeout=self.settings.llm_circuit_reset_timeout,
+            latency_ratio=self.settings.llm_failover_latency_ratio,
+            latency_ttl=self.settings.llm_failover_latency_ttl,
+        )
+
+        # Slow extractions get a backup request, on the secondary provider
+        # when there is one
+        self.hedger: Optional[Hedger] = None
+        if self.settings.llm_hedge_enabled:
+            self.hedger = Hedger(
+                percentile=self.settings.llm_hedge_percentile,
+                min_delay=self.settings.llm_hedge_min_delay,
+                min_samples=self.settings.llm_hedge_min_samples,
+            )
+
+        # Concurrent extractions share one request when batching is enabled
+        self.batcher: Optional[MicroBatcher[str, Tuple[Any, bool]]] = None
+        if self.settings.llm_batch_window_ms > 0 and self.settings.llm_batch_max_size > 1:
+            self.batcher = MicroBatcher(
+                self._extract_batch,
+                window_ms=self.settings.llm_batch_window_ms,
+                max_size=self.settings.llm_batch_max_size,
+            )
+
     def _configure_gemini_direct(self):
         """Configure for Gemini Direct API."""
         self.provider = "gemini"
@@ -84,6 +182,20 @@ class LLMClient:
         self.model = self.settings.litellm_model or self.settings.llm_model
         logger.info(f"Using LiteLLM Gateway at {self.api_base} with model {self.model}")
 
+    def _primary_provider(self) -> Provider:
+        """The configured provider, serving the routed models."""
+        if getattr(self, "provider", None) == "gemini":
+            name, configured = GEMINI_DIRECT, gemini_direct_provider(self.settings)
+        else:
+            name, configured = LITELLM, litellm_provider(self.settings)
+        return Provider(
+            name=name,
+            model=self.model,
+            api_base=self.api_base,
+            api_key=self.api_key,
+            health_url=configured.health_url if configured else None,
+        )
+
     async def extract_entities(
         self,
         user_text: str,
@@ -91,6 +203,7 @@ class LLMClient:
         diff: Optional[str] = None,
         symbols: Optional[List[str]] = None,
         context: Optional[str] = None,
+        on_entity: Optional[EntityCallback] = None,
     ) -> ExtractionResult:
         """
         Extract structured entities from user text using LLM.
@@ -101,6 +214,10 @@ class LLMClient:
             diff: Optional code diff
             symbols: Optional list of code symbols
             context: Optional additional context
+            on_entity: Optional callback awaited with ("goals", GoalExtract),
+                ("preferences", PreferenceExtract), ... for each entity as it
+                is generated, when LLM_STREAM is enabled. Not called for
+                cached results.
 
         Returns:
             ExtractionResult with extracted entities
@@ -114,39 +231,52 @@ class LLMClient:
             diff=diff,
             symbols=symbols,
             context=context,
+            diff_max_tokens=self.settings.llm_diff_max_tokens,
+            max_tokens=self.settings.llm_prompt_max_tokens,
         )
 
+        route = self.router.route_extraction(user_text, files=files, diff=diff)
+        llm_kwargs = self._extraction_kwargs(system_prompt, user_prompt, route.model)
+
         try:
-            # Build kwargs for litellm
-            llm_kwargs = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                "temperature": self.settings.llm_temperature,
-                "max_tokens": self.settings.llm_max_tokens,
-                "response_format": {"type": "json_object"},
-            }
-            
-            # Add gateway config if using LiteLLM Gateway
-            if self.api_base:
-                llm_kwargs["api_base"] = self.api_base
-                llm_kwargs["api_key"] = self.api_key
-            
-            response = await litellm.acompletion(**llm_kwargs)
-
-            content = response.choices[0].message.content
-            if not content:
+            # Identical prompts with identical sampling reuse the last result
+            key = cache_key(**llm_kwargs)
+            if self.extraction_cache:
+                cached = await self.extraction_cache.get(key)
+                if cached is not None:
+                    logger.info("Extraction cache hit")
+                    return cached
+
+            # Only fast-tier extractions are batched; long ones go to the
+            # reasoning model on their own
+            cacheable = True
+            if on_entity is not None and self.settings.llm_stream:
+                data = await self._stream_json(
+                    llm_kwargs, route, functools.partial(self._emit_entity, on_entity)
+                )
+            elif self.batcher is not None and route.tier == FAST:
+                data, cacheable = await self.batcher.submit(user_prompt)
+            elif self.hedger is not None and (hedge := self._hedge_target(route)) is not None:
+                hedge_route, hedge_provider = hedge
+                data = await self.hedger.run(
+                    lambda: self._complete_json(llm_kwargs, route),
+                    lambda: self._complete_json(llm_kwargs, hedge_route, hedge_provider),
+                )
+            else:
+                data = await self._complete_json(llm_kwargs, route)
+            if data is None:
                 logger.warning("Empty response from LLM")
                 return ExtractionResult()
 
-            # Parse JSON response
-            data = json.loads(content)
             logger.debug(f"Extracted data: {json.dumps(data, indent=2)}")
 
             # Validate and convert to pydantic models
-            return self._parse_extraction_result(data)
+            result = self._parse_extraction_result(data)
+            # Batched answers, fallbacks for a failed batch and empty objects
+            # are not trusted enough to be replayed for the cache TTL
+            if self.extraction_cache and cacheable and data:
+                await self.extraction_cache.set(key, result)
+            return result
 
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse LLM response as JSON: {e}")
@@ -155,6 +285,270 @@ class LLMClient:
             logger.error(f"LLM extraction failed: {e}")
             raise
 
+    def _extraction_kwargs(
+        self, system_prompt: str, user_prompt: str, model: str
+    ) -> Dict[str, Any]:
+        """Build litellm kwargs for an extraction prompt."""
+        return {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "temperature": self.settings.llm_temperature,
+            "max_tokens": self.settings.llm_max_tokens,
+            "response_format": {"type": "json_object"},
+        }
+
+    def _hedge_target(self, route: Route) -> Optional[Tuple[Route, Provider]]:
+        """
+        Route and provider of the backup request for a hedged call, or None
+        if fewer than two providers are available to hedge across.
+        """
+        candidates = self.pool.candidates()
+        if len(candidates) < 2:
+            return None
+        secondary = next((p for p in candidates if p is not self.pool.primary), candidates[1])
+        reason = f"hedge via {secondary.name}"
+        return Route(route.task, route.tier, secondary.model, reason), secondary
+
+    async def _complete_json(
+        self,
+        llm_kwargs: Dict[str, Any],
+        route: Route,
+        provider: Optional[Provider] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Run a completion that answers with a JSON object, recording its route
+        and latency.
+
+        Returns the parsed object, or None if the response was empty. Raises
+        json.JSONDecodeError if it is not valid JSON.
+        """
+        response = await self._call(
+            llm_kwargs, route, lambda kwargs: litellm.acompletion(**kwargs), provider
+        )
+
+        content = response.choices[0].message.content
+        if not content:
+            return None
+        data: Dict[str, Any] = json.loads(content)
+        return data
+
+    async def _stream_json(
+        self,
+        llm_kwargs: Dict[str, Any],
+        route: Route,
+        on_item: Callable[[str, Any], Awaitable[None]],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Like _complete_json, but streams the completion and awaits
+        `on_item(key, element)` for each top-level array element as soon as
+        it is complete.
+        """
+
+        async def consume(kwargs: Dict[str, Any]) -> StreamingJSONParser:
+            parser = StreamingJSONParser()
+            stream = await litellm.acompletion(**kwargs, stream=True)
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    for key, item in parser.feed(delta):
+                        await on_item(key, item)
+            return parser
+
+        parser = await self._call(llm_kwargs, route, consume)
+        if not parser.text.strip():
+            return None
+        data: Dict[str, Any] = parser.result()
+        return data
+
+    async def _emit_entity(self, on_entity: EntityCallback, field: str, item: Any) -> None:
+        """Validate a streamed element and pass it on; invalid ones are skipped."""
+        model = STREAMED_ENTITIES.get(field)
+        if model is None or not isinstance(item, dict):
+            return
+        try:
+            entity = model(**item)
+        except ValidationError:
+            return
+        await on_entity(field, entity)
+
+    async def _call(
+        self,
+        llm_kwargs: Dict[str, Any],
+        route: Route,
+        call: Callable[[Dict[str, Any]], Awaitable[T]],
+        provider: Optional[Provider] = None,
+    ) -> T:
+        """
+        Run `call(llm_kwargs)` on the first available provider, moving on to
+        the next one when a provider fails (see providers.PROVIDER_ERRORS).
+
+        With `provider`, only that provider is tried.
+
+        Raises:
+            ProviderUnavailableError: If every provider's circuit is open
+        """
+        candidates = [provider] if provider is not None else self.pool.candidates()
+        last_error: Optional[BaseException] = None
+        for i, candidate in enumerate(candidates):
+            if not self.pool.acquire(candidate):
+                continue
+            candidate_route = route
+            if candidate is not self.pool.primary:
+                candidate_route = replace(
+                    route, model=candidate.model, reason=f"{route.reason}, via {candidate.name}"
+                )
+            try:
+                return await self._call_provider(llm_kwargs, candidate_route, call, candidate)
+            except PROVIDER_ERRORS as e:
+                last_error = e
+                if i < len(candidates) - 1:
+                    self.pool.record_failover(candidate)
+                    logger.warning(f"LLM provider {candidate.name} failed ({e}), failing over")
+
+        if last_error is not None:
+            raise last_error
+        raise ProviderUnavailableError("No LLM provider available: every circuit is open")
+
+    async def _call_provider(
+        self,
+        llm_kwargs: Dict[str, Any],
+        route: Route,
+        call: Callable[[Dict[str, Any]], Awaitable[T]],
+        provider: Provider,
+    ) -> T:
+        """
+        Run `call` against one provider under the model's rate limiter,
+        recording the route, latency and outcome.
+        """
+        # The primary serves the routed model; other providers their own
+        llm_kwargs = provider.apply(llm_kwargs, override_model=provider is not self.pool.primary)
+
+        # OpenAI-compatible providers use the shared session through
+        # litellm.aclient_session; Gemini needs it passed explicitly
+        if _provider_of(llm_kwargs["model"]) == "gemini":
+            llm_kwargs["client"] = get_http_handler()
+
+        limiter = self.rate_limiter(llm_kwargs["model"])
+        started = time.monotonic()
+        try:
+            result = await limiter.run(lambda: call(llm_kwargs))
+        except asyncio.CancelledError:
+            self.pool.release(provider)
+            raise
+        except Exception as e:
+            latency = time.monotonic() - started
+            self.router.record(route, latency * 1000, ok=False)
+            if isinstance(e, PROVIDER_ERRORS):
+                self.pool.record(provider, latency, ok=False)
+            else:
+                # A bad request says nothing about the provider's health
+                self.pool.release(provider)
+            raise
+        latency = time.monotonic() - started
+        prompt_tokens, completion_tokens = _token_usage(llm_kwargs, result)
+        self.router.record(route, latency * 1000, True, prompt_tokens, completion_tokens)
+        self.pool.record(provider, latency, ok=True)
+        return result
+
+    def endpoints(self) -> List[str]:
+        """URLs on the hosts this client sends requests to (for connection warm-up)."""
+        urls = [p.api_base or p.health_url for p in self.pool.providers]
+        return [url for url in urls if url]
+
+    def rate_limiter(self, model: str) -> RateLimiter:
+        """Get the rate limiter for a model, configured from LLM_RATE_LIMITS."""
+        limiter = self._rate_limiters.get(model)
+        if limiter is None:
+            limits = self.settings.llm_rate_limits.get(model, {})
+            limiter = RateLimiter(
+                rpm=limits.get("rpm", self.settings.llm_rate_limit_rpm),
+                concurrency=int(limits.get("concurrency", self.settings.llm_max_concurrency)),
+                max_retries=self.settings.llm_max_retries,
+                backoff_base=self.settings.llm_backoff_base,
+                backoff_max=self.settings.llm_backoff_max,
+            )
+            self._rate_limiters[model] = limiter
+        return limiter
+
+    def stats(self) -> Dict[str, Any]:
+        """Provider health, routing, rate limits, hedging, batching and cache counters."""
+        stats: Dict[str, Any] = {
+            "providers": self.pool.stats(),
+            "routing": self.router.stats(),
+            "rate_limits": {
+                model: limiter.stats() for model, limiter in self._rate_limiters.items()
+            },
+        }
+        if self.hedger is not None:
+            stats["hedging"] = self.hedger.stats()
+        if self.batcher is not None:
+            stats["batching"] = self.batcher.stats()
+        if self.extraction_cache is not None:
+            stats["cache"] = self.extraction_cache.stats()
+        return stats
+
+    async def _extract_batch(self, user_prompts: List[str]) -> List[Any]:
+        """
+        Extract several messages with one request (MicroBatcher callback).
+
+        Returns (raw JSON object, cacheable) per message. Messages the combined
+        response does not answer with a JSON object, or all of them if the
+        request fails, are extracted on their own. Only a batch of one is
+        cacheable: answers to the combined prompt do not match the
+        single-message request the cache key describes.
+        """
+        single = self.router.route("extract", FAST, "short message")
+        if len(user_prompts) == 1:
+            llm_kwargs = self._extraction_kwargs(
+                EXTRACTOR_SYSTEM_PROMPT, user_prompts[0], single.model
+            )
+            return [(await self._complete_json(llm_kwargs, single), True)]
+
+        logger.info(f"Extracting a batch of {len(user_prompts)} messages")
+        route = self.router.route("extract_batch", FAST, f"{len(user_prompts)} messages")
+        system_prompt, user_prompt = get_batch_extractor_prompt(user_prompts)
+        llm_kwargs = self._extraction_kwargs(system_prompt, user_prompt, route.model)
+        llm_kwargs["max_tokens"] = min(
+            self.settings.llm_max_tokens * len(user_prompts), self.settings.llm_batch_max_tokens
+        )
+
+        results: List[Any] = [None] * len(user_prompts)
+        try:
+            data = await self._complete_json(llm_kwargs, route)
+            items = data.get("results") if isinstance(data, dict) else None
+            if isinstance(items, list) and len(items) == len(user_prompts):
+                results = [
+                    (item, False) if isinstance(item, dict) and item else None for item in items
+                ]
+            else:
+                logger.warning("Batched extraction did not return one result per message")
+        except Exception as e:
+            # Whatever went wrong with the combined request, each message
+            # still gets its own chance
+            logger.warning(f"Batched extraction failed, extracting messages one by one: {e}")
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing and len(missing) < len(user_prompts):
+            logger.warning(f"Batched extraction left {len(missing)} messages unanswered")
+        fallback = await asyncio.gather(
+            *(
+                self._complete_json(
+                    self._extraction_kwargs(
+                        EXTRACTOR_SYSTEM_PROMPT, user_prompts[i], single.model
+                    ),
+                    single,
+                )
+                for i in missing
+            ),
+            return_exceptions=True,
+        )
+        for i, outcome in zip(missing, fallback, strict=True):
+            results[i] = outcome if isinstance(outcome, BaseException) else (outcome, False)
+        return results
+
     async def link_entities(
         self,
         extraction: ExtractionResult,
@@ -176,17 +570,39 @@ class LLMClient:
         """
         logger.info("Linking extracted entities with existing graph...")
 
+        # Only the existing entities most similar to something extracted go in
+        # the prompt, so its size stays bounded as the project grows
+        k = self.settings.kg_link_top_k
+        existing_goals = select_candidates(
+            queries=[f"{g.title} {g.description or ''}" for g in extraction.goals],
+            items=existing_goals,
+            texts=[f"{g.get('title') or ''} {g.get('description') or ''}" for g in existing_goals],
+            k=k,
+        )
+        existing_preferences = select_candidates(
+            queries=[f"{p.category} {p.preference}" for p in extraction.preferences],
+            items=existing_preferences,
+            texts=[
+                f"{p.get('category') or ''} {p.get('preference') or ''}"
+                for p in existing_preferences
+            ],
+            k=k,
+        )
+
         system_prompt, user_prompt = get_linker_prompt(
             extraction=extraction,
             existing_goals=existing_goals,
             existing_preferences=existing_preferences,
             recent_interactions=recent_interactions,
+            max_tokens=self.settings.llm_prompt_max_tokens,
         )
 
+        route = self.router.route("link", FAST, "linking")
+
         try:
             # Build kwargs for litellm
             llm_kwargs = {
-                "model": self.model,
+                "model": route.model,
                 "messages": [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt},
@@ -195,20 +611,12 @@ class LLMClient:
                 "max_tokens": 2048,
                 "response_format": {"type": "json_object"},
             }
-            
-            # Add gateway config if using LiteLLM Gateway
-            if self.api_base:
-                llm_kwargs["api_base"] = self.api_base
-                llm_kwargs["api_key"] = self.api_key
-            
-            response = await litellm.acompletion(**llm_kwargs)
-
-            content = response.choices[0].message.content
-            if not content:
+
+            data = await self._complete_json(llm_kwargs, route)
+            if data is None:
                 logger.warning("Empty response from LLM for linking")
                 return LinkingResult()
 
-            data = json.loads(content)
             return self._parse_linking_result(data)
 
         except json.JSONDecodeError as e:
@@ -279,6 +687,40 @@ class LLMClient:
             return LinkingResult()
 
 
+def _token_usage(llm_kwargs: Dict[str, Any], result: Any) -> Tuple[int, int]:
+    """
+    Prompt and completion tokens of a call, as reported by the provider or,
+    without usage (e.g. streamed), estimated from the text.
+    """
+    usage = getattr(result, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    if isinstance(prompt_tokens, int) and isinstance(completion_tokens, int):
+        return prompt_tokens, completion_tokens
+
+    if isinstance(result, StreamingJSONParser):
+        content = result.text
+    else:
+        try:
+            content = result.choices[0].message.content
+        except (AttributeError, IndexError, TypeError):
+            content = None
+    return (
+        estimate_message_tokens(llm_kwargs["messages"]),
+        estimate_tokens(content if isinstance(content, str) else ""),
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _provider_of(model: str) -> Optional[str]:
+    """LiteLLM provider name for a model, or None if LiteLLM does not know it."""
+    try:
+        provider: str = litellm.get_llm_provider(model)[1]
+        return provider
+    except Exception:
+        return None
+
+
 # Singleton instance
 _llm_client: Optional[LLMClient] = None
 
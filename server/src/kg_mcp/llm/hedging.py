@@ -0,0 +1,103 @@
+"""
+Hedged requests for tail latency.
+
+If a request has not finished after the recent p-th percentile latency, a
+second, equivalent request is started; whichever succeeds first is used and
+the other is cancelled. Only the slowest few percent of requests are
+duplicated, which trims the tail without doubling load.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Hedger:
+    """
+    Runs a request with a delayed backup.
+
+    Args:
+        percentile: Latency percentile after which the backup starts
+        min_delay: Delay used until `min_samples` latencies were observed,
+            and the lower bound afterwards
+        min_samples: Observations needed before the percentile is trusted
+        window: Latencies kept for the percentile
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        min_delay: float = 2.0,
+        min_samples: int = 20,
+        window: int = 200,
+    ):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._counters = {"requests": 0, "hedged": 0, "hedge_wins": 0}
+
+    def delay(self) -> float:
+        """Seconds to wait before starting the backup request."""
+        if len(self._latencies) < self.min_samples:
+            return self.min_delay
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return max(self.min_delay, ordered[index])
+
+    async def run(
+        self,
+        primary: Callable[[], Awaitable[T]],
+        backup: Callable[[], Awaitable[T]],
+    ) -> T:
+        """
+        Return the first successful result of `primary` and, if it is slow,
+        `backup`. Raises the primary's error if both fail.
+        """
+        self._counters["requests"] += 1
+        first = asyncio.ensure_future(primary())
+        tasks = {first}
+        # Each attempt's latency counts from its own launch, so a winning
+        # backup does not record the delay it waited out
+        launched = {first: time.monotonic()}
+        try:
+            delay = self.delay()
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self._counters["hedged"] += 1
+                logger.info(f"Request slower than {delay:.2f}s, sending a hedge")
+                second = asyncio.ensure_future(backup())
+                tasks.add(second)
+                launched[second] = time.monotonic()
+
+            errors: Dict[asyncio.Future[T], BaseException] = {}
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is not None:
+                        errors[task] = error
+                        continue
+                    if task is not first:
+                        self._counters["hedge_wins"] += 1
+                    self._latencies.append(time.monotonic() - launched[task])
+                    return task.result()
+            raise errors.get(first) or next(iter(errors.values()))
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests, hedges sent, hedges that won, and the current delay."""
+        requests = self._counters["requests"]
+        return {
+            **self._counters,
+            "hedge_rate": round(self._counters["hedged"] / requests, 3) if requests else 0.0,
+            "delay_s": round(self.delay(), 3),
+        }
@@ -0,0 +1,98 @@
+"""
+Shared HTTP connections for LLM calls.
+
+One keep-alive httpx.AsyncClient (HTTP/2 when the `h2` package is installed)
+serves every LiteLLM request: OpenAI-compatible gateway calls pick it up
+through `litellm.aclient_session`, Gemini calls through the `client` argument
+(see `get_http_handler`). `warm_up` opens the connections at startup, so the
+first request does not pay for DNS and the TLS handshake.
+"""
+
+import asyncio
+import importlib.util
+import logging
+from typing import Iterable, Optional
+
+import httpx
+import litellm
+from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
+
+from kg_mcp.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def http2_available() -> bool:
+    """Whether httpx can negotiate HTTP/2 (needs the `h2` package)."""
+    return importlib.util.find_spec("h2") is not None
+
+
+# Singleton instances
+_client: Optional[httpx.AsyncClient] = None
+_handler: Optional[AsyncHTTPHandler] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared HTTP client and install it into LiteLLM."""
+    global _client, _handler
+    if _client is None or _client.is_closed:
+        settings = get_settings()
+        _client = httpx.AsyncClient(
+            http2=settings.llm_http2 and http2_available(),
+            limits=httpx.Limits(
+                max_connections=settings.llm_http_max_connections,
+                max_keepalive_connections=settings.llm_http_max_connections,
+                keepalive_expiry=settings.llm_http_keepalive,
+            ),
+            timeout=httpx.Timeout(settings.llm_http_timeout, connect=10.0),
+            follow_redirects=True,
+        )
+        litellm.aclient_session = _client
+        _handler = None
+    return _client
+
+
+def get_http_handler() -> AsyncHTTPHandler:
+    """Get a LiteLLM HTTP handler that sends through the shared client."""
+    global _handler
+    client = get_http_client()
+    if _handler is None:
+        _handler = AsyncHTTPHandler(timeout=client.timeout)
+        _handler.client = client
+    return _handler
+
+
+async def warm_up(urls: Iterable[str], timeout: float = 5.0) -> int:
+    """
+    Open a connection to each URL ahead of the first LLM call.
+
+    Any HTTP response counts: the point is the DNS lookup and TLS handshake,
+    not the status. Failures are logged and ignored.
+
+    Returns:
+        Number of endpoints reached
+    """
+    client = get_http_client()
+
+    async def probe(url: str) -> bool:
+        try:
+            response = await client.head(url, timeout=timeout)
+            logger.info(f"Warmed up {url} ({response.http_version})")
+            return True
+        except httpx.HTTPError as e:
+            logger.warning(f"Warm-up of {url} failed: {e}")
+            return False
+
+    results = await asyncio.gather(*(probe(url) for url in dict.fromkeys(urls) if url))
+    return sum(results)
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (call at shutdown)."""
+    global _client, _handler
+    if _client is not None:
+        await _client.aclose()
+        if litellm.aclient_session is _client:
+            litellm.aclient_session = None
+        _client = None
+        _handler = None
@@ -0,0 +1,97 @@
+"""
+Token estimation and prompt budgeting.
+
+Token counts are estimated locally from text length, which is close enough
+for budgeting and needs no tokenizer. A prompt is made of named sections
+with a priority; when their estimated total is over budget, the lowest
+priority sections are trimmed first (from their end, at line boundaries),
+down to each section's minimum.
+"""
+
+import logging
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Rough characters per token for English and code
+CHARS_PER_TOKEN = 4
+
+# Tokens a chat message costs beyond its content (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+TRUNCATION_MARKER = "\n... [truncated]"
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate number of tokens in `text`."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def estimate_message_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Approximate prompt tokens of chat messages."""
+    return sum(
+        estimate_tokens(str(m.get("content") or "")) + MESSAGE_OVERHEAD_TOKENS for m in messages
+    )
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut `text` to about `max_tokens` tokens, at a line boundary when one is
+    close, marking the cut. Returns "" for a budget of 0.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    max_chars = max(0, max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARKER))
+    cut = text[:max_chars]
+    newline = cut.rfind("\n")
+    if newline >= max_chars // 2:
+        cut = cut[:newline]
+    return cut + TRUNCATION_MARKER
+
+
+@dataclass
+class Section:
+    """
+    One part of a prompt.
+
+    Args:
+        name: Key of the section in PromptBudget.fit's result
+        text: Section content
+        priority: Higher priority sections are trimmed later
+        min_tokens: The section is not trimmed below this
+    """
+
+    name: str
+    text: str
+    priority: int
+    min_tokens: int = 0
+
+
+class PromptBudget:
+    """Fits prompt sections into `max_tokens` (0 = unbounded)."""
+
+    def __init__(self, max_tokens: int):
+        self.max_tokens = max_tokens
+
+    def fit(self, sections: List[Section]) -> Dict[str, str]:
+        """Return each section's text, trimmed lowest priority first to fit the budget."""
+        texts = {s.name: s.text for s in sections}
+        if self.max_tokens <= 0:
+            return texts
+
+        over = sum(estimate_tokens(t) for t in texts.values()) - self.max_tokens
+        for section in sorted(sections, key=lambda s: s.priority):
+            if over <= 0:
+                break
+            tokens = estimate_tokens(section.text)
+            keep = max(section.min_tokens, tokens - over)
+            if keep >= tokens:
+                continue
+            texts[section.name] = truncate_to_tokens(section.text, keep)
+            over -= tokens - estimate_tokens(texts[section.name])
+            logger.info(f"Trimmed prompt section {section.name} from ~{tokens} to ~{keep} tokens")
+        return texts
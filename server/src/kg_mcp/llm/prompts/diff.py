@@ -0,0 +1,227 @@
+"""
+Diff pre-processing for the extractor prompt.
+
+Parses a unified diff and renders a compact summary that fits a token
+budget: per file the change counts and the symbols touched, then each hunk
+header with its added/removed lines. Lockfiles, binary files and
+whitespace-only hunks are dropped. When the full rendering is too large,
+hunk bodies are shortened, then left out, before files are cut.
+"""
+
+import re
+from dataclasses import dataclass, field
+from pathlib import PurePosixPath
+from typing import List, Optional
+
+from kg_mcp.llm.prompts.budget import CHARS_PER_TOKEN
+
+# Lines of a hunk body kept at the second detail level
+SHORT_HUNK_LINES = 12
+
+LOCKFILES = {
+    "package-lock.json",
+    "npm-shrinkwrap.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "poetry.lock",
+    "Pipfile.lock",
+    "uv.lock",
+    "Cargo.lock",
+    "go.sum",
+    "composer.lock",
+    "Gemfile.lock",
+    "packages.lock.json",
+}
+
+_HUNK_HEADER = re.compile(
+    r"^@@ -\d+(?:,(?P<old>\d+))? \+\d+(?:,(?P<new>\d+))? @@(?P<context>.*)$"
+)
+_SYMBOL = re.compile(
+    r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?(?:pub(?:\(\w+\))?\s+)?"
+    r"(?:def|class|function|func|fn|interface|struct|enum|trait|impl|type|const|let|var)\s+"
+    r"(?:\([^)]*\)\s*)?([A-Za-z_$][\w$]*)"
+)
+
+
+@dataclass
+class Hunk:
+    """One @@ hunk of a file diff."""
+
+    header: str
+    lines: List[str] = field(default_factory=list)
+
+    @property
+    def changes(self) -> List[str]:
+        return [line for line in self.lines if line[:1] in ("+", "-")]
+
+    @property
+    def whitespace_only(self) -> bool:
+        """Whether the hunk only changes whitespace."""
+        removed = "".join("".join(line[1:].split()) for line in self.lines if line[0] == "-")
+        added = "".join("".join(line[1:].split()) for line in self.lines if line[0] == "+")
+        return removed == added
+
+
+@dataclass
+class FileDiff:
+    """Changes to one file."""
+
+    path: str
+    hunks: List[Hunk] = field(default_factory=list)
+    binary: bool = False
+
+    @property
+    def added(self) -> int:
+        return sum(1 for h in self.hunks for line in h.lines if line.startswith("+"))
+
+    @property
+    def removed(self) -> int:
+        return sum(1 for h in self.hunks for line in h.lines if line.startswith("-"))
+
+    def symbols(self) -> List[str]:
+        """Names of functions/classes/... changed or enclosing a change."""
+        names: List[str] = []
+        for hunk in self.hunks:
+            header = _HUNK_HEADER.match(hunk.header)
+            candidates = [header.group("context")] if header else []
+            candidates += [line[1:] for line in hunk.changes]
+            for text in candidates:
+                match = _SYMBOL.match(text)
+                if match and match.group(1) not in names:
+                    names.append(match.group(1))
+        return names
+
+
+def parse_unified_diff(diff: str) -> List[FileDiff]:
+    """Parse `git diff`-style unified diff text into files and hunks."""
+    parser = _DiffParser()
+    for line in diff.splitlines():
+        parser.feed(line)
+    return parser.files
+
+
+class _DiffParser:
+    """
+    Line by line state of parse_unified_diff.
+
+    A hunk's body is as long as the old/new line counts in its @@ header, so
+    an added "++ x" or removed "-- x" line ("+++ x" / "--- x" in the diff) is
+    only taken for a file header once those counts are used up. An empty line
+    inside a hunk is a context line whose leading space was stripped (as
+    editors do), like `patch` and `git apply` read it.
+    """
+
+    def __init__(self) -> None:
+        self.files: List[FileDiff] = []
+        self.current: Optional[FileDiff] = None
+        self.hunk: Optional[Hunk] = None
+        self.old_left = 0
+        self.new_left = 0
+
+    def feed(self, line: str) -> None:
+        header = _HUNK_HEADER.match(line)
+        if self.hunk is not None and self._in_hunk_body(line):
+            self._add_hunk_line(self.hunk, line or " ")
+        elif line.startswith("diff --git "):
+            parts = line.split(" b/", 1)
+            self._start_file(parts[1] if len(parts) == 2 else line[11:])
+        elif line.startswith("--- "):
+            self._file_header(line[4:].strip().removeprefix("a/"), rename=False)
+        elif line.startswith("+++ "):
+            self._file_header(line[4:].strip(), rename=True)
+        elif line.startswith("Binary files ") and self.current is not None:
+            self.current.binary = True
+        elif header is not None and self.current is not None:
+            self._start_hunk(self.current, header)
+        elif self.hunk is not None and line[:1] in ("+", "-", " ", "\\"):
+            # Past the header counts (hand-written or miscounted hunk)
+            self.hunk.lines.append(line)
+
+    def _in_hunk_body(self, line: str) -> bool:
+        if line[:1] == "\\":
+            # "\ No newline at end of file" follows the last counted line
+            return True
+        return (self.old_left > 0 or self.new_left > 0) and line[:1] in ("+", "-", " ", "")
+
+    def _add_hunk_line(self, hunk: Hunk, line: str) -> None:
+        hunk.lines.append(line)
+        if line[:1] in ("-", " "):
+            self.old_left -= 1
+        if line[:1] in ("+", " "):
+            self.new_left -= 1
+
+    def _start_file(self, path: str) -> None:
+        self.current = FileDiff(path=path)
+        self.files.append(self.current)
+        self.hunk = None
+
+    def _file_header(self, path: str, rename: bool) -> None:
+        """Handle a ---/+++ line; +++ names the file unless it was deleted."""
+        if self.current is None or self.current.hunks:
+            self._start_file(path.removeprefix("b/"))
+        elif rename and path != "/dev/null":
+            self.current.path = path.removeprefix("b/")
+        self.hunk = None
+
+    def _start_hunk(self, current: FileDiff, header: "re.Match[str]") -> None:
+        self.hunk = Hunk(header=header.group(0))
+        current.hunks.append(self.hunk)
+        self.old_left = int(header.group("old") or 1)
+        self.new_left = int(header.group("new") or 1)
+
+
+def is_lockfile(path: str) -> bool:
+    return PurePosixPath(path).name in LOCKFILES
+
+
+def summarize_diff(diff: str, max_tokens: int = 1000) -> str:
+    """
+    Render a diff for the extractor within roughly `max_tokens` tokens.
+
+    Text that is not a unified diff is cut to the budget.
+    """
+    max_chars = max(1, max_tokens) * CHARS_PER_TOKEN
+    files = parse_unified_diff(diff)
+    if not files:
+        return diff if len(diff) <= max_chars else diff[:max_chars] + "\n... [truncated]"
+
+    kept: List[FileDiff] = []
+    skipped: List[str] = []
+    for file_diff in files:
+        if file_diff.binary or is_lockfile(file_diff.path):
+            skipped.append(file_diff.path)
+            continue
+        file_diff.hunks = [h for h in file_diff.hunks if not h.whitespace_only]
+        if file_diff.hunks:
+            kept.append(file_diff)
+        else:
+            skipped.append(file_diff.path)
+
+    footer = f"[skipped: {', '.join(skipped)}]" if skipped else ""
+    for detail in (2, 1, 0):
+        text = _render(kept, detail, footer)
+        if len(text) <= max_chars:
+            return text
+    return text[:max_chars].rsplit("\n", 1)[0] + "\n... [truncated]"
+
+
+def _render(files: List[FileDiff], detail: int, footer: str) -> str:
+    """detail 2: full hunks, 1: shortened hunks, 0: file summaries and hunk headers."""
+    out: List[str] = []
+    for file_diff in files:
+        out.append(f"{file_diff.path} (+{file_diff.added} -{file_diff.removed})")
+        symbols = file_diff.symbols()
+        if symbols:
+            out.append(f"  symbols: {', '.join(symbols)}")
+        for hunk in file_diff.hunks:
+            out.append(hunk.header)
+            if detail == 0:
+                continue
+            changes = hunk.changes
+            if detail == 1 and len(changes) > SHORT_HUNK_LINES:
+                omitted = len(changes) - SHORT_HUNK_LINES
+                changes = changes[:SHORT_HUNK_LINES] + [f"  ... {omitted} more changed lines"]
+            out.extend(changes)
+    if footer:
+        out.append(footer)
+    return "\n".join(out)
@@ -4,6 +4,8 @@ Extractor prompt template for entity extraction from user text.
 
 from typing import List, Optional, Tuple
 
+from kg_mcp.llm.prompts.budget import PromptBudget, Section
+from kg_mcp.llm.prompts.diff import summarize_diff
 
 EXTRACTOR_SYSTEM_PROMPT = """You are an expert at analyzing developer requests and extracting structured information.
 Your task is to analyze the user's message and extract:
@@ -38,12 +40,43 @@ OUTPUT FORMAT (JSON):
 }"""
 
 
+# The user's message is trimmed last, and never below this
+USER_TEXT_MIN_TOKENS = 1000
+
+
+BATCH_INSTRUCTIONS = """
+
+BATCH MODE:
+You will receive several independent messages, each starting with a line
+"=== MESSAGE <n> ===". Analyze each message on its own, as if it were the only one.
+Return a JSON object {"results": [...]} with exactly one object in the format above
+per message, in message order."""
+
+
+def get_batch_extractor_prompt(user_prompts: List[str]) -> Tuple[str, str]:
+    """
+    Build one extractor prompt covering several messages.
+
+    Args:
+        user_prompts: User prompts built by get_extractor_prompt
+
+    Returns:
+        Tuple of (system_prompt, user_prompt)
+    """
+    sections = [
+        f"=== MESSAGE {i} ===\n{prompt}" for i, prompt in enumerate(user_prompts)
+    ]
+    return EXTRACTOR_SYSTEM_PROMPT + BATCH_INSTRUCTIONS, "\n\n".join(sections)
+
+
 def get_extractor_prompt(
     user_text: str,
     files: Optional[List[str]] = None,
     diff: Optional[str] = None,
     symbols: Optional[List[str]] = None,
     context: Optional[str] = None,
+    diff_max_tokens: int = 1000,
+    max_tokens: int = 0,
 ) -> Tuple[str, str]:
     """
     Build the extractor prompt for entity extraction.
@@ -54,27 +87,41 @@ def get_extractor_prompt(
         diff: Optional code diff
         symbols: Optional list of symbols
         context: Optional additional context
+        diff_max_tokens: Approximate token budget for the summarized diff
+        max_tokens: Approximate token budget for all of the above (0 = unbounded);
+            context, then the diff, files and symbols are trimmed first
 
     Returns:
         Tuple of (system_prompt, user_prompt)
     """
-    user_prompt_parts = [f"USER MESSAGE:\n{user_text}"]
+    sections = PromptBudget(max_tokens).fit(
+        [
+            Section("user_text", user_text, priority=4, min_tokens=USER_TEXT_MIN_TOKENS),
+            Section("symbols", ", ".join(symbols or []), priority=3),
+            Section("files", "\n".join(f"- {f}" for f in files or []), priority=2),
+            # Changed lines per hunk, shortened to fit the diff budget
+            Section(
+                "diff",
+                summarize_diff(diff, max_tokens=diff_max_tokens) if diff else "",
+                priority=1,
+            ),
+            Section("context", context or "", priority=0),
+        ]
+    )
+
+    user_prompt_parts = [f"USER MESSAGE:\n{sections['user_text']}"]
 
-    if files:
-        files_str = "\n".join(f"- {f}" for f in files)
-        user_prompt_parts.append(f"\nFILES INVOLVED:\n{files_str}")
+    if sections["files"]:
+        user_prompt_parts.append(f"\nFILES INVOLVED:\n{sections['files']}")
 
-    if diff:
-        # Truncate large diffs
-        truncated_diff = diff[:2000] + "..." if len(diff) > 2000 else diff
-        user_prompt_parts.append(f"\nCODE DIFF:\n```\n{truncated_diff}\n```")
+    if sections["diff"]:
+        user_prompt_parts.append(f"\nCODE DIFF:\n```\n{sections['diff']}\n```")
 
-    if symbols:
-        symbols_str = ", ".join(symbols)
-        user_prompt_parts.append(f"\nSYMBOLS REFERENCED: {symbols_str}")
+    if sections["symbols"]:
+        user_prompt_parts.append(f"\nSYMBOLS REFERENCED: {sections['symbols']}")
 
-    if context:
-        user_prompt_parts.append(f"\nADDITIONAL CONTEXT:\n{context}")
+    if sections["context"]:
+        user_prompt_parts.append(f"\nADDITIONAL CONTEXT:\n{sections['context']}")
 
     user_prompt_parts.append(
         "\n\nAnalyze the above and extract structured information. "
@@ -2,11 +2,14 @@
 Linker prompt template for entity deduplication and relationship inference.
 """
 
-import json
+import logging
 from typing import Any, Dict, List, Tuple
 
+from kg_mcp.llm.prompts.budget import estimate_tokens
 from kg_mcp.llm.schemas import ExtractionResult
 
+logger = logging.getLogger(__name__)
+
 
 LINKER_SYSTEM_PROMPT = """You are an expert at analyzing knowledge graphs and detecting duplicates/relationships.
 
@@ -62,6 +65,7 @@ def get_linker_prompt(
     existing_goals: List[Dict[str, Any]],
     existing_preferences: List[Dict[str, Any]],
     recent_interactions: List[Dict[str, Any]],
+    max_tokens: int = 0,
 ) -> Tuple[str, str]:
     """
     Build the linker prompt for entity linking and relationship inference.
@@ -71,42 +75,54 @@ def get_linker_prompt(
         existing_goals: List of existing goals from the graph
         existing_preferences: List of existing preferences
         recent_interactions: Recent interactions for context
+        max_tokens: Approximate token budget for the above (0 = unbounded); whole
+            entries are dropped from the end of the recent interactions, then
+            preferences, then goals. The extracted entities are never cut.
 
     Returns:
         Tuple of (system_prompt, user_prompt)
     """
+    goal_lines = [
+        f"- ID: {goal.get('id')}, Title: {goal.get('title')}, Status: {goal.get('status')}"
+        for goal in existing_goals[:20]  # Limit to 20
+    ]
+    preference_lines = [
+        f"- ID: {pref.get('id')}, Category: {pref.get('category')}, "
+        f"Preference: {pref.get('preference')}"
+        for pref in existing_preferences[:10]
+    ]
+    interaction_lines = [
+        f"- {interaction.get('timestamp', 'N/A')}: {interaction.get('user_text', '')[:100]}..."
+        for interaction in recent_interactions[:5]
+    ]
+
+    extraction_json = extraction.model_dump_json(indent=2)
+    if max_tokens > 0:
+        _drop_entries(
+            [interaction_lines, preference_lines, goal_lines],
+            max_tokens - estimate_tokens(extraction_json),
+        )
+
     user_prompt_parts = []
 
     # Add extracted entities
     user_prompt_parts.append("NEWLY EXTRACTED ENTITIES:")
-    user_prompt_parts.append(f"```json\n{extraction.model_dump_json(indent=2)}\n```")
+    user_prompt_parts.append(f"```json\n{extraction_json}\n```")
 
     # Add existing goals
-    if existing_goals:
+    if goal_lines:
         user_prompt_parts.append("\nEXISTING GOALS IN GRAPH:")
-        for goal in existing_goals[:20]:  # Limit to 20
-            user_prompt_parts.append(
-                f"- ID: {goal.get('id')}, Title: {goal.get('title')}, "
-                f"Status: {goal.get('status')}"
-            )
+        user_prompt_parts.append("\n".join(goal_lines))
 
     # Add existing preferences
-    if existing_preferences:
+    if preference_lines:
         user_prompt_parts.append("\nEXISTING PREFERENCES:")
-        for pref in existing_preferences[:10]:
-            user_prompt_parts.append(
-                f"- ID: {pref.get('id')}, Category: {pref.get('category')}, "
-                f"Preference: {pref.get('preference')}"
-            )
+        user_prompt_parts.append("\n".join(preference_lines))
 
     # Add recent interaction context
-    if recent_interactions:
+    if interaction_lines:
         user_prompt_parts.append("\nRECENT INTERACTIONS (for context):")
-        for interaction in recent_interactions[:5]:
-            user_prompt_parts.append(
-                f"- {interaction.get('timestamp', 'N/A')}: "
-                f"{interaction.get('user_text', '')[:100]}..."
-            )
+        user_prompt_parts.append("\n".join(interaction_lines))
 
     user_prompt_parts.append(
         "\n\nAnalyze the newly extracted entities against the existing graph. "
@@ -115,3 +131,15 @@ def get_linker_prompt(
     )
 
     return LINKER_SYSTEM_PROMPT, "\n".join(user_prompt_parts)
+
+
+def _drop_entries(groups: List[List[str]], max_tokens: int) -> None:
+    """Pop whole entries, first group first and each from its end, until they fit."""
+    over = sum(estimate_tokens(entry) for entries in groups for entry in entries) - max_tokens
+    dropped = 0
+    for entries in groups:
+        while over > 0 and entries:
+            over -= estimate_tokens(entries.pop())
+            dropped += 1
+    if dropped:
+        logger.info(f"Dropped {dropped} context entries from the linker prompt")
@@ -0,0 +1,308 @@
+"""
+LLM provider endpoints and failover.
+
+A provider is one way of reaching a model: Gemini Direct, or the LiteLLM
+gateway. With LLM_MODE=both, the one named by LLM_PRIMARY serves requests
+and the other is the secondary.
+
+Each provider has a circuit breaker. After `failure_threshold` consecutive
+provider failures (connection errors, timeouts, 5xx, exhausted 429 retries)
+it opens and requests go straight to the next provider instead of waiting
+on timeouts. After `reset_timeout` seconds, or as soon as a health probe
+succeeds, it lets one trial request through (half-open) and closes again if
+that succeeds.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import httpx
+import litellm
+
+from kg_mcp.config import Settings
+
+logger = logging.getLogger(__name__)
+
+GEMINI_DIRECT = "gemini_direct"
+LITELLM = "litellm"
+
+
+@dataclass(frozen=True)
+class Provider:
+    """Model, endpoint and credentials of one provider."""
+
+    name: str
+    model: str
+    api_base: Optional[str] = None
+    api_key: Optional[str] = None
+    health_url: Optional[str] = None
+
+    def apply(self, llm_kwargs: Dict[str, Any], override_model: bool = True) -> Dict[str, Any]:
+        """
+        Return litellm kwargs addressed to this provider's endpoint and, with
+        `override_model`, to its model instead of the routed one.
+        """
+        llm_kwargs = dict(llm_kwargs)
+        if override_model:
+            llm_kwargs["model"] = self.model
+        if self.api_base:
+            llm_kwargs["api_base"] = self.api_base
+        if self.api_key:
+            llm_kwargs["api_key"] = self.api_key
+        return llm_kwargs
+
+
+def gemini_direct_provider(settings: Settings) -> Optional[Provider]:
+    """Gemini Direct provider, or None without GEMINI_API_KEY."""
+    if not settings.gemini_api_key:
+        return None
+    model = settings.gemini_model or settings.llm_model
+    if not model.startswith("gemini/") and "gemini" in model:
+        model = f"gemini/{model}"
+    return Provider(
+        name=GEMINI_DIRECT,
+        model=model,
+        api_key=settings.gemini_api_key,
+        health_url=f"{settings.gemini_base_url.rstrip('/')}/v1beta/models",
+    )
+
+
+def litellm_provider(settings: Settings) -> Optional[Provider]:
+    """LiteLLM gateway provider, or None without a gateway URL and key."""
+    if not (settings.litellm_base_url and settings.litellm_api_key):
+        return None
+    return Provider(
+        name=LITELLM,
+        model=settings.litellm_model or settings.llm_model,
+        api_base=settings.litellm_base_url.rstrip("/"),
+        api_key=settings.litellm_api_key,
+        health_url=f"{settings.litellm_base_url.rstrip('/')}/health/liveliness",
+    )
+
+
+def secondary_provider(settings: Settings) -> Optional[Provider]:
+    """The provider that is not LLM_PRIMARY, when LLM_MODE=both and it is configured."""
+    if settings.llm_mode != "both":
+        return None
+    if settings.llm_primary == GEMINI_DIRECT:
+        return litellm_provider(settings)
+    return gemini_direct_provider(settings)
+
+
+# Errors that say something about the provider's health rather than the
+# request. Authentication errors are left out: a bad key is a configuration
+# problem for the caller, not an outage to fail over from.
+PROVIDER_ERRORS: Tuple[Type[BaseException], ...] = (
+    litellm.exceptions.APIConnectionError,
+    litellm.exceptions.ServiceUnavailableError,
+    litellm.exceptions.InternalServerError,
+    litellm.exceptions.BadGatewayError,
+    litellm.exceptions.RateLimitError,
+    httpx.TransportError,
+    asyncio.TimeoutError,
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ProviderUnavailableError(RuntimeError):
+    """Every configured LLM provider has an open circuit."""
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures; open ->
+    half-open after `reset_timeout` seconds (or `half_open()`); half-open ->
+    closed on the trial's success, back to open on its failure.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now (claims the half-open trial)."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._state = CLOSED
+        self._failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def release(self) -> None:
+        """Give back a trial that ended without an outcome (e.g. was cancelled)."""
+        self._trial_in_flight = False
+
+    def half_open(self) -> None:
+        """Let the next request through as a trial (e.g. after a good probe)."""
+        if self._state == OPEN:
+            self._state = HALF_OPEN
+            self._trial_in_flight = False
+
+
+class ProviderPool:
+    """
+    Providers in preference order, each with a circuit breaker and a
+    moving-average latency.
+
+    Args:
+        providers: Primary first
+        failure_threshold: Consecutive failures that open a breaker
+        reset_timeout: Seconds a breaker stays open before a trial request
+        latency_ratio: A later provider is preferred once the earlier one's
+            average latency is this many times higher
+        latency_ttl: Seconds after which a provider's average latency is
+            forgotten, so a provider that lost its traffic for being slow gets
+            tried again
+    """
+
+    def __init__(
+        self,
+        providers: List[Provider],
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        latency_ratio: float = 2.0,
+        latency_ttl: float = 60.0,
+    ):
+        self.providers = providers
+        self.latency_ratio = latency_ratio
+        self.latency_ttl = latency_ttl
+        self.breakers = {
+            p.name: CircuitBreaker(failure_threshold, reset_timeout) for p in providers
+        }
+        self._latency: Dict[str, Optional[float]] = {p.name: None for p in providers}
+        self._latency_at: Dict[str, float] = {p.name: 0.0 for p in providers}
+        self._counters = {p.name: {"calls": 0, "failures": 0, "failovers": 0} for p in providers}
+
+    @property
+    def primary(self) -> Provider:
+        return self.providers[0]
+
+    def candidates(self) -> List[Provider]:
+        """
+        Providers to try, in order: those whose breaker is not open, fastest
+        first once one is `latency_ratio` times faster than the preferred one.
+        """
+        available = [p for p in self.providers if self.breakers[p.name].state != OPEN]
+        return sorted(available, key=self._rank)
+
+    def acquire(self, provider: Provider) -> bool:
+        """Whether `provider` may be called now (see CircuitBreaker.allow)."""
+        return self.breakers[provider.name].allow()
+
+    def record(self, provider: Provider, latency: float, ok: bool) -> None:
+        """Record the outcome of a call to `provider`."""
+        counters = self._counters[provider.name]
+        counters["calls"] += 1
+        breaker = self.breakers[provider.name]
+        if ok:
+            breaker.record_success()
+            previous = self._latency[provider.name]
+            if previous is None or self._is_stale(provider):
+                self._latency[provider.name] = latency
+            else:
+                self._latency[provider.name] = 0.8 * previous + 0.2 * latency
+            self._latency_at[provider.name] = time.monotonic()
+        else:
+            counters["failures"] += 1
+            was_open = breaker.state == OPEN
+            breaker.record_failure()
+            if not was_open and breaker.state == OPEN:
+                logger.warning(f"LLM provider {provider.name} is failing; circuit opened")
+
+    def release(self, provider: Provider) -> None:
+        """Record a call that ended without saying anything about the provider."""
+        self.breakers[provider.name].release()
+
+    def record_failover(self, provider: Provider) -> None:
+        """Record that a request moved on from `provider` to the next one."""
+        self._counters[provider.name]["failovers"] += 1
+
+    async def probe(self, provider: Provider, client: httpx.AsyncClient) -> bool:
+        """
+        Check that the provider answers at all (any non-5xx response); a
+        healthy open provider is moved to half-open.
+        """
+        if not provider.health_url:
+            return False
+        headers = {}
+        if provider.name == GEMINI_DIRECT and provider.api_key:
+            headers["x-goog-api-key"] = provider.api_key
+        try:
+            response = await client.get(provider.health_url, headers=headers, timeout=5.0)
+            healthy = response.status_code < 500
+        except httpx.HTTPError:
+            healthy = False
+        if healthy and self.breakers[provider.name].state == OPEN:
+            logger.info(f"LLM provider {provider.name} passed its health probe")
+            self.breakers[provider.name].half_open()
+        return healthy
+
+    async def run_health_checks(self, client: httpx.AsyncClient, interval: float) -> None:
+        """Probe providers with an open circuit every `interval` seconds (runs until cancelled)."""
+        while True:
+            await asyncio.sleep(interval)
+            for provider in self.providers:
+                if self.breakers[provider.name].state == OPEN:
+                    await self.probe(provider, client)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per provider: circuit state, average latency, calls, failures and failovers."""
+        stats: Dict[str, Any] = {}
+        for p in self.providers:
+            latency = self._latency[p.name]
+            stats[p.name] = {
+                "state": self.breakers[p.name].state,
+                "latency_ms": round(latency * 1000, 1) if latency is not None else None,
+                **self._counters[p.name],
+            }
+        return stats
+
+    def _is_stale(self, provider: Provider) -> bool:
+        return time.monotonic() - self._latency_at[provider.name] > self.latency_ttl
+
+    def _fresh_latency(self, provider: Provider) -> Optional[float]:
+        return None if self._is_stale(provider) else self._latency[provider.name]
+
+    def _rank(self, provider: Provider) -> Tuple[float, int]:
+        # Preference order, unless some provider is latency_ratio times faster.
+        # Unknown or stale latencies rank by preference, so a provider that got
+        # no traffic for a while is tried again and measured afresh.
+        index = self.providers.index(provider)
+        latency = self._fresh_latency(provider)
+        known = [
+            fresh
+            for fresh in (self._fresh_latency(p) for p in self.providers)
+            if fresh is not None
+        ]
+        if latency is None or not known:
+            return (0.0, index)
+        return (0.0 if latency <= min(known) * self.latency_ratio else latency, index)
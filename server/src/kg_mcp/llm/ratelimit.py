@@ -0,0 +1,194 @@
+"""
+Client-side rate limiting for LLM calls.
+
+Each model gets a token bucket (requests per minute) and a semaphore
+(requests in flight). Calls rejected with 429 are retried after the
+provider's Retry-After, or after a jittered exponential backoff, and the
+bucket slows down until requests succeed again.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import litellm
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """
+    Async token bucket.
+
+    Args:
+        rate: Tokens added per second (0 = unlimited)
+        burst: Maximum tokens available at once
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        if self.rate <= 0 and self._paused_until <= time.monotonic():
+            return
+        # Waiters queue on the lock, so tokens are handed out in FIFO order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                if self.rate <= 0:
+                    return
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for the next `seconds`."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class RateLimiter:
+    """
+    Token bucket plus concurrency limit around one model's calls.
+
+    Args:
+        rpm: Requests per minute (0 = unlimited)
+        concurrency: Requests in flight at once
+        max_retries: Retries of a call rejected with 429
+        backoff_base: First backoff in seconds, doubled per retry
+        backoff_max: Longest backoff in seconds
+    """
+
+    def __init__(
+        self,
+        rpm: float = 0.0,
+        concurrency: int = 8,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ):
+        self.rpm = rpm
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.bucket = TokenBucket(rate=rpm / 60, burst=max(1.0, rpm / 60))
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._concurrency = max(1, concurrency)
+        self._waiting = 0
+        self._in_flight = 0
+        self._counters = {"requests": 0, "throttled": 0, "retries": 0, "failed": 0}
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `call` within the limits, retrying it when the provider answers 429.
+
+        Raises the last litellm.RateLimitError once retries are exhausted.
+        """
+        attempt = 0
+        while True:
+            try:
+                return await self._run_once(call)
+            except litellm.exceptions.RateLimitError as e:
+                self._counters["throttled"] += 1
+                delay = retry_after(e)
+                if delay is None:
+                    delay = self.backoff(attempt)
+                self._slow_down(delay)
+
+                if attempt >= self.max_retries:
+                    self._counters["failed"] += 1
+                    raise
+                attempt += 1
+                self._counters["retries"] += 1
+                logger.warning(
+                    f"LLM rate limited, retry {attempt}/{self.max_retries} in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, requests in flight and retry counters."""
+        return {
+            "waiting": self._waiting,
+            "in_flight": self._in_flight,
+            "concurrency": self._concurrency,
+            "rpm": round(self.bucket.rate * 60, 2),
+            **self._counters,
+        }
+
+    async def _run_once(self, call: Callable[[], Awaitable[T]]) -> T:
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+            try:
+                await self.bucket.acquire()
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self._waiting -= 1
+        self._in_flight += 1
+        try:
+            self._counters["requests"] += 1
+            result = await call()
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+        self._speed_up()
+        return result
+
+    def _slow_down(self, delay: float) -> None:
+        # Everyone waits out the provider's window, and the bucket halves its
+        # rate so the retries do not trip it again at once
+        self.bucket.pause(delay)
+        if self.rpm > 0:
+            self.bucket.rate = max(self.rpm / 60 / 8, self.bucket.rate / 2)
+
+    def _speed_up(self) -> None:
+        # Additive recovery towards the configured rate
+        if self.rpm > 0 and self.bucket.rate < self.rpm / 60:
+            self.bucket.rate = min(self.rpm / 60, self.bucket.rate + self.rpm / 60 / 20)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds to wait according to the error's Retry-After header, if any."""
+    headers: Dict[str, str] = {}
+    response = getattr(error, "response", None)
+    if response is not None and getattr(response, "headers", None):
+        headers.update(response.headers)
+    headers.update(getattr(error, "headers", None) or {})
+    value = next((v for k, v in headers.items() if k.lower() == "retry-after"), None)
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,165 @@
+"""
+Task-based model routing.
+
+Linking and short extractions go to the fast model (KG_MODEL_FAST); long
+diffs, long or many-part messages and large file sets go to the reasoning
+model (KG_MODEL_REASON). Either falls back to KG_MODEL_DEFAULT, then to the
+provider's configured model. The decision is a local heuristic, so it costs
+no LLM call.
+"""
+
+import logging
+import re
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FAST = "fast"
+REASON = "reason"
+
+# Calls kept for the metrics resource
+RECENT_CALLS = 200
+
+_ITEM_LINE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class Route:
+    """Model chosen for one LLM call, and why."""
+
+    task: str
+    tier: str
+    model: str
+    reason: str
+
+
+class ModelRouter:
+    """
+    Picks a model per call and records the choice and its latency.
+
+    Args:
+        default_model: Model used when a tier has none configured
+        fast_model: Model for linking and short extractions
+        reason_model: Model for long or complex extractions
+        reason_chars: Message length that needs the reasoning model
+        reason_diff_chars: Diff length that needs the reasoning model
+        reason_files: File count that needs the reasoning model
+        reason_items: Bulleted/numbered lines that make a message complex
+    """
+
+    def __init__(
+        self,
+        default_model: str,
+        fast_model: str = "",
+        reason_model: str = "",
+        reason_chars: int = 2000,
+        reason_diff_chars: int = 4000,
+        reason_files: int = 15,
+        reason_items: int = 5,
+    ):
+        self.default_model = default_model
+        self.models = {FAST: fast_model or default_model, REASON: reason_model or default_model}
+        self.reason_chars = reason_chars
+        self.reason_diff_chars = reason_diff_chars
+        self.reason_files = reason_files
+        self.reason_items = reason_items
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=RECENT_CALLS)
+        self._totals: Dict[str, Dict[str, Any]] = {}
+
+    def classify(
+        self,
+        user_text: str,
+        files: Optional[List[str]] = None,
+        diff: Optional[str] = None,
+    ) -> Tuple[str, str]:
+        """Return (tier, reason) for an extraction request."""
+        if diff and len(diff) >= self.reason_diff_chars:
+            return REASON, f"diff of {len(diff)} chars"
+        if len(user_text) >= self.reason_chars:
+            return REASON, f"message of {len(user_text)} chars"
+        if files and len(files) >= self.reason_files:
+            return REASON, f"{len(files)} files"
+        items = len(_ITEM_LINE.findall(user_text))
+        if items >= self.reason_items:
+            return REASON, f"{items} listed items"
+        return FAST, "short message"
+
+    def route_extraction(
+        self,
+        user_text: str,
+        files: Optional[List[str]] = None,
+        diff: Optional[str] = None,
+    ) -> Route:
+        """Choose the model for extracting one message."""
+        tier, reason = self.classify(user_text, files, diff)
+        return Route(task="extract", tier=tier, model=self.models[tier], reason=reason)
+
+    def route(self, task: str, tier: str, reason: str) -> Route:
+        """Route a call whose tier is known up front (e.g. linking, batches)."""
+        return Route(task=task, tier=tier, model=self.models[tier], reason=reason)
+
+    def record(
+        self,
+        route: Route,
+        latency_ms: float,
+        ok: bool = True,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+    ) -> None:
+        """Record one finished call and its token usage."""
+        self._recent.append(
+            {
+                **asdict(route),
+                "latency_ms": round(latency_ms, 1),
+                "ok": ok,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+            }
+        )
+        totals = self._totals.setdefault(
+            f"{route.task}/{route.tier}",
+            {
+                "calls": 0,
+                "errors": 0,
+                "total_ms": 0.0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "model": route.model,
+            },
+        )
+        totals["calls"] += 1
+        totals["total_ms"] += latency_ms
+        totals["prompt_tokens"] += prompt_tokens
+        totals["completion_tokens"] += completion_tokens
+        if not ok:
+            totals["errors"] += 1
+        logger.info(
+            f"LLM {route.task} via {route.model} ({route.tier}: {route.reason}) "
+            f"in {latency_ms:.0f}ms, {prompt_tokens}+{completion_tokens} tokens"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per task/tier call counts, mean latency and token totals, overall token
+        totals, and the latest calls.
+        """
+        return {
+            "routes": {
+                key: {
+                    "model": t["model"],
+                    "calls": t["calls"],
+                    "errors": t["errors"],
+                    "mean_ms": round(t["total_ms"] / t["calls"], 1),
+                    "prompt_tokens": t["prompt_tokens"],
+                    "completion_tokens": t["completion_tokens"],
+                }
+                for key, t in self._totals.items()
+            },
+            "tokens": {
+                "prompt": sum(t["prompt_tokens"] for t in self._totals.values()),
+                "completion": sum(t["completion_tokens"] for t in self._totals.values()),
+            },
+            "recent": list(self._recent)[-20:],
+        }
@@ -0,0 +1,118 @@
+"""
+Incremental parsing of streamed JSON completions.
+
+The extractor answers with one JSON object whose values are mostly arrays
+("goals", "constraints", ...). StreamingJSONParser reports each element of
+those arrays as soon as its closing character arrives, so callers can act on
+early entities while the model is still generating the rest.
+"""
+
+import json
+from typing import Any, List, Optional, Tuple
+
+
+class StreamingJSONParser:
+    """
+    Feed completion text chunk by chunk; get back (key, element) pairs for
+    every completed element of a top-level array.
+
+    Only structure is tracked while streaming; the full object is parsed once
+    by `result()` at the end.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._item_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk and return the array elements it completed."""
+        events: List[Tuple[str, Any]] = []
+        start = len(self.text)
+        self.text += chunk
+
+        for i in range(start, len(self.text)):
+            if self._in_string:
+                self._string_char(i, events)
+            else:
+                self._structure_char(i, events)
+
+        return events
+
+    def result(self) -> Any:
+        """Parse the complete text (raises json.JSONDecodeError if invalid)."""
+        return json.loads(self.text)
+
+    def _string_char(self, i: int, events: List[Tuple[str, Any]]) -> None:
+        """Handle a character inside a string: escapes, and the closing quote."""
+        c = self.text[i]
+        if self._escape:
+            self._escape = False
+        elif c == "\\":
+            self._escape = True
+        elif c == '"':
+            self._in_string = False
+            if len(self._stack) == 1 and self._expect_key:
+                self._key = json.loads(self.text[self._string_start : i + 1])
+            elif self._in_top_array() and self._item_start == self._string_start:
+                self._emit(events, i + 1)
+
+    def _structure_char(self, i: int, events: List[Tuple[str, Any]]) -> None:
+        """Handle a character outside strings: nesting depth and element bounds."""
+        c = self.text[i]
+        if c == '"':
+            self._in_string = True
+            self._string_start = i
+            self._start_item(i)
+        elif c in "{[":
+            self._start_item(i)
+            self._stack.append(c)
+            if len(self._stack) == 1:
+                self._expect_key = True
+        elif c in "}]":
+            self._close(i, events)
+        elif c in ",:":
+            self._separator(i, events)
+        elif not c.isspace():
+            self._start_item(i)
+
+    def _close(self, i: int, events: List[Tuple[str, Any]]) -> None:
+        """Handle a closing bracket, which may end an element."""
+        # A number/true/false/null element ends at the closing bracket
+        if self._in_top_array() and self._item_start is not None:
+            self._emit(events, i)
+        if self._stack:
+            self._stack.pop()
+        if self._in_top_array() and self._item_start is not None:
+            self._emit(events, i + 1)
+
+    def _separator(self, i: int, events: List[Tuple[str, Any]]) -> None:
+        """Handle "," (ends an element, or a key/value pair) and ":"."""
+        if self.text[i] == ":":
+            if len(self._stack) == 1:
+                self._expect_key = False
+        elif self._in_top_array() and self._item_start is not None:
+            self._emit(events, i)
+        elif len(self._stack) == 1:
+            self._expect_key = True
+
+    def _in_top_array(self) -> bool:
+        return len(self._stack) == 2 and self._stack[1] == "[" and self._key is not None
+
+    def _start_item(self, i: int) -> None:
+        if self._in_top_array() and self._item_start is None:
+            self._item_start = i
+
+    def _emit(self, events: List[Tuple[str, Any]], end: int) -> None:
+        if self._key is None:
+            return
+        try:
+            events.append((self._key, json.loads(self.text[self._item_start : end])))
+        except json.JSONDecodeError:
+            pass
+        self._item_start = None
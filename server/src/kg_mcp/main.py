@@ -11,15 +11,20 @@ Usage:
 """
 
 import argparse
+import asyncio
 import logging
 import os
 import signal
 import sys
-from typing import Optional
+from typing import Any, Awaitable, Callable, List, Optional
 
+import anyio
 from mcp.server.fastmcp import FastMCP
 
 from kg_mcp.config import get_settings
+from kg_mcp.kg.ingest_queue import replay_journal, shutdown_ingest_queue
+from kg_mcp.llm.client import get_llm_client
+from kg_mcp.llm.http import close_http_client, get_http_client, http2_available, warm_up
 from kg_mcp.mcp.tools import register_tools
 from kg_mcp.mcp.resources import register_resources
 from kg_mcp.mcp.prompts import register_prompts
@@ -72,10 +77,44 @@ def create_mcp_server(json_response: bool = True, stateless: bool = True) -> Fas
     register_resources(mcp)
     register_prompts(mcp)
 
+    # Shared keep-alive connections for every LLM call; serve() warms them up
+    get_http_client()
+    settings = get_settings()
+    logger.info(f"LLM HTTP session ready (HTTP/2: {settings.llm_http2 and http2_available()})")
+
     logger.info("MCP server components registered successfully")
     return mcp
 
 
+async def serve(run_transport: Callable[[], Awaitable[None]]) -> None:
+    """
+    Replay interrupted ingests, warm up LLM connections and start provider
+    health checks, run a transport until it stops, then drain ingests and
+    close connections.
+    """
+    # Replay the journal and connect in the background so startup is not
+    # held up by a backlog or a slow endpoint, and keep probing providers
+    # whose circuit is open
+    settings = get_settings()
+    llm = get_llm_client()
+    background: List[asyncio.Task[Any]] = [asyncio.create_task(replay_journal())]
+    if settings.llm_http_warm_up:
+        background.append(asyncio.create_task(warm_up(llm.endpoints())))
+    if settings.llm_health_check_interval > 0:
+        background.append(
+            asyncio.create_task(
+                llm.pool.run_health_checks(get_http_client(), settings.llm_health_check_interval)
+            )
+        )
+    try:
+        await run_transport()
+    finally:
+        for task in background:
+            task.cancel()
+        await shutdown_ingest_queue()
+        await close_http_client()
+
+
 def handle_shutdown(signum, frame):
     """Handle graceful shutdown on SIGTERM/SIGINT."""
     logger = logging.getLogger(__name__)
@@ -105,7 +144,7 @@ def run_stdio():
     mcp = create_mcp_server(json_response=True, stateless=True)
 
     # Run with stdio transport
-    mcp.run(transport="stdio")
+    anyio.run(serve, mcp.run_stdio_async)
 
 
 def run_http(host: str = "127.0.0.1", port: int = 8000, path: str = "/mcp"):
@@ -130,11 +169,9 @@ def run_http(host: str = "127.0.0.1", port: int = 8000, path: str = "/mcp"):
     mcp = create_mcp_server(json_response=True, stateless=True)
 
     # Run with streamable-http transport
-    mcp.run(
-        transport="streamable-http",
-        host=host,
-        port=port,
-    )
+    mcp.settings.host = host
+    mcp.settings.port = port
+    anyio.run(serve, mcp.run_streamable_http_async)
 
 
 def main():
@@ -3,12 +3,15 @@ MCP Resource definitions for the Knowledge Graph Memory Server.
 Resources provide read-only access to graph data.
 """
 
+import json
 import logging
 from typing import Any, Dict, List
 
 from mcp.server.fastmcp import FastMCP
 
+from kg_mcp.kg.ingest_queue import get_ingest_queue
 from kg_mcp.kg.repo import get_repository
+from kg_mcp.llm.client import get_llm_client
 
 logger = logging.getLogger(__name__)
 
@@ -215,4 +218,28 @@ def register_resources(mcp: FastMCP) -> None:
             logger.error(f"Failed to get pain points: {e}")
             return f"# Error\n\nFailed to retrieve pain points: {e}"
 
+    @mcp.resource("kg://projects/{project_id}/interactions/{interaction_id}/status")
+    async def get_interaction_status(project_id: str, interaction_id: str) -> str:
+        """
+        Get the ingest status of an interaction queued by kg_autopilot.
+
+        Returns JSON with status (queued, processing, done, failed, unknown)
+        and, once done, the created entity IDs.
+        """
+        logger.info(f"Resource requested: status of interaction {interaction_id}")
+
+        status = get_ingest_queue().status(interaction_id)
+        if status is None or status.get("project_id") != project_id:
+            status = {"interaction_id": interaction_id, "status": "unknown"}
+        return json.dumps(status)
+
+    @mcp.resource("kg://llm/metrics")
+    async def get_llm_metrics() -> str:
+        """
+        Get LLM client metrics as JSON: per-model rate limiter queue depth,
+        requests in flight and 429 retries, per-route latency and prompt and
+        completion tokens, plus batching and cache counters.
+        """
+        return json.dumps(get_llm_client().stats())
+
     logger.info("MCP resources registered successfully")
@@ -8,12 +8,15 @@ This module exposes ONLY 2 tools to AI agents:
 All other functionality is internal and not exposed via MCP.
 """
 
+import asyncio
 import logging
 from typing import Any, Dict, List, Optional
 
 from mcp.server.fastmcp import FastMCP
 
+from kg_mcp.config import get_settings
 from kg_mcp.kg.ingest import get_ingest_pipeline
+from kg_mcp.kg.ingest_queue import get_ingest_queue
 from kg_mcp.kg.retrieval import get_context_builder
 from kg_mcp.kg.repo import get_repository
 from kg_mcp.utils import serialize_response
@@ -270,6 +273,8 @@ def register_tools(mcp: FastMCP) -> None:
             interaction_id: ID of the ingested interaction
             extracted: Extracted entities (goals, constraints, etc.)
             search_results: Search results if search_query was provided
+            ingest_status: "queued" when ingest runs in the background
+                (poll kg://projects/{project_id}/interactions/{interaction_id}/status)
         """
         logger.info(f"kg_autopilot called for project {project_id}")
 
@@ -280,49 +285,60 @@ def register_tools(mcp: FastMCP) -> None:
             "search_results": [],
         }
 
-        try:
-            # Step 1: Ingest the message
-            pipeline = get_ingest_pipeline()
-            ingest_result = await pipeline.process_message(
-                project_id=project_id,
-                user_text=user_text,
-                files=files,
-                diff=diff,
-                symbols=symbols,
-                tags=tags,
-            )
-            result["interaction_id"] = ingest_result.get("interaction_id")
-            result["extracted"] = ingest_result.get("extracted", {})
-
-            # Step 2: Build context pack
-            builder = get_context_builder()
-            context_result = await builder.build_context_pack(
-                project_id=project_id,
-                query=search_query,
-                k_hops=k_hops,
-            )
-            result["markdown"] = context_result.get("markdown", "")
-            # Add reminder about kg_track_changes
-            result["markdown"] += "\n\n---\n*📝 REMINDER: Call `kg_track_changes` after EVERY file you create or modify to keep the knowledge graph updated.*"
-            result["entities"] = context_result.get("entities", {})
-
-            # Step 3: Optional search
-            if search_query:
-                repo = get_repository()
-                search_results = await repo.fulltext_search(
+        with get_repository().request_scope():
+            try:
+                # Step 1: Ingest the message. In deferred mode it is queued and
+                # processed in the background; poll the interaction status
+                # resource for the outcome
+                message: Dict[str, Any] = {
+                    "project_id": project_id,
+                    "user_text": user_text,
+                    "files": files,
+                    "diff": diff,
+                    "symbols": symbols,
+                    "tags": tags,
+                }
+                ingest_result = None
+                if get_settings().kg_ingest_mode == "deferred":
+                    try:
+                        result["interaction_id"] = await get_ingest_queue().submit(**message)
+                        result["ingest_status"] = "queued"
+                    except asyncio.QueueFull:
+                        logger.warning("Ingest queue full, ingesting inline")
+                        ingest_result = await get_ingest_pipeline().process_message(**message)
+                else:
+                    ingest_result = await get_ingest_pipeline().process_message(**message)
+
+                if ingest_result is not None:
+                    result["interaction_id"] = ingest_result.get("interaction_id")
+                    result["extracted"] = ingest_result.get("extracted", {})
+
+                # Step 2: Build context pack
+                builder = get_context_builder()
+                context_result = await builder.build_context_pack(
                     project_id=project_id,
                     query=search_query,
-                    limit=10,
+                    k_hops=k_hops,
                 )
-                result["search_results"] = search_results
+                result["markdown"] = context_result.get("markdown", "")
+                # Add reminder about kg_track_changes
+                result["markdown"] += (
+                    "\n\n---\n*📝 REMINDER: Call `kg_track_changes` after EVERY file you "
+                    "create or modify to keep the knowledge graph updated.*"
+                )
+                result["entities"] = context_result.get("entities", {})
+
+                # Step 3: Search results come from the context pack's own search
+                if search_query:
+                    result["search_results"] = result["entities"].get("search_results", [])
 
-            return serialize_response(result)
+                return serialize_response(result)
 
-        except Exception as e:
-            logger.error(f"kg_autopilot failed: {e}")
-            result["error"] = str(e)
-            result["markdown"] = f"# Error\n\nFailed to build context: {e}"
-            return result
+            except Exception as e:
+                logger.error(f"kg_autopilot failed: {e}")
+                result["error"] = str(e)
+                result["markdown"] = f"# Error\n\nFailed to build context: {e}"
+                return result
 
     @mcp.tool()
     async def kg_track_changes(
@@ -449,89 +465,113 @@ def register_tools(mcp: FastMCP) -> None:
             "impact_analysis": {},
         }
 
-        try:
-            repo = get_repository()
-
-            # Step 1: Auto-link to active goals
+        with get_repository().request_scope():
             try:
-                active_goals = await repo.get_active_goals(project_id)
-                related_goal_ids = [g["id"] for g in active_goals if g.get("id")]
-                result["auto_linked_goals"] = [
-                    {"id": g["id"], "title": g.get("title", "Unknown")}
-                    for g in active_goals if g.get("id")
-                ]
-                logger.info(f"Auto-linking to {len(related_goal_ids)} active goals")
-            except Exception as goal_error:
-                logger.warning(f"Could not fetch active goals: {goal_error}")
-                related_goal_ids = []
-
-            # Step 2: Process each file change
-            all_paths = []
-            for change in changes:
-                path = change.get("path")
-                if not path:
-                    logger.warning("Skipping change without path")
-                    continue
-
-                all_paths.append(path)
-                change_type = change.get("change_type", "modified")
-                language = change.get("language")
-                symbols = change.get("symbols", [])
+                repo = get_repository()
 
+                # Step 1: Auto-link to active goals
                 try:
-                    # Create/update CodeArtifact
-                    artifact = await repo.upsert_code_artifact(
-                        project_id=project_id,
-                        path=path,
-                        kind="file",
-                        language=language,
-                        related_goal_ids=related_goal_ids,
+                    active_goals = await repo.get_active_goals(project_id)
+                    related_goal_ids = [g["id"] for g in active_goals if g.get("id")]
+                    result["auto_linked_goals"] = [
+                        {"id": g["id"], "title": g.get("title", "Unknown")}
+                        for g in active_goals if g.get("id")
+                    ]
+                    logger.info(f"Auto-linking to {len(related_goal_ids)} active goals")
+                except Exception as goal_error:
+                    logger.warning(f"Could not fetch active goals: {goal_error}")
+                    related_goal_ids = []
+
+                # Step 2: Process each file change in one unit of work, so the
+                # whole batch commits once (or not at all)
+                all_paths: List[str] = []
+                artifact_ids: List[str] = []
+
+                async def record_changes() -> None:
+                    # Starts from scratch when the transaction is retried
+                    all_paths.clear()
+                    artifact_ids.clear()
+                    result.update(
+                        artifacts_linked=0, symbols_linked=0, linked_paths=[], linked_symbols=[]
                     )
-                    artifact_id = artifact.get("id")
-                    result["artifacts_linked"] += 1
-                    result["linked_paths"].append(path)
-
-                    # Create symbols if provided
-                    if artifact_id and symbols:
-                        for sym in symbols:
-                            sym_name = sym.get("name")
-                            if not sym_name:
-                                continue
-
-                            # Generate FQN: path:symbol_name
-                            fqn = f"{path}:{sym_name}"
-
-                            await repo.upsert_symbol(
-                                artifact_id=artifact_id,
-                                fqn=fqn,
-                                name=sym_name,
-                                kind=sym.get("kind", "function"),
-                                line_start=sym.get("line_start"),
-                                line_end=sym.get("line_end"),
-                                signature=sym.get("signature"),
-                                change_type=sym.get("change_type", "modified"),
+                    for change in changes:
+                        path = change.get("path")
+                        if not path:
+                            logger.warning("Skipping change without path")
+                            continue
+
+                        all_paths.append(path)
+                        language = change.get("language")
+                        symbols = change.get("symbols", [])
+
+                        # Create/update CodeArtifact (goals are linked below)
+                        artifact = await repo.upsert_code_artifact(
+                            project_id=project_id,
+                            path=path,
+                            kind="file",
+                            language=language,
+                        )
+                        artifact_id = artifact.get("id")
+                        if artifact_id:
+                            artifact_ids.append(artifact_id)
+                        result["artifacts_linked"] += 1
+                        result["linked_paths"].append(path)
+
+                        # Create symbols if provided, in one bulk upsert
+                        if artifact_id and symbols:
+                            symbol_rows = []
+                            for sym in symbols:
+                                sym_name = sym.get("name")
+                                if not sym_name:
+                                    continue
+
+                                # Generate FQN: path:symbol_name
+                                symbol_rows.append({
+                                    "fqn": f"{path}:{sym_name}",
+                                    "name": sym_name,
+                                    "kind": sym.get("kind", "function"),
+                                    "line_start": sym.get("line_start"),
+                                    "line_end": sym.get("line_end"),
+                                    "signature": sym.get("signature"),
+                                    "change_type": sym.get("change_type", "modified"),
+                                })
+
+                            await repo.upsert_symbols_bulk(artifact_id, symbol_rows)
+                            result["symbols_linked"] += len(symbol_rows)
+                            result["linked_symbols"].extend(
+                                {
+                                    "fqn": row["fqn"],
+                                    "name": row["name"],
+                                    "kind": row["kind"],
+                                    "lines": f"{row['line_start']}-{row['line_end']}",
+                                }
+                                for row in symbol_rows
                             )
-                            result["symbols_linked"] += 1
-                            result["linked_symbols"].append({
-                                "fqn": fqn,
-                                "name": sym_name,
-                                "kind": sym.get("kind"),
-                                "lines": f"{sym.get('line_start')}-{sym.get('line_end')}",
-                            })
-
-                except Exception as link_error:
-                    logger.warning(f"Failed to link {path}: {link_error}")
 
-            # Step 3: Impact analysis
-            if check_impact and all_paths:
-                impact = await repo.get_impact_for_artifacts(project_id, all_paths)
-                result["impact_analysis"] = impact
+                    # Link every tracked file to every active goal at once
+                    await repo.link_artifacts_to_goals(artifact_ids, related_goal_ids)
 
-            return serialize_response(result)
-
-        except Exception as e:
-            logger.error(f"kg_track_changes failed: {e}")
-            result["error"] = str(e)
-            return result
+                try:
+                    await repo.run_transaction(record_changes)
+                except Exception as link_error:
+                    # The transaction was rolled back: nothing from this batch was saved
+                    logger.warning(f"Failed to link changes, batch rolled back: {link_error}")
+                    result["error"] = str(link_error)
+                    result["artifacts_linked"] = 0
+                    result["symbols_linked"] = 0
+                    result["linked_paths"] = []
+                    result["linked_symbols"] = []
+
+                # Step 3: Impact analysis
+                if check_impact and all_paths:
+                    impact = await repo.get_impact_for_artifacts(project_id, all_paths)
+                    result["impact_analysis"] = impact
+
+                return serialize_response(result)
+
+            except Exception as e:
+                logger.error(f"kg_track_changes failed: {e}")
+                result["error"] = str(e)
+                return result
 
     logger.info("MCP tools registered: kg_autopilot, kg_track_changes (2 tools only)")
@@ -0,0 +1,123 @@
+"""
+Tests for prompt token budgeting and token usage metrics.
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from kg_mcp.llm.client import LLMClient
+from kg_mcp.llm.prompts.budget import (
+    PromptBudget,
+    Section,
+    estimate_tokens,
+    truncate_to_tokens,
+)
+from kg_mcp.llm.prompts.extractor import get_extractor_prompt
+from kg_mcp.llm.prompts.linker import get_linker_prompt
+from kg_mcp.llm.schemas import ExtractionResult, GoalExtract
+
+
+def test_truncate_cuts_at_line_boundary():
+    """Test that truncation keeps whole lines and marks the cut."""
+    text = "\n".join(f"line {i:03d}" for i in range(100))
+
+    truncated = truncate_to_tokens(text, 20)
+
+    assert estimate_tokens(truncated) <= 20
+    assert truncated.endswith("line 006\n... [truncated]")
+    assert truncate_to_tokens(text, 0) == ""
+    assert truncate_to_tokens("short", 20) == "short"
+
+
+def test_budget_trims_lowest_priority_first():
+    """Test that lower priority sections are trimmed before higher ones, down to their minimum."""
+    budget = PromptBudget(max_tokens=300)
+    texts = budget.fit(
+        [
+            Section("user_text", "u" * 800, priority=2, min_tokens=150),
+            Section("files", "f" * 400, priority=1),
+            Section("context", "c" * 400, priority=0),
+        ]
+    )
+
+    assert texts["context"] == ""
+    assert estimate_tokens(texts["files"]) <= 100
+    assert texts["user_text"].startswith("u" * 500)
+    assert sum(estimate_tokens(t) for t in texts.values()) <= 300
+
+    assert PromptBudget(max_tokens=0).fit([Section("files", "f" * 400, 1)])["files"] == "f" * 400
+
+
+def test_extractor_prompt_trims_diff_before_message_and_files():
+    """Test that an over-budget extractor prompt loses diff lines, not the message or files."""
+    diff = "diff --git a/a.py b/a.py\n--- a/a.py\n+++ b/a.py\n@@ -1,1 +1,300 @@\n" + "\n".join(
+        f"+value_{i} = {i}" for i in range(300)
+    )
+
+    _, user_prompt = get_extractor_prompt(
+        "Refactor the settings loader",
+        files=["src/a.py", "src/b.py"],
+        diff=diff,
+        diff_max_tokens=2000,
+        max_tokens=400,
+    )
+
+    assert "Refactor the settings loader" in user_prompt
+    assert "- src/b.py" in user_prompt
+    assert "+value_0 = 0" in user_prompt
+    assert "+value_299 = 299" not in user_prompt
+    assert "... [truncated]" in user_prompt
+
+
+def test_linker_prompt_drops_whole_entries_and_keeps_extraction_json():
+    """Test that interactions, then preferences go first, as whole entries, JSON intact."""
+    goals = [{"id": f"g{i}", "title": f"Goal {i}", "status": "active"} for i in range(3)]
+    preferences = [{"id": f"p{i}", "category": "style", "preference": "y" * 40} for i in range(3)]
+    interactions = [{"timestamp": "t", "user_text": "x" * 100} for _ in range(5)]
+    extraction = ExtractionResult(goals=[GoalExtract(title=f"New goal {i}") for i in range(50)])
+
+    extraction_tokens = estimate_tokens(extraction.model_dump_json(indent=2))
+
+    _, user_prompt = get_linker_prompt(
+        extraction, goals, preferences, interactions, max_tokens=extraction_tokens + 60
+    )
+
+    fenced = user_prompt.split("```json\n", 1)[1].split("\n```", 1)[0]
+    assert json.loads(fenced) == json.loads(extraction.model_dump_json())
+    assert "ID: g2, Title: Goal 2, Status: active" in user_prompt
+    assert "- t: " not in user_prompt
+    assert "ID: p0" in user_prompt
+    assert "ID: p2" not in user_prompt
+    assert "[truncated]" not in user_prompt
+
+
+def completion(content, usage=None):
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    response.usage = usage
+    return response
+
+
+@pytest.mark.asyncio
+async def test_client_records_reported_and_estimated_tokens():
+    """Test that provider-reported usage is recorded, and estimated when missing."""
+    client = LLMClient()
+    client.extraction_cache = None
+    content = json.dumps({"goals": [{"title": "Add auth"}]})
+    reported = MagicMock(prompt_tokens=321, completion_tokens=12)
+
+    with patch(
+        "kg_mcp.llm.client.litellm.acompletion",
+        side_effect=[completion(content, reported), completion(content)],
+    ):
+        await client.extract_entities("Add auth")
+        await client.extract_entities("Add auth again")
+
+    recent = client.stats()["routing"]["recent"]
+    assert (recent[-2]["prompt_tokens"], recent[-2]["completion_tokens"]) == (321, 12)
+    assert recent[-1]["prompt_tokens"] > 0
+    assert recent[-1]["completion_tokens"] == estimate_tokens(content)
+    assert client.stats()["routing"]["tokens"]["prompt"] == 321 + recent[-1]["prompt_tokens"]
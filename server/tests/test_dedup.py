@@ -0,0 +1,98 @@
+"""
+Tests for local entity deduplication.
+"""
+
+from kg_mcp.kg.dedup import DedupEngine
+from kg_mcp.llm.schemas import (
+    ConstraintExtract,
+    ExtractionResult,
+    GoalExtract,
+    PainPointExtract,
+    StrategyExtract,
+)
+
+EXISTING = {
+    "Goal": [
+        {"id": "goal-1", "text": "Add user login"},
+        {"id": "goal-2", "text": "Speed up CI pipeline"},
+        {"id": "goal-3", "text": "Migrate to Python 3.11"},
+    ],
+    "Constraint": [{"id": "constraint-1", "text": "Use PostgreSQL for storage"}],
+    "Strategy": [{"id": "strategy-1", "text": "Cache build artifacts"}],
+    "PainPoint": [{"id": "pp-1", "text": "Integration tests are flaky"}],
+}
+
+
+def resolve(extraction):
+    return DedupEngine().resolve(extraction, EXISTING)
+
+
+def test_resolves_near_duplicate_goal():
+    """Test that a near-identical goal merges into the existing one without the linker."""
+    result = resolve(ExtractionResult(goals=[GoalExtract(title="Add user logins")]))
+
+    assert [m.existing_entity_id for m in result.goal_merges] == ["goal-1"]
+    assert 0.8 <= result.goal_merges[0].confidence < 1.0
+    assert result.ambiguous_goals == []
+
+
+def test_below_threshold_goals_are_ambiguous_or_new():
+    """Test that partly similar goals go to the linker and unrelated ones are new."""
+    result = resolve(
+        ExtractionResult(
+            goals=[
+                GoalExtract(title="Speed up CI pipeline and deploys"),
+                GoalExtract(title="Write onboarding docs"),
+            ]
+        )
+    )
+
+    assert result.goal_merges == []
+    assert [g.title for g in result.ambiguous_goals] == ["Speed up CI pipeline and deploys"]
+
+
+def test_version_mismatch_vetoes_merge():
+    """Test that a near-identical title with another version is left to the linker."""
+    result = resolve(ExtractionResult(goals=[GoalExtract(title="Migrate to Python 3.12")]))
+
+    assert result.goal_merges == []
+    assert [g.title for g in result.ambiguous_goals] == ["Migrate to Python 3.12"]
+
+
+def test_other_types_map_to_existing_ids_without_rewriting():
+    """Test that duplicate constraints, strategies and pain points point at the existing node."""
+    extraction = ExtractionResult(
+        constraints=[
+            ConstraintExtract(type="stack", description="Use Postgresql for storage."),
+            ConstraintExtract(type="time", description="Ship by Friday"),
+        ],
+        strategies=[StrategyExtract(title="Cache build artifacts!", approach="CI cache")],
+        pain_points=[
+            PainPointExtract(description="integration tests are flaky"),
+            PainPointExtract(description="Unit tests are slow"),
+        ],
+    )
+
+    result = resolve(extraction)
+
+    assert result.duplicates == {
+        "Constraint": {"Use Postgresql for storage.": "constraint-1"},
+        "Strategy": {"Cache build artifacts!": "strategy-1"},
+        "PainPoint": {"integration tests are flaky": "pp-1"},
+    }
+    assert result.resolved == 3
+    assert extraction.constraints[0].description == "Use Postgresql for storage."
+
+
+def test_no_existing_entities():
+    """Test that everything is new when the graph is empty."""
+    extraction = ExtractionResult(
+        goals=[GoalExtract(title="Add user login")],
+        constraints=[ConstraintExtract(type="stack", description="Use PostgreSQL")],
+    )
+
+    result = DedupEngine().resolve(extraction, {})
+
+    assert result.goal_merges == []
+    assert result.ambiguous_goals == []
+    assert result.duplicates == {}
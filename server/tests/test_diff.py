@@ -0,0 +1,137 @@
+"""
+Tests for diff summarization in the extractor prompt.
+"""
+
+from kg_mcp.llm.prompts.diff import parse_unified_diff, summarize_diff
+from kg_mcp.llm.prompts.extractor import get_extractor_prompt
+
+DIFF = """diff --git a/src/auth.py b/src/auth.py
+index 1111111..2222222 100644
+--- a/src/auth.py
++++ b/src/auth.py
+@@ -10,6 +10,9 @@ class AuthService:
+     def login(self, user):
+-        return self.tokens.issue(user)
++        token = self.tokens.issue(user)
++        self.audit.record(user)
++        return token
++
++def refresh_token(token):
++    pass
+@@ -40,3 +43,3 @@ def logout(self):
+-    x = 1
++    x  =  1
+diff --git a/package-lock.json b/package-lock.json
+--- a/package-lock.json
++++ b/package-lock.json
+@@ -1,3 +1,3 @@
+-    "version": "1.0.0",
++    "version": "1.0.1",
+"""
+
+
+def test_parse_files_hunks_and_symbols():
+    """Test parsing paths, hunks, change counts and changed symbol names."""
+    files = parse_unified_diff(DIFF)
+
+    assert [f.path for f in files] == ["src/auth.py", "package-lock.json"]
+    auth = files[0]
+    assert len(auth.hunks) == 2
+    assert (auth.added, auth.removed) == (7, 2)
+    assert auth.symbols() == ["AuthService", "refresh_token", "logout"]
+    assert auth.hunks[1].whitespace_only
+
+
+def test_parse_changed_lines_that_look_like_file_headers():
+    """Test that "++ x" / "-- x" changes inside a hunk are not read as file headers."""
+    diff = (
+        "diff --git a/notes.md b/notes.md\n"
+        "--- a/notes.md\n"
+        "+++ b/notes.md\n"
+        "@@ -1,2 +1,2 @@\n"
+        "--- old separator\n"
+        "+++ new separator\n"
+        " text\n"
+        "\\ No newline at end of file\n"
+        "--- a/other.md\n"
+        "+++ b/other.md\n"
+        "@@ -1 +1 @@\n"
+        "-a\n"
+        "+b\n"
+    )
+
+    files = parse_unified_diff(diff)
+
+    assert [f.path for f in files] == ["notes.md", "other.md"]
+    assert files[0].hunks[0].changes == ["--- old separator", "+++ new separator"]
+    assert len(files[0].hunks[0].lines) == 4
+    assert (files[1].added, files[1].removed) == (1, 1)
+
+
+def test_parse_stripped_blank_context_lines():
+    """Test that an empty line in a hunk counts as context, so the next file is found."""
+    diff = (
+        "--- a/foo.py\n"
+        "+++ b/foo.py\n"
+        "@@ -1,3 +1,3 @@\n"
+        "-a = 1\n"
+        "+a = 2\n"
+        "\n"
+        " b = 1\n"
+        "--- a/bar.py\n"
+        "+++ b/bar.py\n"
+        "@@ -1 +1 @@\n"
+        "-c = 1\n"
+        "+c = 2\n"
+    )
+
+    files = parse_unified_diff(diff)
+
+    assert [(f.path, f.added, f.removed) for f in files] == [("foo.py", 1, 1), ("bar.py", 1, 1)]
+    assert files[0].hunks[0].lines[2] == " "
+    assert "bar.py (+1 -1)" in summarize_diff(diff)
+
+
+def test_summary_drops_lockfiles_and_whitespace_hunks():
+    """Test that lockfiles and whitespace-only hunks are left out of the summary."""
+    summary = summarize_diff(DIFF)
+
+    assert "src/auth.py (+6 -1)" in summary
+    assert "symbols: AuthService, refresh_token" in summary
+    assert "+        self.audit.record(user)" in summary
+    assert "def logout" not in summary
+    assert '"version"' not in summary
+    assert summary.endswith("[skipped: package-lock.json]")
+
+
+def test_summary_fits_budget_keeping_hunk_headers():
+    """Test that a large diff loses hunk bodies before its headers and symbols."""
+    body = "\n".join(f"+    line_{i} = compute({i})" for i in range(400))
+    large = (
+        "diff --git a/src/big.py b/src/big.py\n--- a/src/big.py\n+++ b/src/big.py\n"
+        f"@@ -1,1 +1,400 @@ def build_index():\n{body}\n"
+        f"@@ -900,1 +1300,2 @@ class Indexer:\n+    def flush(self):\n+        pass\n"
+    )
+
+    summary = summarize_diff(large, max_tokens=100)
+
+    assert len(summary) <= 400
+    assert "@@ -1,1 +1,400 @@ def build_index():" in summary
+    assert "@@ -900,1 +1300,2 @@ class Indexer:" in summary
+    assert "symbols: build_index, Indexer, flush" in summary
+
+
+def test_non_diff_text_is_truncated_to_budget():
+    """Test that text that is not a unified diff is cut to the budget."""
+    summary = summarize_diff("x" * 1000, max_tokens=10)
+
+    assert summary == "x" * 40 + "\n... [truncated]"
+
+
+def test_extractor_prompt_uses_summary():
+    """Test that the extractor prompt embeds the summarized diff."""
+    _, user_prompt = get_extractor_prompt("Add auditing", diff=DIFF)
+
+    assert "CODE DIFF:" in user_prompt
+    assert "[skipped: package-lock.json]" in user_prompt
+    assert "diff --git" not in user_prompt
@@ -0,0 +1,159 @@
+"""
+Tests for hedged LLM requests.
+"""
+
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from kg_mcp.config import Settings
+from kg_mcp.llm.client import LLMClient
+from kg_mcp.llm.hedging import Hedger
+from kg_mcp.llm.providers import Provider, ProviderPool, secondary_provider
+
+
+async def after(seconds, value):
+    await asyncio.sleep(seconds)
+    return value
+
+
+@pytest.mark.asyncio
+async def test_fast_request_is_not_hedged():
+    """Test that no backup is sent when the primary answers within the delay."""
+    hedger = Hedger(min_delay=0.5)
+    backup_calls = []
+
+    result = await hedger.run(lambda: after(0, "primary"), lambda: backup_calls.append(1))
+
+    assert result == "primary"
+    assert backup_calls == []
+    assert hedger.stats()["hedged"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_and_loser_cancelled():
+    """Test that the backup wins over a slow primary, which is then cancelled."""
+    hedger = Hedger(min_delay=0.01)
+    primary_cancelled = asyncio.Event()
+
+    async def slow_primary():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            primary_cancelled.set()
+            raise
+
+    result = await hedger.run(slow_primary, lambda: after(0, "backup"))
+    await asyncio.sleep(0)
+
+    assert result == "backup"
+    assert primary_cancelled.is_set()
+    assert hedger.stats() == {
+        "requests": 1,
+        "hedged": 1,
+        "hedge_wins": 1,
+        "hedge_rate": 1.0,
+        "delay_s": 0.01,
+    }
+
+
+@pytest.mark.asyncio
+async def test_failed_backup_falls_back_to_primary():
+    """Test that a failing backup does not fail a primary that later succeeds."""
+    hedger = Hedger(min_delay=0.01)
+
+    async def failing_backup():
+        raise RuntimeError("secondary down")
+
+    assert await hedger.run(lambda: after(0.05, "primary"), failing_backup) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_winning_backup_records_its_own_latency():
+    """Test that a backup's latency is measured from its launch, not the primary's."""
+    hedger = Hedger(min_delay=0.2)
+
+    result = await hedger.run(lambda: after(5, "primary"), lambda: after(0, "backup"))
+
+    assert result == "backup"
+    assert list(hedger._latencies) == [pytest.approx(0, abs=0.1)]
+
+
+def test_delay_follows_latency_percentile():
+    """Test that the delay is the configured percentile once enough samples exist."""
+    hedger = Hedger(percentile=90, min_delay=0.1, min_samples=10)
+    assert hedger.delay() == 0.1
+
+    hedger._latencies.extend([0.2] * 90 + [3.0] * 10)
+    assert hedger.delay() == 3.0
+
+
+def test_secondary_provider_only_in_both_mode():
+    """Test that the secondary is the non-primary configured provider."""
+    credentials = dict(
+        gemini_api_key="g-key",
+        gemini_model="gemini-2.0-flash",
+        litellm_base_url="https://gateway.example/",
+        litellm_api_key="l-key",
+    )
+
+    assert secondary_provider(Settings(llm_mode="litellm", **credentials)) is None
+    secondary = secondary_provider(
+        Settings(llm_mode="both", llm_primary="litellm", **credentials)
+    )
+    assert secondary.name == "gemini_direct"
+    assert secondary.model == "gemini/gemini-2.0-flash"
+    assert secondary.api_key == "g-key"
+
+
+@pytest.mark.asyncio
+async def test_client_hedges_extraction_on_secondary_provider():
+    """Test that a slow extraction is answered by the secondary provider."""
+    client = LLMClient()
+    client.extraction_cache = None
+    client.pool = ProviderPool(
+        [client.pool.primary, Provider(name="gemini_direct", model="gemini/backup", api_key="g")]
+    )
+    client.hedger = Hedger(min_delay=0.01)
+
+    async def acompletion(**kwargs):
+        if kwargs["model"] != "gemini/backup":
+            await asyncio.sleep(5)
+        response = MagicMock()
+        response.choices = [MagicMock()]
+        response.choices[0].message.content = json.dumps({"goals": [{"title": "Add auth"}]})
+        return response
+
+    with patch("kg_mcp.llm.client.litellm.acompletion", side_effect=acompletion):
+        result = await asyncio.wait_for(client.extract_entities("Add auth"), timeout=2)
+
+    assert result.goals[0].title == "Add auth"
+    assert client.stats()["hedging"]["hedge_wins"] == 1
+    assert "extract/fast" in client.stats()["routing"]["routes"]
+
+
+@pytest.mark.asyncio
+async def test_client_does_not_hedge_with_a_single_provider():
+    """Test that without a second provider the request is sent once, unhedged."""
+    client = LLMClient()
+    client.extraction_cache = None
+    client.pool = ProviderPool([client.pool.primary])
+    client.hedger = Hedger(min_delay=0.01)
+    calls = []
+
+    async def acompletion(**kwargs):
+        calls.append(kwargs["model"])
+        await asyncio.sleep(0.05)
+        response = MagicMock()
+        response.choices = [MagicMock()]
+        response.choices[0].message.content = json.dumps({"goals": [{"title": "Add auth"}]})
+        return response
+
+    with patch("kg_mcp.llm.client.litellm.acompletion", side_effect=acompletion):
+        result = await client.extract_entities("Add auth")
+
+    assert result.goals[0].title == "Add auth"
+    assert len(calls) == 1
+    assert client.stats()["hedging"]["requests"] == 0
@@ -0,0 +1,95 @@
+"""
+Tests for the shared LLM HTTP session and connection warm-up.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import litellm
+import pytest
+
+from kg_mcp import main
+from kg_mcp.llm import http
+from kg_mcp.llm.client import LLMClient
+
+
+@pytest.fixture(autouse=True)
+async def fresh_session():
+    """Start each test without a shared client and close it afterwards."""
+    await http.close_http_client()
+    yield
+    await http.close_http_client()
+
+
+@pytest.mark.asyncio
+async def test_shared_client_is_installed_into_litellm():
+    """Test that one client is reused and handed to LiteLLM until closed."""
+    client = http.get_http_client()
+
+    assert http.get_http_client() is client
+    assert litellm.aclient_session is client
+    assert http.get_http_handler().client is client
+
+    await http.close_http_client()
+    assert litellm.aclient_session is None
+    assert http.get_http_client() is not client
+
+
+@pytest.mark.asyncio
+async def test_warm_up_counts_reachable_endpoints():
+    """Test that any HTTP answer counts as warmed and connection errors are ignored."""
+
+    def handler(request):
+        if request.url.host == "down.example":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(404)
+
+    http._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    reached = await http.warm_up(
+        ["https://gateway.example", "https://down.example", "https://gateway.example", ""]
+    )
+
+    assert reached == 1
+
+
+@pytest.mark.asyncio
+async def test_gemini_calls_use_the_shared_session():
+    """Test that Gemini requests are sent through the shared client."""
+    client = LLMClient()
+    client.extraction_cache = None
+    client.api_base = None
+    client.router.models = {"fast": "gemini/gemini-2.0-flash", "reason": "gemini/gemini-2.0-flash"}
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = json.dumps({})
+    acompletion = AsyncMock(return_value=response)
+
+    with patch("kg_mcp.llm.client.litellm.acompletion", acompletion):
+        await client.extract_entities("Add auth")
+
+    assert acompletion.call_args.kwargs["client"].client is http.get_http_client()
+
+
+@pytest.mark.asyncio
+async def test_serve_warms_up_and_closes_session():
+    """Test that startup warms the LLM endpoints and shutdown closes the session."""
+    llm_client = MagicMock()
+    llm_client.endpoints.return_value = ["https://gateway.example"]
+    llm_client.pool.run_health_checks = AsyncMock()
+    warm_up = AsyncMock(return_value=1)
+
+    async def transport():
+        # Give the background warm-up a chance to run
+        http.get_http_client()
+        await asyncio.sleep(0)
+
+    with patch.object(main, "replay_journal", AsyncMock(return_value=0)), patch.object(
+        main, "get_llm_client", return_value=llm_client
+    ), patch.object(main, "warm_up", warm_up):
+        await main.serve(transport)
+
+    warm_up.assert_awaited_once_with(["https://gateway.example"])
+    assert http._client is None
@@ -0,0 +1,111 @@
+"""
+Tests for the code indexer.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from kg_mcp.codegraph.indexer import CodeIndexer, parse_file
+from kg_mcp.config import Settings
+
+
+@pytest.fixture
+def codebase(tmp_path):
+    """Create a small codebase on disk."""
+    (tmp_path / "a.py").write_text("def alpha():\n    pass\n")
+    (tmp_path / "b.py").write_text("class Beta:\n    pass\n")
+    (tmp_path / "__pycache__").mkdir()
+    (tmp_path / "__pycache__" / "c.py").write_text("def ignored():\n    pass\n")
+    return tmp_path
+
+
+@pytest.fixture
+def mock_repo():
+    """Create a mock repository."""
+    repo = MagicMock()
+    repo.get_artifact_hashes = AsyncMock(return_value={})
+    repo.upsert_code_artifact = AsyncMock(return_value={"id": "artifact-1"})
+    repo.upsert_symbols_bulk = AsyncMock(return_value=[])
+    repo.run_transaction = AsyncMock(side_effect=run_unit_of_work)
+    return repo
+
+
+async def run_unit_of_work(work):
+    return await work()
+
+
+def make_indexer(root, repo):
+    with patch("kg_mcp.codegraph.indexer.get_repository", return_value=repo):
+        indexer = CodeIndexer("test-project", str(root))
+    indexer.settings = Settings(kg_indexer_workers=2)
+    return indexer
+
+
+@pytest.mark.asyncio
+async def test_index_codebase(codebase, mock_repo):
+    """Test that every file is parsed and saved."""
+    indexer = make_indexer(codebase, mock_repo)
+
+    snapshot = await indexer.index_codebase(extensions=[".py"])
+
+    assert sorted(f.path for f in snapshot.files) == ["a.py", "b.py"]
+    assert snapshot.total_symbols == 2
+    assert mock_repo.upsert_code_artifact.await_count == 2
+    mock_repo.get_artifact_hashes.assert_awaited_once_with("test-project")
+
+
+@pytest.mark.asyncio
+async def test_index_codebase_skips_unchanged_files(codebase, mock_repo):
+    """Test that files whose stored hash matches are not parsed or saved."""
+    unchanged = parse_file(str(codebase), str(codebase / "a.py"))
+    mock_repo.get_artifact_hashes.return_value = {"a.py": unchanged.content_hash}
+    indexer = make_indexer(codebase, mock_repo)
+
+    snapshot = await indexer.index_codebase(extensions=[".py"])
+
+    assert [f.path for f in snapshot.files] == ["b.py"]
+    assert snapshot.unchanged_files == ["a.py"]
+    mock_repo.upsert_code_artifact.assert_awaited_once()
+    assert mock_repo.upsert_code_artifact.call_args.kwargs["path"] == "b.py"
+
+
+@pytest.mark.asyncio
+async def test_index_codebase_full_reindex(codebase, mock_repo):
+    """Test that incremental=False reindexes everything without a hash lookup."""
+    indexer = make_indexer(codebase, mock_repo)
+
+    snapshot = await indexer.index_codebase(extensions=[".py"], incremental=False)
+
+    assert len(snapshot.files) == 2
+    assert snapshot.unchanged_files == []
+    mock_repo.get_artifact_hashes.assert_not_awaited()
+
+
+class RecordingPool(ThreadPoolExecutor):
+    """Thread pool standing in for the process pool, recording shutdowns."""
+
+    shutdowns: list = []
+
+    def __init__(self, max_workers=None, mp_context=None):
+        super().__init__(max_workers=max_workers)
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shutdowns.append({"wait": wait, "cancel_futures": cancel_futures})
+        super().shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_index_shuts_down_pool_without_waiting(codebase, mock_repo):
+    """Test that a cancelled run cancels queued chunks instead of blocking on them."""
+    mock_repo.run_transaction.side_effect = asyncio.CancelledError
+    indexer = make_indexer(codebase, mock_repo)
+    RecordingPool.shutdowns = []
+
+    with patch("kg_mcp.codegraph.indexer.ProcessPoolExecutor", RecordingPool):
+        with pytest.raises(asyncio.CancelledError):
+            await indexer.index_codebase(extensions=[".py"])
+
+    assert RecordingPool.shutdowns == [{"wait": False, "cancel_futures": True}]
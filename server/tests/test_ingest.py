@@ -2,9 +2,12 @@
 Tests for the ingest pipeline.
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from kg_mcp.config import Settings
 from kg_mcp.kg.ingest import IngestPipeline
 from kg_mcp.llm.schemas import (
     ExtractionResult,
@@ -59,15 +62,21 @@ def mock_repository():
         return_value={"id": "interaction-123", "user_text": "test"}
     )
     repo.get_all_goals = AsyncMock(return_value=[])
+    repo.get_entity_texts = AsyncMock(return_value={})
     repo.get_preferences = AsyncMock(return_value=[])
     repo.get_recent_interactions = AsyncMock(return_value=[])
     repo.upsert_goal = AsyncMock(return_value={"id": "goal-123", "title": "Test Goal"})
     repo.upsert_preference = AsyncMock(return_value={"id": "pref-123"})
     repo.upsert_constraint = AsyncMock(return_value={"id": "constraint-123"})
     repo.link_interaction_to_goal = AsyncMock()
+    repo.run_transaction = AsyncMock(side_effect=run_unit_of_work)
     return repo
 
 
+async def run_unit_of_work(work):
+    return await work()
+
+
 @pytest.mark.asyncio
 async def test_ingest_creates_interaction(mock_llm_client, mock_repository):
     """Test that ingest creates an interaction node."""
@@ -178,3 +187,223 @@ async def test_ingest_returns_confidence(mock_llm_client, mock_repository):
 
             assert "confidence" in result
             assert result["confidence"] == 0.85
+
+
+@pytest.mark.asyncio
+async def test_ingest_bulk_commit(mock_llm_client, mock_repository):
+    """Test that bulk mode commits the whole extraction in one repository call."""
+    mock_repository.commit_extraction_bulk = AsyncMock(
+        return_value={
+            "goals": ["goal-123"],
+            "constraints": ["constraint-123"],
+            "preferences": ["pref-123"],
+            "pain_points": [],
+            "strategies": [],
+            "code_artifacts": [],
+        }
+    )
+
+    with patch("kg_mcp.kg.ingest.get_llm_client", return_value=mock_llm_client):
+        with patch("kg_mcp.kg.ingest.get_repository", return_value=mock_repository):
+            pipeline = IngestPipeline()
+            pipeline.llm = mock_llm_client
+            pipeline.repo = mock_repository
+            pipeline.settings = Settings(kg_bulk_commit=True)
+
+            result = await pipeline.process_message(
+                project_id="test-project",
+                user_text="Implement feature X by Friday",
+            )
+
+            mock_repository.commit_extraction_bulk.assert_called_once()
+            mock_repository.upsert_goal.assert_not_called()
+            mock_repository.link_interaction_to_goal.assert_not_called()
+
+            kwargs = mock_repository.commit_extraction_bulk.call_args.kwargs
+            assert kwargs["interaction_id"] == "interaction-123"
+            assert [g["title"] for g in kwargs["goals"]] == ["Implement feature X"]
+            assert kwargs["constraints"][0]["goal_title"] == "Implement feature X"
+            assert result["created_entities"]["goals"] == ["goal-123"]
+
+
+@pytest.mark.asyncio
+async def test_ingest_writes_in_one_transaction(mock_llm_client, mock_repository):
+    """Test that nothing is written when extraction fails."""
+    mock_llm_client.extract_entities = AsyncMock(side_effect=RuntimeError("LLM down"))
+
+    with patch("kg_mcp.kg.ingest.get_llm_client", return_value=mock_llm_client):
+        with patch("kg_mcp.kg.ingest.get_repository", return_value=mock_repository):
+            pipeline = IngestPipeline()
+            pipeline.llm = mock_llm_client
+            pipeline.repo = mock_repository
+
+            with pytest.raises(RuntimeError):
+                await pipeline.process_message(
+                    project_id="test-project",
+                    user_text="Implement feature X",
+                )
+
+            mock_repository.run_transaction.assert_not_called()
+            mock_repository.create_interaction.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ingest_reads_run_during_extraction(mock_llm_client, mock_repository):
+    """Test that linking reads are issued while the extraction call is in flight."""
+    reads_started = asyncio.Event()
+    extraction = mock_llm_client.extract_entities.return_value
+
+    async def slow_extract(**kwargs):
+        # Only completes if the reads were scheduled concurrently
+        await reads_started.wait()
+        return extraction
+
+    async def get_all_goals(project_id):
+        reads_started.set()
+        return []
+
+    mock_llm_client.extract_entities = AsyncMock(side_effect=slow_extract)
+    mock_repository.get_all_goals = AsyncMock(side_effect=get_all_goals)
+
+    with patch("kg_mcp.kg.ingest.get_llm_client", return_value=mock_llm_client):
+        with patch("kg_mcp.kg.ingest.get_repository", return_value=mock_repository):
+            pipeline = IngestPipeline()
+            pipeline.llm = mock_llm_client
+            pipeline.repo = mock_repository
+
+            result = await asyncio.wait_for(
+                pipeline.process_message(
+                    project_id="test-project",
+                    user_text="Implement feature X",
+                ),
+                timeout=2,
+            )
+
+            assert result["interaction_id"] == "interaction-123"
+            mock_repository.get_preferences.assert_awaited_once()
+            mock_repository.get_recent_interactions.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_ingest_skips_linking_without_existing_goals(mock_llm_client, mock_repository):
+    """Test that the linker is not called when there is nothing to merge into."""
+    with patch("kg_mcp.kg.ingest.get_llm_client", return_value=mock_llm_client):
+        with patch("kg_mcp.kg.ingest.get_repository", return_value=mock_repository):
+            pipeline = IngestPipeline()
+            pipeline.llm = mock_llm_client
+            pipeline.repo = mock_repository
+
+            await pipeline.process_message(project_id="test-project", user_text="ok thanks")
+
+            mock_llm_client.link_entities.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ingest_resolves_exact_title_matches_locally(mock_llm_client, mock_repository):
+    """Test that a goal matching an existing title merges without the linker."""
+    mock_repository.get_all_goals.return_value = [
+        {"id": "goal-existing", "title": "Implement Feature X!", "status": "active"}
+    ]
+
+    with patch("kg_mcp.kg.ingest.get_llm_client", return_value=mock_llm_client):
+        with patch("kg_mcp.kg.ingest.get_repository", return_value=mock_repository):
+            pipeline = IngestPipeline()
+            pipeline.settings = Settings(kg_dedup_enabled=False)
+            pipeline.llm = mock_llm_client
+            pipeline.repo = mock_repository
+
+            result = await pipeline.process_message(
+                project_id="test-project", user_text="Implement feature X"
+            )
+
+            mock_llm_client.link_entities.assert_not_called()
+            mock_repository.upsert_goal.assert_not_called()
+            mock_repository.link_interaction_to_goal.assert_called_once_with(
+                "interaction-123", "goal-existing"
+            )
+            assert result["linking"]["merge_suggestions"][0]["confidence"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_ingest_links_only_unmatched_goals(mock_llm_client, mock_repository):
+    """Test that the linker sees every goal without an exact match, and only those."""
+    mock_llm_client.extract_entities.return_value = ExtractionResult(
+        goals=[
+            GoalExtract(title="Implement feature X"),
+            GoalExtract(title="Implement feature X and Y"),
+            GoalExtract(title="Add caching"),
+        ]
+    )
+    mock_repository.get_all_goals.return_value = [
+        {"id": "goal-existing", "title": "Implement feature X", "status": "active"}
+    ]
+
+    with patch("kg_mcp.kg.ingest.get_llm_client", return_value=mock_llm_client):
+        with patch("kg_mcp.kg.ingest.get_repository", return_value=mock_repository):
+            pipeline = IngestPipeline()
+            pipeline.settings = Settings(kg_dedup_enabled=False)
+            pipeline.llm = mock_llm_client
+            pipeline.repo = mock_repository
+
+            await pipeline.process_message(project_id="test-project", user_text="test")
+
+            extraction = mock_llm_client.link_entities.call_args.kwargs["extraction"]
+            assert [g.title for g in extraction.goals] == [
+                "Implement feature X and Y",
+                "Add caching",
+            ]
+
+
+@pytest.mark.asyncio
+async def test_ingest_dedup_resolves_near_duplicates_and_links_ambiguous_goals(
+    mock_llm_client, mock_repository
+):
+    """Test that near-duplicates merge locally and only ambiguous goals reach the linker."""
+    mock_llm_client.extract_entities.return_value = ExtractionResult(
+        goals=[
+            GoalExtract(title="Implement Feature X."),
+            GoalExtract(title="Implement feature X and Y"),
+            GoalExtract(title="Write onboarding docs"),
+        ],
+        constraints=[ConstraintExtract(type="stack", description="Use Postgresql for storage.")],
+    )
+    mock_repository.get_all_goals.return_value = [
+        {"id": "goal-existing", "title": "Implement feature X", "status": "active"}
+    ]
+    mock_repository.get_entity_texts.return_value = {
+        "Goal": [{"id": "goal-existing", "text": "Implement feature X"}],
+        "Constraint": [{"id": "constraint-existing", "text": "Use PostgreSQL for storage"}],
+    }
+
+    with patch("kg_mcp.kg.ingest.get_llm_client", return_value=mock_llm_client):
+        with patch("kg_mcp.kg.ingest.get_repository", return_value=mock_repository):
+            pipeline = IngestPipeline()
+            pipeline.llm = mock_llm_client
+            pipeline.repo = mock_repository
+
+            await pipeline.process_message(project_id="test-project", user_text="test")
+
+            extraction = mock_llm_client.link_entities.call_args.kwargs["extraction"]
+            assert [g.title for g in extraction.goals] == ["Implement feature X and Y"]
+            mock_repository.link_interaction_to_goal.assert_any_call(
+                "interaction-123", "goal-existing"
+            )
+            constraint = mock_repository.upsert_constraint.call_args.kwargs
+            assert constraint["existing_id"] == "constraint-existing"
+            assert constraint["description"] == "Use Postgresql for storage."
+
+
+@pytest.mark.asyncio
+async def test_streaming_does_not_write_before_the_commit(mock_llm_client, mock_repository):
+    """Test that with streaming enabled, entities are written only in the transaction."""
+    with patch("kg_mcp.kg.ingest.get_llm_client", return_value=mock_llm_client):
+        with patch("kg_mcp.kg.ingest.get_repository", return_value=mock_repository):
+            pipeline = IngestPipeline()
+            pipeline.settings = Settings(llm_stream=True)
+            pipeline.llm = mock_llm_client
+            pipeline.repo = mock_repository
+
+            await pipeline.process_message(project_id="test-project", user_text="Use type hints")
+
+            assert "on_entity" not in mock_llm_client.extract_entities.call_args.kwargs
+            mock_repository.upsert_preference.assert_awaited_once()
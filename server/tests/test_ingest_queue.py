@@ -0,0 +1,125 @@
+"""
+Tests for the deferred ingest queue.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pydantic import ValidationError
+
+from kg_mcp.config import Settings
+from kg_mcp.kg.ingest_queue import IngestQueue
+
+
+@pytest.fixture
+def mock_pipeline():
+    """Create a mock ingest pipeline."""
+    pipeline = MagicMock()
+    pipeline.process_message = AsyncMock(
+        return_value={"created_entities": {"goals": ["goal-1"]}}
+    )
+    return pipeline
+
+
+@pytest.mark.asyncio
+async def test_submit_returns_id_and_processes_in_background(mock_pipeline):
+    """Test that submit returns at once and the message is ingested later."""
+    queue = IngestQueue(pipeline=mock_pipeline)
+
+    interaction_id = await queue.submit(project_id="test-project", user_text="Add auth")
+    assert queue.status(interaction_id) is not None
+
+    await queue.drain()
+
+    status = queue.status(interaction_id)
+    assert status["status"] == "done"
+    assert status["created_entities"] == {"goals": ["goal-1"]}
+    kwargs = mock_pipeline.process_message.call_args.kwargs
+    assert kwargs["interaction_id"] == interaction_id
+    assert kwargs["user_text"] == "Add auth"
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit(mock_pipeline):
+    """Test that no more than `workers` messages are processed at once."""
+    running = 0
+    peak = 0
+
+    async def process_message(**kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {}
+
+    mock_pipeline.process_message = AsyncMock(side_effect=process_message)
+    queue = IngestQueue(pipeline=mock_pipeline, workers=2)
+
+    for i in range(6):
+        await queue.submit(project_id="test-project", user_text=f"message {i}")
+    await queue.drain()
+
+    assert peak == 2
+    assert mock_pipeline.process_message.await_count == 6
+
+
+@pytest.mark.asyncio
+async def test_backpressure_when_full(mock_pipeline):
+    """Test that submit gives up with QueueFull when the queue stays full."""
+    release = asyncio.Event()
+
+    async def process_message(**kwargs):
+        await release.wait()
+        return {}
+
+    mock_pipeline.process_message = AsyncMock(side_effect=process_message)
+    queue = IngestQueue(pipeline=mock_pipeline, maxsize=1, workers=1, enqueue_timeout=0.01)
+
+    await queue.submit(project_id="test-project", user_text="in progress")
+    await asyncio.sleep(0)
+    await queue.submit(project_id="test-project", user_text="waiting")
+
+    with pytest.raises(asyncio.QueueFull):
+        await queue.submit(project_id="test-project", user_text="rejected")
+
+    release.set()
+    await queue.drain()
+    assert mock_pipeline.process_message.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_ingest_is_reported(mock_pipeline):
+    """Test that a failing message is marked failed and later ones still run."""
+    mock_pipeline.process_message.side_effect = [RuntimeError("LLM down"), {}]
+    queue = IngestQueue(pipeline=mock_pipeline, workers=1)
+
+    failed = await queue.submit(project_id="test-project", user_text="first")
+    succeeded = await queue.submit(project_id="test-project", user_text="second")
+    await queue.drain()
+
+    assert queue.status(failed) == {
+        "interaction_id": failed,
+        "project_id": "test-project",
+        "status": "failed",
+        "error": "LLM down",
+    }
+    assert queue.status(succeeded)["status"] == "done"
+
+
+@pytest.mark.asyncio
+async def test_submit_after_drain_is_rejected(mock_pipeline):
+    """Test that a drained queue no longer accepts messages."""
+    queue = IngestQueue(pipeline=mock_pipeline)
+    await queue.drain()
+
+    with pytest.raises(RuntimeError):
+        await queue.submit(project_id="test-project", user_text="late")
+
+
+def test_ingest_mode_must_be_sync_or_deferred():
+    """Test that a misspelled KG_INGEST_MODE is rejected instead of meaning sync."""
+    assert Settings(kg_ingest_mode="deferred").kg_ingest_mode == "deferred"
+    with pytest.raises(ValidationError):
+        Settings(kg_ingest_mode="defered")
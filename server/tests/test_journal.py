@@ -0,0 +1,177 @@
+"""
+Tests for the durable ingest journal.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from kg_mcp.config import Settings
+from kg_mcp.kg import ingest_queue
+from kg_mcp.kg.ingest import IngestPipeline
+from kg_mcp.kg.ingest_queue import IngestQueue
+from kg_mcp.kg.journal import IngestJournal
+
+PAYLOAD = {"project_id": "test-project", "user_text": "Add auth", "user_id": "default_user"}
+
+
+@pytest.fixture
+def journal(tmp_path):
+    """Create a journal in a temporary directory."""
+    journal = IngestJournal(str(tmp_path / "journal" / "ingest.db"))
+    yield journal
+    journal.close()
+
+
+@pytest.mark.asyncio
+async def test_only_unfinished_ingests_are_pending(journal):
+    """Test that done and failed ingests are not replayed."""
+    await journal.record_pending("interaction-1", PAYLOAD)
+    await journal.record_pending("interaction-2", PAYLOAD)
+    await journal.record_pending("interaction-3", PAYLOAD)
+    await journal.record_done("interaction-1")
+    await journal.record_failed("interaction-2", "LLM down")
+
+    assert journal.pending() == [{**PAYLOAD, "interaction_id": "interaction-3"}]
+
+
+@pytest.mark.asyncio
+async def test_pending_survives_reopen(tmp_path):
+    """Test that a new process sees what the previous one left pending."""
+    path = str(tmp_path / "ingest.db")
+    journal = IngestJournal(path)
+    await journal.record_pending("interaction-1", PAYLOAD)
+    journal.close()
+
+    reopened = IngestJournal(path)
+    assert [e["interaction_id"] for e in reopened.pending()] == ["interaction-1"]
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_attempts(journal):
+    """Test that an ingest interrupted too often is marked failed."""
+    journal.max_attempts = 2
+    await journal.record_pending("interaction-1", PAYLOAD)
+    await journal.record_pending("interaction-1", PAYLOAD)
+
+    assert journal.pending() == []
+    assert journal.pending() == []
+
+
+@pytest.mark.asyncio
+async def test_compact_keeps_pending(journal):
+    """Test that compaction drops finished history only."""
+    await journal.record_pending("interaction-1", PAYLOAD)
+    await journal.record_done("interaction-1")
+    await journal.record_pending("interaction-2", PAYLOAD)
+
+    journal.compact()
+
+    rows = journal._db.execute("SELECT interaction_id FROM ingest_journal").fetchall()
+    assert rows == [("interaction-2",)]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_journals_before_processing(journal):
+    """Test that the pipeline records the message before the LLM runs and fails cleanly."""
+    pipeline = IngestPipeline.__new__(IngestPipeline)
+    pipeline.settings = Settings()
+    pipeline.journal = journal
+    pipeline.llm = MagicMock()
+
+    async def extract_entities(**kwargs):
+        assert [e["interaction_id"] for e in journal.pending()] == ["interaction-1"]
+        raise RuntimeError("LLM down")
+
+    pipeline.llm.extract_entities = AsyncMock(side_effect=extract_entities)
+    pipeline.repo = MagicMock()
+    for read in ("get_all_goals", "get_preferences", "get_recent_interactions"):
+        setattr(pipeline.repo, read, AsyncMock(return_value=[]))
+    pipeline.repo.get_entity_texts = AsyncMock(return_value={})
+
+    with pytest.raises(RuntimeError):
+        await pipeline.process_message(
+            project_id="test-project", user_text="Add auth", interaction_id="interaction-1"
+        )
+
+    assert journal.pending() == []
+
+
+@pytest.mark.asyncio
+async def test_replay_journal_queues_pending(journal):
+    """Test that startup replay resubmits interrupted ingests with their ids."""
+    await journal.record_pending("interaction-1", PAYLOAD)
+    queue = MagicMock()
+    queue.submit = AsyncMock(return_value="interaction-1")
+
+    with patch.object(ingest_queue, "get_ingest_journal", return_value=journal):
+        with patch.object(ingest_queue, "get_ingest_queue", return_value=queue):
+            replayed = await ingest_queue.replay_journal()
+
+    assert replayed == 1
+    queue.submit.assert_awaited_once_with(**PAYLOAD, interaction_id="interaction-1")
+
+
+@pytest.mark.asyncio
+async def test_replay_journal_backs_off_while_queue_is_full(journal, monkeypatch):
+    """Test that replay sleeps between resubmits when the queue stays full."""
+    await journal.record_pending("interaction-1", PAYLOAD)
+    queue = MagicMock()
+    queue.submit = AsyncMock(
+        side_effect=[asyncio.QueueFull(), asyncio.QueueFull(), "interaction-1"]
+    )
+    sleep = AsyncMock()
+    monkeypatch.setattr(ingest_queue.asyncio, "sleep", sleep)
+
+    with patch.object(ingest_queue, "get_ingest_journal", return_value=journal):
+        with patch.object(ingest_queue, "get_ingest_queue", return_value=queue):
+            replayed = await ingest_queue.replay_journal()
+
+    assert replayed == 1
+    assert queue.submit.await_count == 3
+    assert [c.args[0] for c in sleep.await_args_list] == [
+        ingest_queue.REPLAY_RETRY_BASE_DELAY,
+        ingest_queue.REPLAY_RETRY_BASE_DELAY * 2,
+    ]
+
+
+async def process_forever(**kwargs):
+    await asyncio.Event().wait()
+
+
+@pytest.mark.asyncio
+async def test_queue_journals_messages_when_accepted(journal):
+    """Test that a queued message is journaled at submit and survives a timed out drain."""
+    pipeline = MagicMock()
+    pipeline.process_message = AsyncMock(side_effect=process_forever)
+    queue = IngestQueue(pipeline=pipeline, maxsize=5, workers=1)
+    queue.journal = journal
+
+    await queue.submit(**PAYLOAD, interaction_id="interaction-1")
+    await queue.submit(**PAYLOAD, interaction_id="interaction-2")
+    assert [e["interaction_id"] for e in journal.pending()] == ["interaction-1", "interaction-2"]
+
+    await queue.drain(timeout=0.05)
+
+    assert pipeline.process_message.call_args.kwargs["journaled"] is True
+    assert [e["interaction_id"] for e in journal.pending()] == ["interaction-1", "interaction-2"]
+
+
+@pytest.mark.asyncio
+async def test_queue_full_message_is_not_replayed(journal):
+    """Test that a message handed back with QueueFull is not left pending."""
+    pipeline = MagicMock()
+    pipeline.process_message = AsyncMock(side_effect=process_forever)
+    queue = IngestQueue(pipeline=pipeline, maxsize=1, workers=1, enqueue_timeout=0.01)
+    queue.journal = journal
+
+    await queue.submit(**PAYLOAD, interaction_id="interaction-1")
+    await asyncio.sleep(0)
+    await queue.submit(**PAYLOAD, interaction_id="interaction-2")
+    with pytest.raises(asyncio.QueueFull):
+        await queue.submit(**PAYLOAD, interaction_id="interaction-3")
+
+    assert [e["interaction_id"] for e in journal.pending()] == ["interaction-1", "interaction-2"]
+    await queue.drain(timeout=0.01)
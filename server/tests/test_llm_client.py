@@ -0,0 +1,233 @@
+"""
+Tests for the LLM client and its extraction cache.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import litellm
+import pytest
+
+from kg_mcp.llm.batcher import MicroBatcher
+from kg_mcp.llm.cache import ExtractionCache, cache_key
+from kg_mcp.llm.client import LLMClient
+from kg_mcp.llm.schemas import ExtractionResult, GoalExtract
+
+
+def completion(data):
+    """Build a litellm-style completion response."""
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = json.dumps(data)
+    return response
+
+
+@pytest.fixture
+def llm_client():
+    """Create an LLM client with a fresh in-memory extraction cache."""
+    client = LLMClient()
+    client.extraction_cache = ExtractionCache(max_entries=8)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_extract_entities_reuses_identical_requests(llm_client):
+    """Test that an identical extraction does not call the LLM twice."""
+    acompletion = AsyncMock(return_value=completion({"goals": [{"title": "Add auth"}]}))
+
+    with patch("kg_mcp.llm.client.litellm.acompletion", acompletion):
+        first = await llm_client.extract_entities("Add auth", files=["src/auth.py"])
+        second = await llm_client.extract_entities("Add auth", files=["src/auth.py"])
+        await llm_client.extract_entities("Add auth", files=["src/other.py"])
+
+    assert second == first
+    assert second.goals[0].title == "Add auth"
+    assert acompletion.await_count == 2
+    assert llm_client.extraction_cache.stats()["hits"] == 1
+
+
+def test_cache_key_covers_sampling_parameters():
+    """Test that the same prompt at another temperature is a different entry."""
+    messages = [{"role": "user", "content": "hi"}]
+
+    assert cache_key(model="m", messages=messages, temperature=0.2) == cache_key(
+        temperature=0.2, messages=messages, model="m"
+    )
+    assert cache_key(model="m", messages=messages, temperature=0.2) != cache_key(
+        model="m", messages=messages, temperature=0.7
+    )
+
+
+@pytest.mark.asyncio
+async def test_cache_lru_eviction():
+    """Test that the least recently used entry is evicted."""
+    cache = ExtractionCache(max_entries=2)
+    for key in ("a", "b"):
+        await cache.set(key, ExtractionResult())
+    await cache.get("a")
+    await cache.set("c", ExtractionResult())
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") is not None
+
+
+@pytest.mark.asyncio
+async def test_cache_ttl_expiry():
+    """Test that expired entries are not returned."""
+    cache = ExtractionCache(ttl=60)
+    await cache.set("a", ExtractionResult())
+
+    with patch("kg_mcp.llm.cache.time.time", return_value=10**12):
+        assert await cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_disk_tier_survives_restart(tmp_path):
+    """Test that the SQLite tier serves entries to a new cache instance."""
+    path = str(tmp_path / "cache" / "extractions.db")
+    result = ExtractionResult(goals=[GoalExtract(title="Persist me")])
+
+    cache = ExtractionCache(path=path)
+    await cache.set("a", result)
+    cache.close()
+
+    reopened = ExtractionCache(path=path)
+    assert await reopened.get("a") == result
+    assert reopened.stats()["disk_hits"] == 1
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_link_entities_sends_only_top_candidates(llm_client):
+    """Test that the linker prompt holds only the most similar existing goals."""
+    existing_goals = [
+        {"id": f"goal-{i}", "title": f"Unrelated chore number {i}", "status": "active"}
+        for i in range(300)
+    ]
+    existing_goals.append({"id": "goal-auth", "title": "Add OAuth login", "status": "active"})
+    acompletion = AsyncMock(return_value=completion({}))
+
+    with patch("kg_mcp.llm.client.litellm.acompletion", acompletion):
+        await llm_client.link_entities(
+            extraction=ExtractionResult(goals=[GoalExtract(title="Add OAuth login flow")]),
+            existing_goals=existing_goals,
+            existing_preferences=[],
+            recent_interactions=[],
+        )
+
+    user_prompt = acompletion.call_args.kwargs["messages"][1]["content"]
+    assert "goal-auth" in user_prompt
+    assert user_prompt.count("- ID: goal-") <= llm_client.settings.kg_link_top_k
+
+
+@pytest.mark.asyncio
+async def test_concurrent_extractions_share_one_request(llm_client):
+    """Test that extractions arriving together are answered by one batched call."""
+    llm_client.batcher = MicroBatcher(llm_client._extract_batch, window_ms=50, max_size=4)
+    acompletion = AsyncMock(
+        return_value=completion(
+            {"results": [{"goals": [{"title": "Add auth"}]}, {"goals": [{"title": "Fix CI"}]}]}
+        )
+    )
+
+    with patch("kg_mcp.llm.client.litellm.acompletion", acompletion):
+        auth, ci = await asyncio.gather(
+            llm_client.extract_entities("Add auth"),
+            llm_client.extract_entities("Fix CI"),
+        )
+
+    assert acompletion.await_count == 1
+    assert "=== MESSAGE 1 ===" in acompletion.call_args.kwargs["messages"][1]["content"]
+    assert auth.goals[0].title == "Add auth"
+    assert ci.goals[0].title == "Fix CI"
+    assert llm_client.batcher.stats()["mean_batch_size"] == 2
+    # Answers to the combined prompt are not stored under single-message keys
+    assert llm_client.extraction_cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_batched_extraction_falls_back_on_mismatch(llm_client):
+    """Test that a batch answer without one result per message is retried per message."""
+    llm_client.batcher = MicroBatcher(llm_client._extract_batch, window_ms=50, max_size=2)
+    acompletion = AsyncMock(
+        side_effect=[
+            completion({"results": [{"goals": [{"title": "Only one"}]}]}),
+            completion({"goals": [{"title": "Add auth"}]}),
+            completion({"goals": [{"title": "Fix CI"}]}),
+        ]
+    )
+
+    with patch("kg_mcp.llm.client.litellm.acompletion", acompletion):
+        auth, ci = await asyncio.gather(
+            llm_client.extract_entities("Add auth"),
+            llm_client.extract_entities("Fix CI"),
+        )
+
+    assert acompletion.await_count == 3
+    assert {auth.goals[0].title, ci.goals[0].title} == {"Add auth", "Fix CI"}
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_falls_back_per_message_without_caching(llm_client):
+    """Test that a rejected batch request is retried per message and not cached."""
+    llm_client.batcher = MicroBatcher(llm_client._extract_batch, window_ms=50, max_size=2)
+    bad_request = litellm.BadRequestError(message="too long", model="m", llm_provider="openai")
+    acompletion = AsyncMock(
+        side_effect=[
+            bad_request,
+            completion({"goals": [{"title": "Add auth"}]}),
+            completion({"goals": [{"title": "Fix CI"}]}),
+        ]
+    )
+
+    with patch("kg_mcp.llm.client.litellm.acompletion", acompletion):
+        auth, ci = await asyncio.gather(
+            llm_client.extract_entities("Add auth"),
+            llm_client.extract_entities("Fix CI"),
+        )
+
+    assert acompletion.await_count == 3
+    assert {auth.goals[0].title, ci.goals[0].title} == {"Add auth", "Fix CI"}
+    assert llm_client.extraction_cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_items_that_are_not_objects_fall_back(llm_client):
+    """Test that only messages answered with a non-object are extracted again."""
+    llm_client.batcher = MicroBatcher(llm_client._extract_batch, window_ms=50, max_size=2)
+    llm_client.settings = llm_client.settings.model_copy(update={"llm_batch_max_tokens": 5000})
+    acompletion = AsyncMock(
+        side_effect=[
+            completion({"results": [{"goals": [{"title": "Add auth"}]}, "oops"]}),
+            completion({"goals": [{"title": "Fix CI"}]}),
+        ]
+    )
+
+    with patch("kg_mcp.llm.client.litellm.acompletion", acompletion):
+        auth, ci = await asyncio.gather(
+            llm_client.extract_entities("Add auth"),
+            llm_client.extract_entities("Fix CI"),
+        )
+
+    assert acompletion.await_args_list[0].kwargs["max_tokens"] == 5000
+    assert acompletion.await_count == 2
+    assert (auth.goals[0].title, ci.goals[0].title) == ("Add auth", "Fix CI")
+    assert llm_client.extraction_cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_extraction_retries_rate_limited_requests(llm_client):
+    """Test that a 429 from the provider is retried instead of failing the ingest."""
+    throttled = litellm.RateLimitError(
+        message="slow down", llm_provider="openai", model="m", headers={"retry-after": "0"}
+    )
+    acompletion = AsyncMock(
+        side_effect=[throttled, completion({"goals": [{"title": "Add auth"}]})]
+    )
+
+    with patch("kg_mcp.llm.client.litellm.acompletion", acompletion):
+        result = await llm_client.extract_entities("Add auth")
+
+    assert result.goals[0].title == "Add auth"
+    assert llm_client.stats()["rate_limits"][llm_client.model]["retries"] == 1
@@ -0,0 +1,151 @@
+"""
+Tests for the Neo4j client unit of work.
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from neo4j.exceptions import ClientError, TransientError
+
+from kg_mcp.kg import neo4j as neo4j_module
+from kg_mcp.kg.neo4j import Neo4jClient
+
+
+class FakeResult:
+    """Async-iterable stand-in for a neo4j result."""
+
+    def __init__(self, records):
+        self._records = records
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for record in self._records:
+            yield record
+
+
+@pytest.fixture
+def fake_tx():
+    """Create a fake explicit transaction."""
+    tx = MagicMock()
+    tx.run = AsyncMock(return_value=FakeResult([{"id": "node-1"}]))
+    tx.commit = AsyncMock()
+    tx.rollback = AsyncMock()
+    return tx
+
+
+@pytest.fixture
+def client(fake_tx):
+    """Create a Neo4j client backed by a fake driver."""
+    session = MagicMock()
+    session.begin_transaction = AsyncMock(return_value=fake_tx)
+    session.close = AsyncMock()
+
+    driver = MagicMock()
+    driver.session = MagicMock(return_value=session)
+    driver.execute_query = AsyncMock()
+
+    client = Neo4jClient()
+    client._driver = driver
+    yield client
+    client._driver = None
+
+
+@pytest.mark.asyncio
+async def test_queries_join_transaction(client, fake_tx):
+    """Test that queries inside a unit of work share one transaction."""
+    async with client.transaction():
+        first = await client.execute_query("CREATE (n) RETURN n.id as id")
+        await client.execute_query("CREATE (m)")
+
+    assert first == [{"id": "node-1"}]
+    assert fake_tx.run.call_count == 2
+    client._driver.execute_query.assert_not_called()
+    fake_tx.commit.assert_awaited_once()
+    fake_tx.rollback.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_transaction_rolls_back_on_error(client, fake_tx):
+    """Test that an error inside the unit of work rolls everything back."""
+    with pytest.raises(RuntimeError):
+        async with client.transaction():
+            await client.execute_query("CREATE (n)")
+            raise RuntimeError("boom")
+
+    fake_tx.rollback.assert_awaited_once()
+    fake_tx.commit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_nested_transaction_commits_once(client, fake_tx):
+    """Test that nested blocks join the outer transaction."""
+    async with client.transaction():
+        async with client.transaction():
+            await client.execute_query("CREATE (n)")
+
+    fake_tx.commit.assert_awaited_once()
+    client._driver.session.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_query_outside_transaction_autocommits(client):
+    """Test that queries outside a unit of work use the driver directly."""
+    client._driver.execute_query.return_value = MagicMock(records=[])
+
+    await client.execute_query("MATCH (n) RETURN n")
+
+    client._driver.execute_query.assert_awaited_once()
+
+
+@pytest.fixture
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(neo4j_module, "TX_RETRY_BASE_DELAY", 0.0)
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_retried_on_transient_error(client, fake_tx, no_retry_delay):
+    """Test that a deadlocked unit of work is rolled back and run again from the start."""
+    attempts = []
+
+    async def work():
+        async with client.transaction():
+            attempts.append(1)
+            await client.execute_query("CREATE (n)")
+            if len(attempts) == 1:
+                raise TransientError("DeadlockDetected")
+            return "done"
+
+    assert await client.run_with_retry(work) == "done"
+    assert len(attempts) == 2
+    fake_tx.rollback.assert_awaited_once()
+    fake_tx.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_non_transient_errors_are_not_retried(client, no_retry_delay):
+    """Test that client errors and exhausted retries are raised."""
+    failing = AsyncMock(side_effect=ClientError("syntax error"))
+    with pytest.raises(ClientError):
+        await client.run_with_retry(failing)
+    assert failing.await_count == 1
+
+    deadlocked = AsyncMock(side_effect=TransientError("DeadlockDetected"))
+    with pytest.raises(TransientError):
+        await client.run_with_retry(deadlocked, max_retries=2)
+    assert deadlocked.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_nested_unit_of_work_leaves_retry_to_outermost(client, no_retry_delay):
+    """Test that work inside an open transaction is not retried on its own."""
+    inner = AsyncMock(side_effect=TransientError("DeadlockDetected"))
+
+    async def outer():
+        async with client.transaction():
+            await client.run_with_retry(inner)
+
+    with pytest.raises(TransientError):
+        await client.run_with_retry(outer, max_retries=1)
+    assert inner.await_count == 2
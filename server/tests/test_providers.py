@@ -0,0 +1,202 @@
+"""
+Tests for provider failover and circuit breaking.
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import httpx
+import litellm
+import pytest
+
+from kg_mcp.llm.client import LLMClient
+from kg_mcp.llm.providers import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    Provider,
+    ProviderPool,
+    ProviderUnavailableError,
+)
+
+PRIMARY = Provider(name="litellm", model="gateway-model", api_base="https://gateway.example")
+SECONDARY = Provider(
+    name="gemini_direct",
+    model="gemini/backup",
+    api_key="g-key",
+    health_url="https://gemini.example/v1beta/models",
+)
+
+
+def connection_error():
+    return litellm.APIConnectionError(message="refused", llm_provider="openai", model="m")
+
+
+def test_breaker_opens_after_consecutive_failures():
+    """Test closed -> open after the threshold, with successes resetting the count."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_half_open_allows_a_single_trial():
+    """Test open -> half-open after the timeout, letting one request through."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    breaker.reset_timeout = 30
+    assert breaker.state == OPEN
+
+    breaker.half_open()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_pool_prefers_much_faster_provider():
+    """Test that the secondary goes first only once the primary is clearly slower."""
+    pool = ProviderPool([PRIMARY, SECONDARY], latency_ratio=2.0)
+    pool.record(PRIMARY, 1.5, ok=True)
+    pool.record(SECONDARY, 1.0, ok=True)
+    assert pool.candidates() == [PRIMARY, SECONDARY]
+
+    for _ in range(10):
+        pool.record(PRIMARY, 8.0, ok=True)
+    assert pool.candidates() == [SECONDARY, PRIMARY]
+
+
+def test_pool_retries_primary_once_its_latency_is_stale():
+    """Test that a primary that lost its traffic for being slow is tried again later."""
+    pool = ProviderPool([PRIMARY, SECONDARY], latency_ratio=2.0, latency_ttl=60)
+    pool.record(PRIMARY, 8.0, ok=True)
+    pool.record(SECONDARY, 1.0, ok=True)
+    assert pool.candidates() == [SECONDARY, PRIMARY]
+
+    pool._latency_at[PRIMARY.name] -= 61
+    assert pool.candidates() == [PRIMARY, SECONDARY]
+
+    # A fresh fast sample replaces the stale average instead of blending with it
+    pool.record(PRIMARY, 1.0, ok=True)
+    assert pool.stats()["litellm"]["latency_ms"] == 1000.0
+
+
+@pytest.fixture
+def client():
+    client = LLMClient()
+    client.extraction_cache = None
+    client.pool = ProviderPool([PRIMARY, SECONDARY], failure_threshold=2, reset_timeout=60)
+    return client
+
+
+def answering_from(*failing_models):
+    """acompletion stand-in that fails for the given models."""
+    calls = []
+
+    async def acompletion(**kwargs):
+        calls.append(kwargs["model"])
+        if kwargs["model"] in failing_models:
+            raise connection_error()
+        response = MagicMock()
+        response.choices = [MagicMock()]
+        response.choices[0].message.content = json.dumps({"goals": [{"title": "Add auth"}]})
+        return response
+
+    return acompletion, calls
+
+
+@pytest.mark.asyncio
+async def test_failover_to_secondary_and_skip_open_primary(client):
+    """Test that a failing primary fails over, then is skipped once its circuit opens."""
+    acompletion, calls = answering_from(client.model)
+
+    with patch("kg_mcp.llm.client.litellm.acompletion", side_effect=acompletion):
+        for text in ("one", "two", "three"):
+            result = await client.extract_entities(text)
+            assert result.goals[0].title == "Add auth"
+
+    # Two failures open the primary's circuit; the third request skips it
+    assert calls == [client.model, "gemini/backup"] * 2 + ["gemini/backup"]
+    stats = client.stats()["providers"]
+    assert stats["litellm"]["state"] == OPEN
+    assert stats["litellm"]["failovers"] == 2
+    assert stats["gemini_direct"]["state"] == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_all_circuits_open_fails_fast(client):
+    """Test that no request is sent while every provider's circuit is open."""
+    acompletion, calls = answering_from(client.model, "gemini/backup")
+
+    with patch("kg_mcp.llm.client.litellm.acompletion", side_effect=acompletion):
+        for _ in range(2):
+            with pytest.raises(litellm.APIConnectionError):
+                await client.extract_entities("Add auth")
+        with pytest.raises(ProviderUnavailableError):
+            await client.extract_entities("Add auth")
+
+    assert len(calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_request_errors_do_not_trip_the_breaker(client):
+    """Test that a bad request is raised without failing over or counting a failure."""
+
+    async def bad_request(**kwargs):
+        raise litellm.BadRequestError(message="bad prompt", model="m", llm_provider="openai")
+
+    with patch("kg_mcp.llm.client.litellm.acompletion", side_effect=bad_request):
+        with pytest.raises(litellm.BadRequestError):
+            await client.extract_entities("Add auth")
+
+    assert client.stats()["providers"]["litellm"]["failures"] == 0
+    assert client.stats()["providers"]["gemini_direct"]["calls"] == 0
+
+
+@pytest.mark.asyncio
+async def test_auth_errors_reach_the_caller_without_failover(client):
+    """Test that a bad key is raised as is, without failing over or opening the circuit."""
+
+    async def unauthorized(**kwargs):
+        raise litellm.AuthenticationError(message="bad key", llm_provider="openai", model="m")
+
+    with patch("kg_mcp.llm.client.litellm.acompletion", side_effect=unauthorized) as acompletion:
+        for _ in range(3):
+            with pytest.raises(litellm.AuthenticationError):
+                await client.extract_entities("Add auth")
+
+    assert acompletion.call_count == 3
+    assert client.stats()["providers"]["litellm"]["state"] == CLOSED
+    assert client.stats()["providers"]["gemini_direct"]["calls"] == 0
+
+
+@pytest.mark.asyncio
+async def test_health_probe_half_opens_a_recovered_provider():
+    """Test that a provider answering its health URL gets a trial request."""
+    pool = ProviderPool([PRIMARY, SECONDARY], failure_threshold=1, reset_timeout=60)
+    pool.record(SECONDARY, 1.0, ok=False)
+    assert pool.breakers["gemini_direct"].state == OPEN
+
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"models": []})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+        assert await pool.probe(SECONDARY, http_client)
+
+    assert requests[0].headers["x-goog-api-key"] == "g-key"
+    assert pool.breakers["gemini_direct"].state == HALF_OPEN
@@ -0,0 +1,104 @@
+"""
+Tests for the LLM rate limiter.
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock
+
+import httpx
+import litellm
+import pytest
+
+from kg_mcp.llm.ratelimit import RateLimiter, retry_after
+
+
+def rate_limit_error(retry_after_header=None):
+    """Build a litellm 429 error, optionally carrying a Retry-After header."""
+    headers = {"retry-after": retry_after_header} if retry_after_header is not None else {}
+    response = httpx.Response(
+        429, headers=headers, request=httpx.Request("POST", "http://gateway/chat/completions")
+    )
+    return litellm.RateLimitError(
+        message="Too many requests", llm_provider="openai", model="m", response=response
+    )
+
+
+@pytest.mark.asyncio
+async def test_retries_after_retry_after_header():
+    """Test that a 429 is retried after the delay the provider asked for."""
+    limiter = RateLimiter(max_retries=2)
+    call = AsyncMock(side_effect=[rate_limit_error("0.05"), "ok"])
+
+    started = time.monotonic()
+    assert await limiter.run(call) == "ok"
+
+    assert time.monotonic() - started >= 0.05
+    assert limiter.stats()["throttled"] == 1
+    assert limiter.stats()["retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries():
+    """Test that the 429 is raised once retries are exhausted."""
+    limiter = RateLimiter(max_retries=1, backoff_base=0.0)
+    call = AsyncMock(side_effect=rate_limit_error())
+
+    with pytest.raises(litellm.RateLimitError):
+        await limiter.run(call)
+
+    assert call.await_count == 2
+    assert limiter.stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_and_queue_depth():
+    """Test that no more than `concurrency` calls run at once and the rest queue."""
+    limiter = RateLimiter(concurrency=2)
+    running, peak = 0, 0
+    release = asyncio.Event()
+
+    async def call():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await release.wait()
+        running -= 1
+
+    tasks = [asyncio.create_task(limiter.run(call)) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    assert limiter.stats()["in_flight"] == 2
+    assert limiter.stats()["waiting"] == 3
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert peak == 2
+    assert limiter.stats()["requests"] == 5
+
+
+def test_backoff_is_jittered_and_capped():
+    """Test that backoff stays within [0, min(max, base * 2^attempt)]."""
+    limiter = RateLimiter(backoff_base=1.0, backoff_max=4.0)
+
+    delays = [limiter.backoff(10) for _ in range(50)]
+    assert all(0 <= d <= 4.0 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_retry_after_parsing():
+    """Test Retry-After in seconds, as an HTTP date, and missing."""
+    assert retry_after(rate_limit_error("3")) == 3.0
+    assert retry_after(rate_limit_error("Wed, 21 Oct 2015 07:28:00 GMT")) == 0.0
+    assert retry_after(rate_limit_error()) is None
+
+
+@pytest.mark.asyncio
+async def test_throttling_slows_the_bucket_down():
+    """Test that a 429 lowers the request rate, which recovers on success."""
+    limiter = RateLimiter(rpm=600, backoff_base=0.0)
+    call = AsyncMock(side_effect=[rate_limit_error("0"), "ok"])
+
+    await limiter.run(call)
+
+    assert limiter.bucket.rate < 10
+    assert limiter.stats()["rpm"] < 600
@@ -0,0 +1,268 @@
+"""
+Tests for the knowledge graph repository.
+"""
+
+import asyncio
+import os
+import re
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from kg_mcp.kg.repo import DEFAULT_SEARCH_TYPES, FULLTEXT_INDEXES, KGRepository, _pair
+
+
+@pytest.fixture
+def mock_client():
+    """Create a mock Neo4j client."""
+    client = MagicMock()
+    client.execute_query = AsyncMock(return_value=[])
+    return client
+
+
+@pytest.fixture
+def repo(mock_client):
+    """Create a repository backed by the mock client."""
+    repository = KGRepository()
+    repository.client = mock_client
+    return repository
+
+
+@pytest.mark.asyncio
+async def test_fulltext_search_single_round_trip(repo, mock_client):
+    """Test that all indexes are searched with one statement."""
+    mock_client.execute_query.return_value = [
+        {"type": "Goal", "data": {"title": "Auth"}, "score": 1.0, "raw_score": 3.2}
+    ]
+
+    results = await repo.fulltext_search(project_id="test-project", query="auth", limit=5)
+
+    assert results[0]["type"] == "Goal"
+    mock_client.execute_query.assert_awaited_once()
+    query, params = mock_client.execute_query.call_args.args
+    for node_type in DEFAULT_SEARCH_TYPES:
+        assert FULLTEXT_INDEXES[node_type] in query
+    assert "interaction_fulltext" not in query
+    assert params == {"project_id": "test-project", "query": "auth", "limit": 5}
+
+
+async def captured_search_queries(repo, mock_client):
+    """Combined and per-index statements sent by fulltext_search."""
+    mock_client.execute_query = AsyncMock(side_effect=RuntimeError("unavailable"))
+    await repo.fulltext_search(
+        project_id="test-project", query="auth", node_types=list(FULLTEXT_INDEXES)
+    )
+    return [call.args[0] for call in mock_client.execute_query.call_args_list]
+
+
+@pytest.mark.asyncio
+async def test_fulltext_map_projections_start_from_variables(repo, mock_client):
+    """Test that `x {.*}` projections apply to a variable, not a property expression."""
+    queries = await captured_search_queries(repo, mock_client)
+
+    assert len(queries) == 1 + len(FULLTEXT_INDEXES)
+    for query in queries:
+        projected = re.findall(r"([\w.]+)\s*\{\s*\.\*\s*\}", query)
+        assert projected and all("." not in expr for expr in projected), query
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(
+    not os.getenv("KG_TEST_NEO4J_URI"), reason="set KG_TEST_NEO4J_URI to check against Neo4j"
+)
+async def test_fulltext_statements_compile_in_neo4j(repo, mock_client):
+    """Test that Neo4j plans the real search statements (EXPLAIN, nothing runs)."""
+    from neo4j import AsyncGraphDatabase
+
+    queries = await captured_search_queries(repo, mock_client)
+    auth = (os.getenv("KG_TEST_NEO4J_USER", "neo4j"), os.getenv("KG_TEST_NEO4J_PASSWORD", ""))
+    async with AsyncGraphDatabase.driver(os.environ["KG_TEST_NEO4J_URI"], auth=auth) as driver:
+        for query in queries:
+            await driver.execute_query(
+                "EXPLAIN " + query, {"project_id": "p", "query": "auth", "limit": 5}
+            )
+
+
+@pytest.mark.asyncio
+async def test_fulltext_search_filters_node_types(repo, mock_client):
+    """Test that only the requested indexes are queried."""
+    await repo.fulltext_search(project_id="test-project", query="auth", node_types=["Goal"])
+
+    query = mock_client.execute_query.call_args.args[0]
+    assert "goal_fulltext" in query
+    assert "painpoint_fulltext" not in query
+
+
+@pytest.mark.asyncio
+async def test_fulltext_search_falls_back_per_index(repo, mock_client):
+    """Test that a failing combined query falls back to per-index queries."""
+
+    async def execute_query(query, params):
+        if "UNION" in query or "strategy_fulltext" in query:
+            raise RuntimeError("index missing")
+        node_type = "Goal" if "goal_fulltext" in query else "PainPoint"
+        score = 1.0 if node_type == "PainPoint" else 0.5
+        return [{"type": node_type, "data": {}, "score": score, "raw_score": score}]
+
+    mock_client.execute_query = AsyncMock(side_effect=execute_query)
+
+    results = await repo.fulltext_search(
+        project_id="test-project",
+        query="auth",
+        node_types=["Goal", "PainPoint", "Strategy"],
+    )
+
+    assert [r["type"] for r in results] == ["PainPoint", "Goal"]
+
+
+@pytest.mark.asyncio
+async def test_request_scope_memoizes_reads(repo, mock_client):
+    """Test that identical reads in one request hit Neo4j once."""
+    with repo.request_scope():
+        await repo.get_active_goals("test-project")
+        await repo.get_active_goals(project_id="test-project")
+        await repo.get_active_goals("other-project")
+
+    assert mock_client.execute_query.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_request_scope_write_clears_memo(repo, mock_client):
+    """Test that a write forces the next read to go to Neo4j."""
+    with repo.request_scope():
+        await repo.get_preferences("test-user")
+        await repo.upsert_preference("test-user", "testing", "Use pytest")
+        await repo.get_preferences("test-user")
+
+    assert mock_client.execute_query.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_reads_not_memoized_outside_scope(repo, mock_client):
+    """Test that reads outside a request scope always query Neo4j."""
+    await repo.get_all_goals("test-project")
+    await repo.get_all_goals("test-project")
+
+    assert mock_client.execute_query.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_read_cache_hits_across_requests(repo, mock_client):
+    """Test that hot reads are served from the cache between requests."""
+    mock_client.execute_query.return_value = [{"goal": {"id": "goal-1"}}]
+
+    first = await repo.get_active_goals("test-project")
+    first.append({"id": "mutated"})
+    second = await repo.get_active_goals("test-project")
+
+    assert second == [{"id": "goal-1"}]
+    mock_client.execute_query.assert_awaited_once()
+    assert repo.read_cache.stats()["hits"] == 1
+    assert repo.read_cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_read_cache_invalidated_by_scoped_write(repo, mock_client):
+    """Test that a write drops only entries for the project it touches."""
+    await repo.get_open_painpoints("test-project")
+    await repo.get_open_painpoints("other-project")
+
+    await repo.upsert_painpoint(project_id="test-project", description="Slow builds")
+    await repo.get_open_painpoints("test-project")
+    await repo.get_open_painpoints("other-project")
+
+    # 2 cold reads + 1 write + 1 re-read of the invalidated project
+    assert mock_client.execute_query.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_transaction_invalidates_only_touched_scopes(repo, mock_client):
+    """Test that committing a transaction keeps cached reads of other projects."""
+
+    @asynccontextmanager
+    async def transaction():
+        yield
+
+    mock_client.transaction = transaction
+    await repo.get_open_painpoints("test-project")
+    await repo.get_open_painpoints("other-project")
+
+    async with repo.transaction():
+        await repo.upsert_painpoint(project_id="test-project", description="Slow builds")
+    await repo.get_open_painpoints("test-project")
+    await repo.get_open_painpoints("other-project")
+
+    # 2 cold reads + 1 write + 1 re-read of the touched project
+    assert mock_client.execute_query.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_read_cache_expires(repo, mock_client):
+    """Test that entries are re-read after the TTL."""
+    repo.read_cache.ttl = 0.01
+
+    await repo.get_preferences("test-user")
+    await asyncio.sleep(0.02)
+    await repo.get_preferences("test-user")
+
+    assert mock_client.execute_query.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_read_cache_skips_reads_overlapping_writes(repo, mock_client):
+    """Test that a read racing a write is not cached."""
+    generation = repo.read_cache.generation
+    repo.read_cache.invalidate([("project_id", "test-project")])
+
+    repo.read_cache.set(("get_active_goals", "k"), ("project_id", "test-project"), [], generation)
+
+    assert repo.read_cache.get(("get_active_goals", "k")) == (False, None)
+
+
+@pytest.mark.asyncio
+async def test_upsert_symbols_bulk_batches(repo, mock_client):
+    """Test that symbols are written in UNWIND batches."""
+    symbols = [{"fqn": f"src/app.py:func_{i}", "kind": "function"} for i in range(5)]
+
+    saved = await repo.upsert_symbols_bulk("artifact-1", symbols, batch_size=2)
+
+    assert mock_client.execute_query.await_count == 3
+    assert [s["fqn"] for s in saved] == [s["fqn"] for s in symbols]
+    rows = mock_client.execute_query.call_args_list[0].args[1]["rows"]
+    assert [r["name"] for r in rows] == ["func_0", "func_1"]
+
+
+@pytest.mark.asyncio
+async def test_upsert_code_artifact_links_goals_in_one_statement(repo, mock_client):
+    """Test that goal linking costs one statement regardless of goal count."""
+    mock_client.execute_query.return_value = [{"artifact": {"id": "artifact-1"}}]
+
+    await repo.upsert_code_artifact(
+        project_id="test-project",
+        path="src/app.py",
+        related_goal_ids=[f"goal-{i}" for i in range(20)],
+    )
+
+    assert mock_client.execute_query.await_count == 2
+    params = mock_client.execute_query.call_args.args[1]
+    assert params["artifact_ids"] == ["artifact-1"]
+    assert len(params["goal_ids"]) == 20
+
+
+@pytest.mark.asyncio
+async def test_link_artifacts_to_goals_skips_empty(repo, mock_client):
+    """Test that nothing is sent when there is nothing to link."""
+    await repo.link_artifacts_to_goals(["artifact-1"], [])
+
+    mock_client.execute_query.assert_not_called()
+
+
+def test_pair_rejects_mismatched_bulk_results():
+    """Test that UNWIND results are paired 1:1 with their rows, never truncated."""
+    rows = [{"goal_id": "g1"}, {"goal_id": "g2"}]
+
+    assert _pair(rows, [{"id": "a"}, {"id": "b"}], "goal_id") == [(rows[0], "a"), (rows[1], "b")]
+    assert _pair(rows, [], "goal_id") == [(rows[0], "g1"), (rows[1], "g2")]
+    with pytest.raises(ValueError):
+        _pair(rows, [{"id": "a"}], "goal_id")
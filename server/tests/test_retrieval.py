@@ -2,10 +2,13 @@
 Tests for the retrieval/context builder.
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime
 
+from kg_mcp.config import Settings
 from kg_mcp.kg.retrieval import ContextBuilder
 
 
@@ -240,3 +243,43 @@ async def test_context_pack_constraints(mock_repository):
         result = await builder.build_context_pack(project_id="test-project")
 
         assert "OAuth2" in result["markdown"]
+
+
+@pytest.mark.asyncio
+async def test_context_pack_degrades_on_failed_branch(mock_repository):
+    """Test that a failing read is skipped instead of failing the pack."""
+    mock_repository.get_open_painpoints = AsyncMock(side_effect=RuntimeError("db down"))
+
+    with patch("kg_mcp.kg.retrieval.get_repository", return_value=mock_repository):
+        builder = ContextBuilder()
+        builder.repo = mock_repository
+
+        result = await builder.build_context_pack(project_id="test-project")
+
+        assert result["degraded"] == ["pain_points"]
+        assert result["entities"]["pain_points"] == []
+        assert "Implement authentication" in result["markdown"]
+
+
+@pytest.mark.asyncio
+async def test_context_pack_branch_timeout(mock_repository):
+    """Test that a slow read times out without blocking the other branches."""
+
+    async def slow_search(**kwargs):
+        await asyncio.sleep(10)
+        return []
+
+    mock_repository.fulltext_search = AsyncMock(side_effect=slow_search)
+
+    with patch("kg_mcp.kg.retrieval.get_repository", return_value=mock_repository):
+        builder = ContextBuilder()
+        builder.repo = mock_repository
+        builder.settings = Settings(kg_context_branch_timeout=0.05)
+
+        result = await builder.build_context_pack(
+            project_id="test-project",
+            query="authentication",
+        )
+
+        assert result["degraded"] == ["search_results"]
+        assert len(result["entities"]["active_goals"]) == 2
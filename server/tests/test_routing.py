@@ -0,0 +1,96 @@
+"""
+Tests for task-based model routing.
+"""
+
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from kg_mcp.llm.client import LLMClient
+from kg_mcp.llm.routing import FAST, REASON, ModelRouter
+from kg_mcp.llm.schemas import ExtractionResult
+
+
+def completion(data):
+    """Build a litellm-style completion response."""
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = json.dumps(data)
+    return response
+
+
+@pytest.fixture
+def router():
+    return ModelRouter(default_model="default", fast_model="fast", reason_model="reason")
+
+
+def test_short_message_goes_to_fast_model(router):
+    """Test that an ordinary message is extracted by the fast model."""
+    route = router.route_extraction("Fix the login redirect", files=["src/auth.py"])
+
+    assert route.tier == FAST
+    assert route.model == "fast"
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"user_text": "x" * 2500},
+        {"user_text": "Refactor", "diff": "+" * 5000},
+        {"user_text": "Refactor", "files": [f"f{i}.py" for i in range(20)]},
+        {"user_text": "Plan:\n" + "\n".join(f"{i}. step {i}" for i in range(1, 7))},
+    ],
+)
+def test_long_or_complex_requests_go_to_reason_model(router, kwargs):
+    """Test the pre-classifier's reasons for picking the reasoning model."""
+    route = router.route_extraction(**kwargs)
+
+    assert route.tier == REASON
+    assert route.model == "reason"
+
+
+def test_unconfigured_tiers_fall_back_to_default():
+    """Test that without KG_MODEL_FAST/REASON every call uses the default model."""
+    router = ModelRouter(default_model="default")
+
+    assert router.route_extraction("hi").model == "default"
+    assert router.route_extraction("x" * 5000).model == "default"
+
+
+def test_records_choice_and_latency(router):
+    """Test that each call's route and latency is recorded."""
+    route = router.route_extraction("hi")
+    router.record(route, 120.0, prompt_tokens=300, completion_tokens=50)
+    router.record(route, 80.0, ok=False)
+
+    stats = router.stats()
+    assert stats["routes"]["extract/fast"] == {
+        "model": "fast",
+        "calls": 2,
+        "errors": 1,
+        "mean_ms": 100.0,
+        "prompt_tokens": 300,
+        "completion_tokens": 50,
+    }
+    assert stats["tokens"] == {"prompt": 300, "completion": 50}
+    assert stats["recent"][-1]["reason"] == "short message"
+
+
+@pytest.mark.asyncio
+async def test_client_routes_extraction_and_linking():
+    """Test that the client sends long diffs to the reasoning model and links with the fast one."""
+    client = LLMClient()
+    client.extraction_cache = None
+    client.router = ModelRouter(default_model="default", fast_model="fast", reason_model="reason")
+    acompletion = AsyncMock(return_value=completion({}))
+
+    with patch("kg_mcp.llm.client.litellm.acompletion", acompletion):
+        await client.extract_entities("Refactor the parser", diff="+" * 5000)
+        await client.extract_entities("Fix typo")
+        await client.link_entities(ExtractionResult(), [], [], [])
+
+    models = [call.kwargs["model"] for call in acompletion.call_args_list]
+    assert models == ["reason", "fast", "fast"]
+    routes = set(client.stats()["routing"]["routes"])
+    assert routes == {"extract/reason", "extract/fast", "link/fast"}
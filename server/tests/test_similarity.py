@@ -0,0 +1,61 @@
+"""
+Tests for local candidate retrieval.
+"""
+
+from kg_mcp.kg.similarity import (
+    CandidateIndex,
+    cosine,
+    normalize_text,
+    select_candidates,
+    text_features,
+)
+
+
+def test_normalize_text():
+    """Test that case, punctuation and spacing are ignored."""
+    assert normalize_text("  Add   JWT-based Auth! ") == "add jwt based auth"
+
+
+def test_text_features_similarity():
+    """Test that related texts score higher than unrelated ones."""
+    query = text_features("Add user authentication")
+
+    related = cosine(query, text_features("Implement authentication for users"))
+    unrelated = cosine(query, text_features("Speed up the CI pipeline"))
+
+    assert related > unrelated
+    assert abs(cosine(query, query) - 1.0) < 1e-6
+
+
+def test_candidate_index_top_k():
+    """Test that the most similar items are returned best first."""
+    goals = [
+        {"id": "g1", "title": "Speed up CI pipeline"},
+        {"id": "g2", "title": "Add user authentication"},
+        {"id": "g3", "title": "Migrate database to Postgres"},
+    ]
+    index = CandidateIndex(goals, [g["title"] for g in goals])
+
+    top = index.top_k("user authentication with JWT", k=2)
+
+    assert top[0][0]["id"] == "g2"
+    assert len(top) <= 2
+
+
+def test_select_candidates_bounded():
+    """Test that selection stays bounded as the number of items grows."""
+    items = [{"title": f"Goal number {i} about topic {i % 17}"} for i in range(500)]
+    texts = [item["title"] for item in items]
+
+    selected = select_candidates(["topic 3", "topic 5"], items, texts, k=5)
+
+    assert 0 < len(selected) <= 10
+    assert selected == [item for item in items if item in selected]
+
+
+def test_select_candidates_small_inputs():
+    """Test that small lists are kept and empty queries select nothing."""
+    items = [{"title": "A"}, {"title": "B"}]
+
+    assert select_candidates(["a"], items, ["A", "B"], k=5) == items
+    assert select_candidates([], items, ["A", "B"], k=5) == []
@@ -0,0 +1,104 @@
+"""
+Tests for streamed extraction and the incremental JSON parser.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from kg_mcp.llm.client import LLMClient
+from kg_mcp.llm.schemas import GoalExtract, PreferenceExtract
+from kg_mcp.llm.streaming import StreamingJSONParser
+
+
+def feed_all(text, size):
+    """Feed text in fixed-size chunks and collect every event."""
+    parser = StreamingJSONParser()
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i : i + size]))
+    return parser, events
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_parser_reports_array_elements_as_they_complete(size):
+    """Test that elements come out in order whatever the chunk boundaries."""
+    data = {
+        "goals": [{"title": 'Fix "quoted" ] and } chars', "tags": [1, 2]}, {"title": "B"}],
+        "next_actions": ["a, b", "c"],
+        "scores": [1, 2.5, True, None],
+        "confidence": 0.9,
+    }
+    parser, events = feed_all(json.dumps(data), size)
+
+    assert events == [
+        ("goals", data["goals"][0]),
+        ("goals", data["goals"][1]),
+        ("next_actions", "a, b"),
+        ("next_actions", "c"),
+        ("scores", 1),
+        ("scores", 2.5),
+        ("scores", True),
+        ("scores", None),
+    ]
+    assert parser.result() == data
+
+
+def test_parser_emits_before_the_object_is_complete():
+    """Test that a finished element is reported while later ones are still open."""
+    parser = StreamingJSONParser()
+
+    assert parser.feed('{"goals": [{"title": "A"}, {"title": "B') == [("goals", {"title": "A"})]
+    assert parser.feed('"}]}') == [("goals", {"title": "B"})]
+
+
+def stream(text, gate=None):
+    """Build a litellm-style async completion stream, optionally pausing halfway."""
+
+    async def chunks():
+        half = len(text) // 2
+        for i, part in enumerate((text[:half], text[half:])):
+            if i == 1 and gate is not None:
+                await gate.wait()
+            chunk = MagicMock()
+            chunk.choices = [MagicMock()]
+            chunk.choices[0].delta.content = part
+            yield chunk
+
+    return chunks()
+
+
+@pytest.mark.asyncio
+async def test_streamed_extraction_reports_entities_early():
+    """Test that entities reach the callback before generation finishes."""
+    client = LLMClient()
+    client.extraction_cache = None
+    client.settings = client.settings.model_copy(update={"llm_stream": True})
+    text = json.dumps(
+        {
+            "goals": [{"title": "Add auth"}],
+            "preferences": [{"category": "testing", "preference": "pytest"}],
+            "confidence": 0.9,
+        }
+    )
+    gate = asyncio.Event()
+    received = []
+
+    async def on_entity(field, entity):
+        received.append((field, entity))
+        gate.set()
+
+    acompletion = AsyncMock(return_value=stream(text, gate))
+    with patch("kg_mcp.llm.client.litellm.acompletion", acompletion):
+        result = await asyncio.wait_for(
+            client.extract_entities("Add auth", on_entity=on_entity), timeout=2
+        )
+
+    assert acompletion.call_args.kwargs["stream"] is True
+    assert received[0] == ("goals", GoalExtract(title="Add auth"))
+    preference = PreferenceExtract(category="testing", preference="pytest")
+    assert received[1] == ("preferences", preference)
+    assert result.goals[0].title == "Add auth"
+    assert result.confidence == 0.9